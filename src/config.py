@@ -10,27 +10,180 @@ from logging.handlers import RotatingFileHandler
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_BOT_PARSE_MODE = 'HTML'
 
+# Режим получения апдейтов: polling или webhook
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+
+# Настройки webhook
+WEBHOOK_BASE_URL = os.getenv('WEBHOOK_BASE_URL', '')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+# Адрес и порт приложения (в режиме polling - только /ready и /metrics)
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+
 # Настройки бэкенда
 BACKEND_URL = os.getenv('BACKEND_URL')
 BACKEND_TOKEN = os.getenv('BACKEND_TOKEN')
 AUTH_HEADERS = {'Authorization': BACKEND_TOKEN}
 
+# Настройки пула соединений с бэкендом
+BACKEND_POOL_LIMIT = int(os.getenv('BACKEND_POOL_LIMIT', 100))
+BACKEND_POOL_LIMIT_PER_HOST = int(os.getenv('BACKEND_POOL_LIMIT_PER_HOST', 30))
+BACKEND_KEEPALIVE_TIMEOUT = float(os.getenv('BACKEND_KEEPALIVE_TIMEOUT', 30))
+BACKEND_DNS_CACHE_TTL = int(os.getenv('BACKEND_DNS_CACHE_TTL', 300))
+
+# Методы BackendClient, одинаковые одновременные вызовы которых
+# объединяются в один запрос к бэкенду (single-flight).
+BACKEND_SINGLE_FLIGHT_ENDPOINTS = os.getenv(
+    'BACKEND_SINGLE_FLIGHT_ENDPOINTS',
+    'get_user,get_summary,get_group,group_name_is_exist,'
+    'get_all_years,get_all_months_in_year'
+).split(',')
+
+# Повторы идемпотентных запросов к бэкенду
+BACKEND_RETRY_ATTEMPTS = int(os.getenv('BACKEND_RETRY_ATTEMPTS', 3))
+BACKEND_RETRY_BACKOFF_BASE = float(os.getenv('BACKEND_RETRY_BACKOFF_BASE', 0.2))
+BACKEND_RETRY_BACKOFF_MAX = float(os.getenv('BACKEND_RETRY_BACKOFF_MAX', 2))
+
+# Настройки circuit breaker эндпоинтов бэкенда
+BACKEND_BREAKER_FAILURE_THRESHOLD = int(
+    os.getenv('BACKEND_BREAKER_FAILURE_THRESHOLD', 5)
+)
+BACKEND_BREAKER_RESET_TIMEOUT = float(
+    os.getenv('BACKEND_BREAKER_RESET_TIMEOUT', 30)
+)
+
+# Размер части при потоковом чтении ответа бэкенда, байт
+BACKEND_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Размер экспорта, до которого файл хранится в памяти, а не на диске, байт
+EXPORT_SPOOL_MAX_SIZE = int(os.getenv('EXPORT_SPOOL_MAX_SIZE', 1024 * 1024))
+
+# Методы BackendClient, GET-ответы которых перепроверяются условными
+# запросами (If-None-Match / If-Modified-Since), если бэкенд отдает
+# ETag или Last-Modified. Ответ 304 отдается из кеша без разбора тела.
+BACKEND_REVALIDATE_ENDPOINTS = os.getenv(
+    'BACKEND_REVALIDATE_ENDPOINTS',
+    'get_user,get_summary,get_all_years,get_all_months_in_year'
+).split(',')
+
+# Хранилище FSM: memory, sqlite или redis
+FSM_STORAGE = os.getenv('FSM_STORAGE', 'memory')
+FSM_SQLITE_PATH = os.getenv('FSM_SQLITE_PATH', 'data/fsm.sqlite3')
+FSM_REDIS_URL = os.getenv('FSM_REDIS_URL', 'redis://localhost:6379/0')
+# Таймаут соединения и команды Redis, секунд
+FSM_REDIS_TIMEOUT = float(os.getenv('FSM_REDIS_TIMEOUT', 5))
+
+# Время жизни брошенного состояния FSM, секунд
+FSM_STATE_TTL = int(os.getenv('FSM_STATE_TTL', 24 * 60 * 60))
+
+# Интервал сброса изменений FSM в SQLite, секунд
+FSM_FLUSH_INTERVAL = float(os.getenv('FSM_FLUSH_INTERVAL', 0.5))
+
 # Настройки glitchtip
 GLITCHTIP_DSN = os.getenv('GLITCHTIP_DSN')
 
 # Настройки кеширования
 BACKEND_GET_USER_ID_TTL = 10
+BACKEND_USER_CACHE_SIZE = int(os.getenv('BACKEND_USER_CACHE_SIZE', 1000))
+BACKEND_USER_CACHE_TTL = int(os.getenv('BACKEND_USER_CACHE_TTL', 30))
+BACKEND_UNREGISTERED_CACHE_SIZE = int(
+    os.getenv('BACKEND_UNREGISTERED_CACHE_SIZE', 10000)
+)
+BACKEND_UNREGISTERED_CACHE_TTL = int(
+    os.getenv('BACKEND_UNREGISTERED_CACHE_TTL', 10)
+)
+BACKEND_SUMMARY_CACHE_SIZE = int(os.getenv('BACKEND_SUMMARY_CACHE_SIZE', 500))
+BACKEND_SUMMARY_CACHE_TTL = int(os.getenv('BACKEND_SUMMARY_CACHE_TTL', 30))
+BACKEND_REVALIDATE_CACHE_SIZE = int(
+    os.getenv('BACKEND_REVALIDATE_CACHE_SIZE', 1000)
+)
+BACKEND_REVALIDATE_CACHE_TTL = int(
+    os.getenv('BACKEND_REVALIDATE_CACHE_TTL', 24 * 60 * 60)
+)
+EXPORT_CACHE_SIZE = int(os.getenv('EXPORT_CACHE_SIZE', 500))
+# Время повторного использования file_id экспорта, секунд. Версия данных
+# учитывает только изменения через эту реплику бота, поэтому изменения
+# через сайт или другие реплики попадают в экспорт не позже чем через TTL.
+EXPORT_CACHE_TTL = int(os.getenv('EXPORT_CACHE_TTL', 5 * 60))
+SUMMARY_TEXT_CACHE_SIZE = int(os.getenv('SUMMARY_TEXT_CACHE_SIZE', 500))
+KEYBOARD_CACHE_SIZE = int(os.getenv('KEYBOARD_CACHE_SIZE', 1000))
+KEYBOARD_CACHE_TTL = int(os.getenv('KEYBOARD_CACHE_TTL', 24 * 60 * 60))
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', 10000))
+RENDER_CACHE_TTL = int(os.getenv('RENDER_CACHE_TTL', 48 * 60 * 60))
+
+# В режиме webhook апдейты обрабатывают несколько реплик, а кеши
+# пользователей, отчетов и экспорта хранятся в памяти каждой из них
+# и не инвалидируются изменениями на других репликах. Поэтому их время
+# жизни ограничено REPLICA_CACHE_TTL секундами.
+REPLICA_CACHE_TTL = int(os.getenv('REPLICA_CACHE_TTL', 3))
+if BOT_MODE == 'webhook':
+    BACKEND_USER_CACHE_TTL = min(BACKEND_USER_CACHE_TTL, REPLICA_CACHE_TTL)
+    BACKEND_UNREGISTERED_CACHE_TTL = min(
+        BACKEND_UNREGISTERED_CACHE_TTL,
+        REPLICA_CACHE_TTL
+    )
+    BACKEND_SUMMARY_CACHE_TTL = min(
+        BACKEND_SUMMARY_CACHE_TTL,
+        REPLICA_CACHE_TTL
+    )
+    EXPORT_CACHE_TTL = min(EXPORT_CACHE_TTL, REPLICA_CACHE_TTL)
+
+# Ограничение частоты апдейтов: токенов в секунду и размер ведра
+# для каждого пользователя и для бота в целом.
+THROTTLE_USER_RATE = float(os.getenv('THROTTLE_USER_RATE', 3))
+THROTTLE_USER_BURST = float(os.getenv('THROTTLE_USER_BURST', 10))
+THROTTLE_GLOBAL_RATE = float(os.getenv('THROTTLE_GLOBAL_RATE', 100))
+THROTTLE_GLOBAL_BURST = float(os.getenv('THROTTLE_GLOBAL_BURST', 200))
+THROTTLE_MAX_USERS = int(os.getenv('THROTTLE_MAX_USERS', 100000))
+
+# Ограничение частоты исходящих запросов к Telegram: сообщений в секунду
+# для бота в целом, для личного чата и для группы (20 в минуту).
+SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', 30))
+SEND_GLOBAL_BURST = float(os.getenv('SEND_GLOBAL_BURST', 30))
+SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', 1))
+SEND_CHAT_BURST = float(os.getenv('SEND_CHAT_BURST', 3))
+SEND_GROUP_RATE = float(os.getenv('SEND_GROUP_RATE', 20 / 60))
+SEND_GROUP_BURST = float(os.getenv('SEND_GROUP_BURST', 3))
+SEND_MAX_CHATS = int(os.getenv('SEND_MAX_CHATS', 100000))
+
+# Количество повторов запроса к Telegram после ответа 429 (RetryAfter)
+SEND_MAX_RETRIES = int(os.getenv('SEND_MAX_RETRIES', 3))
+
+# Уведомления в совместный чат: окно, за которое уведомления
+# объединяются в одно сообщение, секунд, и повторы при ошибке отправки.
+OUTBOX_DIGEST_WINDOW = float(os.getenv('OUTBOX_DIGEST_WINDOW', 5))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_BACKOFF_BASE = float(os.getenv('OUTBOX_BACKOFF_BASE', 1))
+OUTBOX_BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX', 60))
+
+# Максимальная длина текста сообщения Telegram
+MAX_MESSAGE_LENGTH = 4096
 
 # Контактная почта для сообщений
 CONTACT_EMAIL_IN_MESSAGE = os.getenv('CONTACT_EMAIL_IN_MESSAGE', '')
 
-# Timeout session
+# Timeout session. Общий таймаут запроса к бэкенду вне обработки апдейта.
 TIMEOUT_SESSION = 300
 
+# Бюджет времени на обработку одного апдейта, секунд
+UPDATE_DEADLINE = float(os.getenv('UPDATE_DEADLINE', 30))
+
+# Бюджет времени на экспорт в Excel (скачивание файла у бэкенда
+# и загрузка в Telegram), секунд. Задается флагом хэндлера deadline.
+EXPORT_DEADLINE = float(os.getenv('EXPORT_DEADLINE', 300))
+
+# Таймауты соединения и чтения ответа при запросе к бэкенду, секунд
+BACKEND_CONNECT_TIMEOUT = float(os.getenv('BACKEND_CONNECT_TIMEOUT', 5))
+BACKEND_READ_TIMEOUT = float(os.getenv('BACKEND_READ_TIMEOUT', 15))
+
 # Настройки заполнения строк для отображения Summary
 LJUST_PASS_DEFAULT = 6  # Макс кол-во символов в столбцах 'План' и 'Факт'
 LJUST_DOT_DEFAULT = 15  # Макс кол-во символов в столбце 'Статья'
 
+# Количество строк таблицы на одной странице отчета
+SUMMARY_PAGE_SIZE = int(os.getenv('SUMMARY_PAGE_SIZE', 50))
+
 # Максимальная длина статьи
 MAX_LEN_GROUP_NAME = 15
 
@@ -43,8 +196,14 @@ MAX_TRY_DELETE_MSG = 3
 # Таймаут между попытками удаления сообщений
 TIMEOUT_TRY_DELETE_MSG = 0.5
 
+# Время накопления сообщений чата для удаления одним запросом, секунд
+CLEANUP_BATCH_DELAY = float(os.getenv('CLEANUP_BATCH_DELAY', 0.2))
+
+# Максимальное количество сообщений в одном запросе deleteMessages
+MAX_DELETE_MESSAGES = 100
+
 # Настройки логирования
-LOG_FOLDER = 'logs/'
+LOG_FOLDER = os.getenv('LOG_FOLDER', 'logs/')
 LOG_MAX_SIZE_BYTES = 1024 * 1024
 ROTATING_FILE_COUNT = 10
 LOG_FILE_ENCODING = 'utf-8'
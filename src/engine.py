@@ -12,11 +12,17 @@ from config import (
     TELEGRAM_BOT_PARSE_MODE
 )
 from utils.backend_client import BackendClient
+from utils.cleanup import CleanupQueue
+from utils.outbox import NotificationOutbox
+from utils.send_queue import SendScheduler
 
 
 bot = Bot(
     token=TELEGRAM_BOT_TOKEN,
     default=DefaultBotProperties(parse_mode=TELEGRAM_BOT_PARSE_MODE)
 )
+bot.session.middleware(SendScheduler())
+outbox = NotificationOutbox(bot)
+cleanup = CleanupQueue(bot)
 backend_client = BackendClient(BACKEND_URL, AUTH_HEADERS)
 sentry_sdk.init(dsn=GLITCHTIP_DSN)
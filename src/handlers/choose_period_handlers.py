@@ -4,6 +4,7 @@ from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
 
 from engine import backend_client
+from utils import render
 from utils.exceptions import BackendError
 from utils.keyboards import FamilyFinanceKb
 from handlers.main_handlers import start_callback
@@ -37,7 +38,8 @@ async def choose_period(callback: types.CallbackQuery, state: FSMContext):
 
     # Если настройки не были изменены, отправка сообщения об ошибке.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=FamilyFinanceKb.go_to_main()
         )
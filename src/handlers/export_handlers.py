@@ -1,25 +1,60 @@
+import logging
+
 from aiogram import Router, F, types
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 
+from config import EXPORT_DEADLINE
 from engine import backend_client, bot
 from utils.exceptions import BackendError
-from utils import keyboards
+from utils import keyboards, render
 
+logger = logging.getLogger(__name__)
 router = Router()
 router.message.filter(F.chat.type.in_('private'))
 
 
-@router.callback_query(F.data == 'export_excel')
+@router.callback_query(
+    F.data == 'export_excel',
+    flags={'deadline': EXPORT_DEADLINE}
+)
 async def export_excel(callback: types.CallbackQuery, state: FSMContext):
-    """Экспорт в Excel."""
+    """
+    Экспорт в Excel.
+    Если данные пространства не менялись с прошлого экспорта,
+    повторно отправляется уже загруженный в Telegram файл (file_id).
+    Если Telegram не принимает file_id, файл загружается заново.
+    Бюджет времени продлен до EXPORT_DEADLINE (см. DeadlineFlagMiddleware).
+    """
     try:
-        file_from_buffer = await backend_client.get_export_excel(
-            callback.from_user.id
-        )
-        await bot.send_document(
-            callback.from_user.id,
-            file_from_buffer
+        export_key = await backend_client.export_key(callback.from_user.id)
+        file_id = (
+            backend_client.export_cache.get(export_key)
+            if export_key else None
         )
+        if file_id:
+            try:
+                await bot.send_document(callback.from_user.id, file_id)
+
+            # file_id недействителен или устарел - файл загружается заново.
+            except TelegramBadRequest as e:
+                logger.warning(f'Не удалось отправить {file_id=}: {e}')
+                backend_client.export_cache.invalidate(export_key)
+                file_id = None
+        if not file_id:
+            export_file = await backend_client.get_export_excel(
+                callback.from_user.id
+            )
+            with export_file:
+                message = await bot.send_document(
+                    callback.from_user.id,
+                    export_file
+                )
+            if export_key and message.document:
+                backend_client.export_cache.set(
+                    export_key,
+                    message.document.file_id
+                )
         await bot.send_message(
             callback.from_user.id,
             'Файл отправлен',
@@ -27,7 +62,8 @@ async def export_excel(callback: types.CallbackQuery, state: FSMContext):
         )
         await callback.message.delete()
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -8,15 +8,15 @@ from aiogram.fsm.context import FSMContext
 
 import messages.main_texts as main_texts
 from engine import backend_client
-from messages.main_texts import get_summary_text
 from messages.texts import GENERAL_DESCRIPTION
-from utils import keyboards
+from utils import keyboards, render
 from utils.exceptions import BackendError
 from utils.fsm import CreateGroupState, DeleteGroupState, AddTransaction
 from utils.middlewares import (
     AuthMessageMiddleware,
     AuthCallbackMiddleware
 )
+from utils.models import User
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -30,7 +30,7 @@ router.callback_query.middleware(AuthCallbackMiddleware())
 
 
 @router.message(Command('start'))
-async def start(message: types.Message, state: FSMContext):
+async def start(message: types.Message, state: FSMContext, user: User):
     """
     Команда /start.
     Выводит начальный экран.
@@ -40,17 +40,6 @@ async def start(message: types.Message, state: FSMContext):
     # Очистка состояний.
     await state.clear()
 
-    # Получение пользователя.
-    try:
-        user = await backend_client.get_user(message.from_user.id)
-
-    # Отправка ошибки.
-    except BackendError as e:
-        await message.answer(
-            str(e),
-            reply_markup=keyboards.FamilyFinanceKb.go_to_main()
-        )
-
     # Если период не выбран, предлагает выбрать.
     if not (
         user.core_settings.current_month and user.core_settings.current_year
@@ -75,7 +64,11 @@ async def start(message: types.Message, state: FSMContext):
 
 
 @router.callback_query(F.data == 'start')
-async def start_callback(callback: types.CallbackQuery, state: FSMContext):
+async def start_callback(
+        callback: types.CallbackQuery,
+        state: FSMContext,
+        user: User = None
+):
     """
     Callback 'start'.
     Выводит начальный экран.
@@ -85,20 +78,24 @@ async def start_callback(callback: types.CallbackQuery, state: FSMContext):
     # Очистка состояний.
     await state.clear()
 
-    # Получение пользователя.
     try:
-        user = await backend_client.get_user(callback.from_user.id)
+        # Получение пользователя, если он не передан мидлварью
+        # (например, при вызове после изменения настроек).
+        if user is None:
+            user = await backend_client.get_user(callback.from_user.id)
 
         # Если период не выбран, предлагает выбрать.
         if not (user.core_settings.current_month and user.core_settings.current_year):
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 main_texts.CHOOSE_PERIOD,
                 reply_markup=keyboards.SettingsKb.generate_choose_period()
             )
 
         # Если период выбран, выводит начальное сообщение.
         else:
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 main_texts.MAIN_TEXT.format(
                     first_name=callback.from_user.first_name,
                     user_id=callback.from_user.id,
@@ -111,7 +108,8 @@ async def start_callback(callback: types.CallbackQuery, state: FSMContext):
 
     # Отправка ошибки.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -126,14 +124,17 @@ async def add_registration(callback: types.CallbackQuery, state: FSMContext):
 
     try:
         # Получение пользователя.
-        # Перепроверка, если пользователь зарегистрировался на сайте.
+        # Перепроверка, если пользователь зарегистрировался на сайте:
+        # кешированный результат "не зарегистрирован" сбрасывается.
+        backend_client.invalidate_user(callback.from_user.id)
         user = await backend_client.get_user(callback.from_user.id)
 
         # Если пользователь уже зарегистрирован, переходим к главному экрану.
         if user:
-            await start_callback(callback, state)
+            await start_callback(callback, state, user)
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -146,7 +147,8 @@ async def add_registration(callback: types.CallbackQuery, state: FSMContext):
 
             # Отображение главного экрана.
             user = await backend_client.get_user(callback.from_user.id)
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 main_texts.MAIN_TEXT.format(
                     first_name=callback.from_user.first_name,
                     user_id=callback.from_user.id,
@@ -159,7 +161,8 @@ async def add_registration(callback: types.CallbackQuery, state: FSMContext):
 
         # Если пользователь не создан, сообщение об ошибке.
         except BackendError as e:
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 str(e),
                 reply_markup=keyboards.FamilyFinanceKb.go_to_main()
             )
@@ -176,7 +179,8 @@ async def choose_period_callback(
     await state.clear()
 
     # Отправка сообщения с выбором периодов.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         main_texts.CHOOSE_PERIOD,
         reply_markup=keyboards.SettingsKb.generate_choose_period()
     )
@@ -190,40 +194,62 @@ async def settings_callback(callback: types.CallbackQuery, state: FSMContext):
     await state.clear()
 
     # Отправка сообщения с настройками.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         main_texts.SETTINGS,
         reply_markup=keyboards.SettingsKb.settings()
     )
 
 
-@router.callback_query(F.data == 'look_base')
+@router.callback_query(F.data.startswith('look_base'))
 async def look_summary(callback: types.CallbackQuery, state: FSMContext):
-    """Просмотр отчета за определенный период."""
+    """
+    Просмотр отчета за определенный период.
+    Номер страницы передается в callback: look_base_{page}.
+    """
 
     # Очистка состояний.
     await state.clear()
 
+    page = int(callback.data.removeprefix('look_base').lstrip('_') or 0)
+
     try:
         # Получение summary от бэкенда.
-        summary = await backend_client.get_summary(callback.from_user.id)
+        index = await backend_client.get_summary_index(callback.from_user.id)
 
         # Если summary пустое, отправка сообщения об отсутствии данных.
-        if summary is None:
-            await callback.message.edit_text(
+        if index.summary is None:
+            await render.edit_text(
+                callback.message,
                 main_texts.EMPTY_SUMMARY,
                 reply_markup=keyboards.WorkWithBase.main_menu()
             )
-
-        # Вывод отчета о summary.
-        else:
-            await callback.message.edit_text(
-                get_summary_text(summary),
-                reply_markup=keyboards.WorkWithBase.look_base()
-            )
+            return
+
+        # Страница отчета того же периода и версии уже отрисована
+        # для участника пространства.
+        key = backend_client.summary_version_key(index)
+        cached = main_texts.summary_text_cache.get((key, page))
+
+        if cached is None:
+            pages = main_texts.summary_pages(index)
+            page = max(0, min(page, pages - 1))
+            cached = main_texts.get_summary_page(index, page), page, pages
+            if key is not None:
+                main_texts.summary_text_cache.set((key, page), cached)
+
+        # Вывод страницы отчета о summary.
+        text, page, pages = cached
+        await render.edit_text(
+            callback.message,
+            text,
+            reply_markup=keyboards.WorkWithBase.look_base(page, pages)
+        )
 
     # Отправка сообщения об ошибке.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -240,7 +266,8 @@ async def create_group(callback: types.CallbackQuery, state: FSMContext):
     await state.set_state(CreateGroupState.get_type)
 
     # Отправка сообщения о выборе типа статьи.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         main_texts.CREATE_GROUP,
         reply_markup=keyboards.WorkWithBase.choose_type()
     )
@@ -257,7 +284,8 @@ async def delete_group(callback: types.CallbackQuery, state: FSMContext):
     await state.set_state(DeleteGroupState.get_type)
 
     # Отправка сообщения о выборе типа статьи.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         main_texts.DELETE_GROUP,
         reply_markup=keyboards.WorkWithBase.choose_type()
     )
@@ -274,7 +302,8 @@ async def add_transaction(callback: types.CallbackQuery, state: FSMContext):
     await state.set_state(AddTransaction.get_type)
 
     # Отправка сообщения о выборе типа статьи.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         main_texts.ADD_TRANSACTION,
         reply_markup=keyboards.WorkWithBase.choose_type()
     )
@@ -291,7 +320,8 @@ async def show_general_description(
     await state.clear()
 
     # Отправка общего описания.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         GENERAL_DESCRIPTION,
         reply_markup=keyboards.FamilyFinanceKb.go_to_main()
     )
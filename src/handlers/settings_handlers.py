@@ -5,40 +5,41 @@ import logging
 from aiogram import Router, F, types
 from aiogram.fsm.context import FSMContext
 
-from engine import backend_client, bot
+from engine import backend_client, cleanup
 from handlers.main_handlers import start_callback
 from messages import setting_texts
 from messages.texts import JOINT_CHAT_INSTRUCTION, LINKED_ACCOUNTS_INSTRUCTION
-from utils import keyboards as kb, keyboards
+from utils import keyboards as kb, keyboards, render
 from utils.exceptions import BackendError
 from utils.fsm import LinkedAccounts, JointChat, ChooseArchive
+from utils.middlewares import AuthCallbackMiddleware, AuthMessageMiddleware
+from utils.models import User
 
 logger = logging.getLogger(__name__)
 router = Router()
 router.message.filter(F.chat.type.in_('private'))
 
+# Мидлвари.
+router.message.middleware(AuthMessageMiddleware())
+router.callback_query.middleware(AuthCallbackMiddleware())
+
 
 @router.callback_query(F.data == 'linked_accounts')
-async def manage_linked_accounts(
-        callback: types.CallbackQuery,
-        state: FSMContext
-):
+async def manage_linked_accounts(callback: types.CallbackQuery, user: User):
     """Управление связанными аккаунтами."""
 
-    # Получение пользователя и запись его в состояние.
-    user = await backend_client.get_user(callback.from_user.id)
-    await state.update_data(user=user)
-
     # Проверка является ли пользователь владельцем space.
     if user.core_settings.current_space.owner_id != user.id:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             setting_texts.NOT_OWNER_SPACE,
             reply_markup=kb.SettingsKb.back_to_settings()
         )
 
     # Проверка наличия доступных пользователей в текущем Space.
     elif not user.core_settings.current_space.available_linked_users:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             setting_texts.NOT_LINKED_USERS.format(
                 space_name=user.core_settings.current_space.name
             ),
@@ -47,7 +48,8 @@ async def manage_linked_accounts(
 
     # Если есть доступные пользователи, выводит список связанных аккаунтов.
     else:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             setting_texts.list_linked_users(user.core_settings.current_space),
             reply_markup=keyboards.SettingsKb.manage_linked_accounts()
         )
@@ -56,7 +58,8 @@ async def manage_linked_accounts(
 @router.callback_query(F.data == 'linked_accounts_instruction')
 async def linked_accounts_instruction(callback: types.CallbackQuery):
     """Инструкция для предоставления доступа другим пользователям."""
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         LINKED_ACCOUNTS_INSTRUCTION,
         reply_markup=kb.SettingsKb.back_to_settings()
     )
@@ -73,7 +76,8 @@ async def get_id_linked_account(
     await state.set_state(LinkedAccounts.get_id_linked_account_for_add)
 
     # Отправка сообщения о запросе ID телеграм-аккаунта.
-    msg = await callback.message.edit_text(
+    msg = await render.edit_text(
+        callback.message,
         setting_texts.GET_ID_FOR_LINK_USER,
         reply_markup=kb.SettingsKb.back_to_settings()
     )
@@ -83,7 +87,11 @@ async def get_id_linked_account(
 
 
 @router.message(LinkedAccounts.get_id_linked_account_for_add)
-async def add_linked_account(message: types.Message, state: FSMContext):
+async def add_linked_account(
+        message: types.Message,
+        state: FSMContext,
+        user: User
+):
     """Предоставления доступа."""
 
     # Удаление пробелов
@@ -104,9 +112,6 @@ async def add_linked_account(message: types.Message, state: FSMContext):
 
     # Если подключаемый пользователь существует.
     else:
-        # Получение пользователя из состояния.
-        user = data['user']
-
         try:
             # Запрос на предоставление доступа пользователю.
             await backend_client.link_user_to_space(
@@ -128,9 +133,8 @@ async def add_linked_account(message: types.Message, state: FSMContext):
                 reply_markup=kb.SettingsKb.back_to_settings()
             )
 
-    # Удаление предыдущего сообщения пользователя и бота.
-    await bot.delete_message(message.from_user.id, data['msg_id'])
-    await message.delete()
+    # Удаление предыдущих сообщений пользователя и бота в фоне.
+    cleanup.delete(message.chat.id, message.message_id, data['msg_id'])
 
     # Очистка состояния.
     await state.clear()
@@ -139,19 +143,17 @@ async def add_linked_account(message: types.Message, state: FSMContext):
 @router.callback_query(F.data == 'linked_accounts_delete')
 async def choose_delete_linked_account(
         callback: types.CallbackQuery,
-        state: FSMContext
+        state: FSMContext,
+        user: User
 ):
     """Получение данных для отзыва доступа у подключенного пользователя."""
 
-    # Получение пользователя из состояния.
-    data = await state.get_data()
-    user = data['user']
-
     # Установка состояния для получения удаляемого пользователя.
     await state.set_state(LinkedAccounts.get_id_linked_account_for_delete)
 
     # Отправка сообщения для получения удаляемого пользователя.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         setting_texts.GET_USER_FOR_UNLINK,
         reply_markup=kb.SettingsKb.generate_users_for_unlink(
             user.core_settings.current_space.available_linked_users
@@ -162,14 +164,11 @@ async def choose_delete_linked_account(
 @router.callback_query(LinkedAccounts.get_id_linked_account_for_delete)
 async def delete_linked_account(
         callback: types.CallbackQuery,
-        state: FSMContext
+        state: FSMContext,
+        user: User
 ):
     """Отзыв доступа."""
 
-    # Получение удаляемого пользователя из состояния.
-    data = await state.get_data()
-    user = data['user']
-
     try:
         # Отправка запроса на отключение пользователя.
         await backend_client.unlink_user_to_space(
@@ -178,14 +177,16 @@ async def delete_linked_account(
             int(callback.data)
         )
         # Отправка сообщения об успешном/неуспешном выполнении запроса.
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             setting_texts.SUCCESS_UNLINK_USER,
             reply_markup=keyboards.SettingsKb.settings()
         )
 
     # Отправка сообщения в случае ошибки.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.SettingsKb.settings()
         )
@@ -196,14 +197,12 @@ async def delete_linked_account(
 
 
 @router.callback_query(F.data == 'choose_space')
-async def choose_base(callback: types.CallbackQuery):
+async def choose_base(callback: types.CallbackQuery, user: User):
     """Сообщение для выбора из доступных Spaces."""
 
-    # Получение пользователя.
-    user = await backend_client.get_user(callback.from_user.id)
-
     # Отправка сообщения с выбором доступных Spaces в инлайн клавиатуре.
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         setting_texts.CHOOSE_SPACE,
         reply_markup=keyboards.SettingsKb.generate_choose_space(
             user.id,
@@ -213,16 +212,13 @@ async def choose_base(callback: types.CallbackQuery):
 
 
 @router.callback_query(F.data.startswith('choose_space_'))
-async def accept_choose_base(callback: types.CallbackQuery, state: FSMContext):
+async def accept_choose_base(callback: types.CallbackQuery, user: User):
     """Обработка выбора Space."""
 
     # Получение идентификатора нового Space.
     new_space_id = callback.data.split('_')[2]
 
     try:
-        # Получение пользователя.
-        user = await backend_client.get_user(callback.from_user.id)
-
         # Проверка наличия выбранного Space в разрешенных.
         for space in user.spaces + user.available_linked_spaces:
 
@@ -238,7 +234,8 @@ async def accept_choose_base(callback: types.CallbackQuery, state: FSMContext):
                 # Если настройки успешно изменены,
                 # отправляем сообщение об успешном изменении.
                 if core_settings:
-                    await callback.message.edit_text(
+                    await render.edit_text(
+                        callback.message,
                         setting_texts.SUCCESS_UPDATE_SPACE.format(
                             space_name=space.name,
                             current_month=user.core_settings.current_month,
@@ -253,7 +250,8 @@ async def accept_choose_base(callback: types.CallbackQuery, state: FSMContext):
                         'Ошибка обновления space пользователя '
                         f'{new_space_id=} {user=}'
                     )
-                    await callback.message.edit_text(
+                    await render.edit_text(
+                        callback.message,
                         setting_texts.FAIL_UPDATE_SPACE,
                         reply_markup=keyboards.SettingsKb.back_to_settings()
                     )
@@ -262,31 +260,35 @@ async def accept_choose_base(callback: types.CallbackQuery, state: FSMContext):
 
     # Отправка сообщения в случае ошибки BackendError.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.SettingsKb.back_to_settings()
         )
 
 
 @router.callback_query(F.data == 'joint_chat')
-async def manage_joint_chat(callback: types.CallbackQuery, state: FSMContext):
+async def manage_joint_chat(
+        callback: types.CallbackQuery,
+        state: FSMContext,
+        user: User
+):
     """Обработка запроса на подключение чата."""
 
-    # Получение пользователя.
-    user = await backend_client.get_user(callback.from_user.id)
-
     # Проверка является ли пользователь владельцем Space.
     if int(user.core_settings.current_space.owner_id) != int(user.id):
 
         # Если нет, выдаем сообщение об ошибке и возвращаемся в настройки.
-        msg = await callback.message.edit_text(
+        msg = await render.edit_text(
+            callback.message,
             setting_texts.NOT_OWNER_SPACE,
             reply_markup=kb.SettingsKb.back_to_settings()
         )
 
     # Если чат уже подключен, выводим сообщение об этом.
     elif linked_chat := user.core_settings.current_space.linked_chat:
-        msg = await callback.message.edit_text(
+        msg = await render.edit_text(
+            callback.message,
             setting_texts.LINKED_CHAT_CONNECTED.format(
                 linked_chat=linked_chat
             ),
@@ -299,7 +301,8 @@ async def manage_joint_chat(callback: types.CallbackQuery, state: FSMContext):
         await state.set_state(JointChat.get_id_joint_chat)
 
         # Запрос у пользователя номера чата.
-        msg = await callback.message.edit_text(
+        msg = await render.edit_text(
+            callback.message,
             setting_texts.GET_LINKED_CHAT_ID,
             reply_markup=kb.SettingsKb.joint_chat_add()
         )
@@ -309,15 +312,16 @@ async def manage_joint_chat(callback: types.CallbackQuery, state: FSMContext):
 
 
 @router.message(JointChat.get_id_joint_chat)
-async def joint_chat_add(message: types.Message, state: FSMContext):
+async def joint_chat_add(
+        message: types.Message,
+        state: FSMContext,
+        user: User
+):
     """Добавление чата для уведомлений."""
 
     # Получение данных из состояния.
     data = await state.get_data()
 
-    # Получение пользователя.
-    user = await backend_client.get_user(message.from_user.id)
-
     # Удаление пробелов из введенного пользователем текста.
     cleaned_message = message.text.strip()
 
@@ -348,21 +352,17 @@ async def joint_chat_add(message: types.Message, state: FSMContext):
         )
 
     finally:
-        # Удаление предыдущих сообщений пользователя и бота.
-        await bot.delete_message(message.from_user.id, data["msg_id"])
-        await message.delete()
+        # Удаление предыдущих сообщений пользователя и бота в фоне.
+        cleanup.delete(message.chat.id, message.message_id, data['msg_id'])
 
         # Очистка состояния.
         await state.clear()
 
 
 @router.callback_query(F.data == 'joint_chat_delete')
-async def joint_chat_delete(callback: types.CallbackQuery):
+async def joint_chat_delete(callback: types.CallbackQuery, user: User):
     """Обработка запроса на отключение чата."""
 
-    # Получение пользователя.
-    user = await backend_client.get_user(callback.from_user.id)
-
     try:
         # Отправка запроса на отключение чата.
         await backend_client.update_space(
@@ -372,7 +372,8 @@ async def joint_chat_delete(callback: types.CallbackQuery):
         )
 
         # Если изменения успешно внесены, уведомляем пользователя.
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             setting_texts.SUCCESS_DISABLE_LINK_CHAT.format(
                 current_space=user.core_settings.current_space.name,
                 current_month=user.core_settings.current_month,
@@ -383,7 +384,8 @@ async def joint_chat_delete(callback: types.CallbackQuery):
 
     # Если изменения не внесены, уведомляем пользователя.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.SettingsKb.back_to_settings()
         )
@@ -392,7 +394,8 @@ async def joint_chat_delete(callback: types.CallbackQuery):
 @router.callback_query(F.data == 'joint_chat_instruction')
 async def joint_chat_instruction(callback: types.CallbackQuery):
     """Инструкция по подключению чата."""
-    await callback.message.edit_text(
+    await render.edit_text(
+        callback.message,
         JOINT_CHAT_INSTRUCTION,
         reply_markup=kb.SettingsKb().back_to_settings()
     )
@@ -409,7 +412,8 @@ async def all_periods_get_year(callback: types.CallbackQuery, state: FSMContext)
         years = await backend_client.get_all_years(callback.from_user.id)
 
         # Отправка сообщения с выбором года.
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             'Выберите год 👇\n',
             reply_markup=kb.SettingsKb.generate_choose_all_years_in_space(sorted(years, reverse=True, key=int))
         )
@@ -417,7 +421,8 @@ async def all_periods_get_year(callback: types.CallbackQuery, state: FSMContext)
 
     # Отправка сообщения в случае ошибки бэкенда.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -435,7 +440,8 @@ async def all_periods_get_month(callback: types.CallbackQuery, state: FSMContext
         months = await backend_client.get_all_months_in_year(callback.from_user.id, int(callback.data.split('_')[3]))
 
         # Отправка сообщения с выбором месяца.
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             'Выберите месяц 👇',
             reply_markup=kb.SettingsKb.generate_choose_month_in_year(sorted(months, key=int))
         )
@@ -445,7 +451,8 @@ async def all_periods_get_month(callback: types.CallbackQuery, state: FSMContext
 
     # Отправка сообщения в случае ошибки бэкенда.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -476,7 +483,8 @@ async def all_periods_set_new_period(callback: types.CallbackQuery, state: FSMCo
 
     # Отправка сообщения в случае ошибки бэкенда.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -3,10 +3,9 @@
 from decimal import Decimal
 
 from aiogram import F, Router, types
-from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 
-from engine import backend_client, bot
+from engine import backend_client, cleanup, outbox
 from messages import transaction_texts
 from utils.exceptions import BackendError
 from utils.fsm import (
@@ -14,12 +13,18 @@ from utils.fsm import (
     DeleteGroupState,
     AddTransaction
 )
-from utils import keyboards
+from utils import keyboards, render
+from utils.middlewares import AuthCallbackMiddleware, AuthMessageMiddleware
+from utils.models import User
 from utils.validators import validate_group_name, validate_digit_value
 
 router = Router()
 router.message.filter(F.chat.type.in_('private'))
 
+# Мидлвари.
+router.message.middleware(AuthMessageMiddleware())
+router.callback_query.middleware(AuthCallbackMiddleware())
+
 
 @router.callback_query(CreateGroupState.get_type)
 async def create_group_get_type(
@@ -35,7 +40,8 @@ async def create_group_get_type(
     await state.set_state(CreateGroupState.get_name)
 
     # Отправка сообщения о вводе названия статьи.
-    msg = await callback.message.edit_text(
+    msg = await render.edit_text(
+        callback.message,
         transaction_texts.GET_NAME_FOR_CREATE_GROUP,
         reply_markup=keyboards.FamilyFinanceKb.go_to_main()
     )
@@ -97,14 +103,8 @@ async def create_group_get_name(message: types.Message, state: FSMContext):
         )
 
     finally:
-        # Удаление предыдущего сообщения пользователя.
-        await message.delete()
-
-        # Удаление предыдущего сообщения бота.
-        try:
-            await bot.delete_message(message.from_user.id, data['msg_id'])
-        except TelegramBadRequest:
-            await message.edit_text('-')
+        # Удаление предыдущих сообщений пользователя и бота в фоне.
+        cleanup.delete(message.chat.id, message.message_id, data['msg_id'])
 
         # Сохранение в состоянии номера сообщения.
         await state.update_data(msg_id=msg.message_id)
@@ -113,7 +113,8 @@ async def create_group_get_name(message: types.Message, state: FSMContext):
 @router.message(CreateGroupState.get_plan_value)
 async def create_group_get_plan_value(
         message: types.Message,
-        state: FSMContext
+        state: FSMContext,
+        user: User
 ):
     """Получение, валидация планового значения и создание новой статьи."""
 
@@ -154,13 +155,10 @@ async def create_group_get_plan_value(
                     reply_markup=keyboards.WorkWithBase.main_menu()
                 )
 
-                # Получение настроек пользователя.
-                user = await backend_client.get_user(message.from_user.id)
-
                 # Если есть чат для совместной работы,
                 # отправка сообщения в него.
                 if user.core_settings.current_space.linked_chat:
-                    await bot.send_message(
+                    outbox.notify(
                         user.core_settings.current_space.linked_chat,
                         transaction_texts.NOTICE_TO_JOINT_CHAT_CREATE_GROUP.
                         format(
@@ -188,14 +186,8 @@ async def create_group_get_plan_value(
         # Очистка состояний.
         await state.clear()
 
-        # Удаление предыдущего сообщения пользователя.
-        await message.delete()
-
-        # Удаление предыдущего сообщения бота.
-        try:
-            await bot.delete_message(message.from_user.id, data['msg_id'])
-        except TelegramBadRequest:
-            await message.edit_text('-')
+        # Удаление предыдущих сообщений пользователя и бота в фоне.
+        cleanup.delete(message.chat.id, message.message_id, data['msg_id'])
 
 
 @router.callback_query(DeleteGroupState.get_type)
@@ -216,8 +208,9 @@ async def delete_group_get_type(
         )
 
         # Если статей нет, отправка сообщения об этом.
-        if not summary.summary:
-            await callback.message.edit_text(
+        if summary is None or not summary.summary:
+            await render.edit_text(
+                callback.message,
                 transaction_texts.GROUPS_NOT_EXIST,
                 reply_markup=keyboards.FamilyFinanceKb.go_to_main()
             )
@@ -231,20 +224,25 @@ async def delete_group_get_type(
             await state.set_state(DeleteGroupState.get_name)
 
             # Отправка сообщения о выборе имени статьи.
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 transaction_texts.GET_NAME_FOR_DELETE_GROUP,
                 reply_markup=keyboards.WorkWithBase.choose_group_name(summary)
             )
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
 
 
 @router.callback_query(DeleteGroupState.get_name)
-async def delete_group_get_name(callback: types.CallbackQuery,
-                                state: FSMContext):
+async def delete_group_get_name(
+        callback: types.CallbackQuery,
+        state: FSMContext,
+        user: User
+):
     """Получение имени статьи и её удаление."""
 
     # Получение данных из состояния.
@@ -270,7 +268,8 @@ async def delete_group_get_name(callback: types.CallbackQuery,
             type_value = 'Доход' if data['type'] == 'income' else 'Расход'
 
             # Отправка сообщения об успешном удалении статьи.
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 transaction_texts.SUCCESS_DELETE_GROUP.format(
                     group_name=group.group_name,
                     type_value=type_value
@@ -278,12 +277,9 @@ async def delete_group_get_name(callback: types.CallbackQuery,
                 reply_markup=keyboards.WorkWithBase.main_menu()
             )
 
-            # Получение данных о пользователе.
-            user = await backend_client.get_user(callback.from_user.id)
-
             # Если есть чат для совместной работы, отправка сообщения в него.
             if user.core_settings.current_space.linked_chat:
-                await bot.send_message(
+                outbox.notify(
                     user.core_settings.current_space.linked_chat,
                     transaction_texts.NOTICE_TO_JOINT_CHAT_DELETE_GROUP.format(
                         first_name=callback.from_user.first_name,
@@ -298,7 +294,8 @@ async def delete_group_get_name(callback: types.CallbackQuery,
 
     # Отправка сообщения в случае ошибки.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -319,8 +316,9 @@ async def add_transaction_get_type(
         )
 
         # Если статей нет, отправляется сообщение об этом.
-        if not summary.summary:
-            await callback.message.edit_text(
+        if summary is None or not summary.summary:
+            await render.edit_text(
+                callback.message,
                 transaction_texts.GROUPS_NOT_EXIST,
                 reply_markup=keyboards.FamilyFinanceKb.go_to_main()
             )
@@ -334,13 +332,15 @@ async def add_transaction_get_type(
             await state.set_state(AddTransaction.get_group)
 
             # Отправка сообщения для выбора статьи.
-            await callback.message.edit_text(
+            await render.edit_text(
+                callback.message,
                 transaction_texts.GET_GROUP_ADD_TRANSACTION,
                 reply_markup=keyboards.WorkWithBase.choose_group_name(summary)
             )
     # Отправка сообщения в случае ошибки.
     except BackendError as e:
-        await callback.message.edit_text(
+        await render.edit_text(
+            callback.message,
             str(e),
             reply_markup=keyboards.FamilyFinanceKb.go_to_main()
         )
@@ -354,21 +354,22 @@ async def add_transaction_get_group(
     """Получение статьи и запрос значения транзакции."""
 
     # Получение id статьи и запись в состояние.
-    group_id = callback.data.split('_')[2]
+    # Название статьи не сохраняется, оно берется из индекса отчета.
+    group_id = int(callback.data.split('_')[2])
     await state.update_data(group_id=group_id)
 
-    # Получение статьи и её запись имени в состояние.
+    # Получение статьи.
     group = await backend_client.get_group(
         callback.from_user.id,
         group_id
     )
-    await state.update_data(group_name=group.group_name)
 
     # Установка состояния для получения значения транзакции.
     await state.set_state(AddTransaction.get_value)
 
     # Отправка сообщения для получения значения транзакции.
-    msg = await callback.message.edit_text(
+    msg = await render.edit_text(
+        callback.message,
         transaction_texts.GET_VALUE_ADD_TRANSACTION.format(
             group_name=group.group_name
         ),
@@ -418,14 +419,8 @@ async def add_transaction_get_value(message: types.Message, state: FSMContext):
         )
 
     finally:
-        # Удаление предыдущего сообщения пользователя.
-        await message.delete()
-
-        # Удаление предыдущего сообщения бота.
-        try:
-            await bot.delete_message(message.from_user.id, data['msg_id'])
-        except TelegramBadRequest:
-            await message.edit_text('-')
+        # Удаление предыдущих сообщений пользователя и бота в фоне.
+        cleanup.delete(message.chat.id, message.message_id, data['msg_id'])
 
         # Запись ID нового сообщения в состояние.
         await state.update_data(msg_id=msg.message_id)
@@ -434,7 +429,8 @@ async def add_transaction_get_value(message: types.Message, state: FSMContext):
 @router.message(AddTransaction.get_description)
 async def add_transaction_get_description(
         message: types.Message,
-        state: FSMContext
+        state: FSMContext,
+        user: User
 ):
     """Получение описания транзакции и сохранение."""
 
@@ -452,7 +448,7 @@ async def add_transaction_get_description(
         transaction = await backend_client.add_transaction(
             message.from_user.id,
             data['type'],
-            data['group_name'],
+            old_group.group_name,
             message.text,
             Decimal(str(data['value']))
         )
@@ -460,9 +456,6 @@ async def add_transaction_get_description(
         # Человекочитаемый тип статьи.
         type_transaction = 'Доход' if data['type'] == 'income' else 'Расход'
 
-        # Получение данных о пользователе.
-        user = await backend_client.get_user(message.from_user.id)
-
         # Отправка сообщения об успешном добавлении транзакции.
         old_value = round(old_group.fact_value / 1000, 2)
         new_value = old_value + round(transaction.value_transaction / 1000, 2)
@@ -471,7 +464,7 @@ async def add_transaction_get_description(
                 current_month=user.core_settings.current_month,
                 current_year=user.core_settings.current_year,
                 type_transaction=type_transaction,
-                group_name=data['group_name'],
+                group_name=old_group.group_name,
                 old_value=old_value,
                 new_value=new_value,
                 description=transaction.description
@@ -481,7 +474,7 @@ async def add_transaction_get_description(
 
         # Если есть чат для совместной работы, отправка сообщения в него.
         if user.core_settings.current_space.linked_chat:
-            await bot.send_message(
+            outbox.notify(
                 user.core_settings.current_space.linked_chat,
                 transaction_texts.NOTICE_TO_JOINT_CHAT_ADD_TRANSACTION.format(
                     first_name=message.from_user.first_name,
@@ -490,7 +483,7 @@ async def add_transaction_get_description(
                     current_month=user.core_settings.current_month,
                     current_year=user.core_settings.current_year,
                     type_transaction=type_transaction,
-                    group_name=data['group_name'],
+                    group_name=old_group.group_name,
                     value_transaction=round(
                         transaction.value_transaction / 1000, 2
                     ),
@@ -506,14 +499,8 @@ async def add_transaction_get_description(
         )
 
     finally:
-        # Удаление предыдущего сообщения пользователя.
-        await message.delete()
-
-        # Удаление предыдущего сообщения бота.
-        try:
-            await bot.delete_message(message.from_user.id, data['msg_id'])
-        except TelegramBadRequest:
-            await message.edit_text('-')
+        # Удаление предыдущих сообщений пользователя и бота в фоне.
+        cleanup.delete(message.chat.id, message.message_id, data['msg_id'])
 
         # Очистка состояния.
         await state.clear()
@@ -2,9 +2,17 @@ import asyncio
 import logging
 
 from aiogram import Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiohttp import web
 
-from engine import bot
+from config import (
+    BOT_MODE,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET
+)
+from engine import backend_client, bot, cleanup, outbox
 from handlers import (
     main_handlers,
     transaction_handlers,
@@ -14,11 +22,20 @@ from handlers import (
     get_id_handlers,
     export_handlers
 )
-from messages.errors import UNEXPECTED_ERROR
+from messages.errors import UNEXPECTED_ERROR, WEBHOOK_SETTINGS_ERROR
+from utils.fsm_storage import create_storage
+from utils.metrics import collect
+from utils.middlewares import (
+    CallbackDedupMiddleware,
+    DeadlineFlagMiddleware,
+    DeadlineMiddleware,
+    ThrottlingMiddleware
+)
+from utils.webhook import create_health_app, create_webhook_app
 
 logger = logging.getLogger(__name__)
 dp = Dispatcher(
-    storage=MemoryStorage()
+    storage=create_storage()
 )
 dp.include_routers(
     main_handlers.router,
@@ -29,15 +46,100 @@ dp.include_routers(
     get_id_handlers.router,
     export_handlers.router
 )
+dp.update.outer_middleware(ThrottlingMiddleware())
+dp.update.outer_middleware(DeadlineMiddleware())
+dp.callback_query.outer_middleware(CallbackDedupMiddleware())
+dp.message.middleware(DeadlineFlagMiddleware())
+dp.callback_query.middleware(DeadlineFlagMiddleware())
+
+
+@dp.startup()
+async def on_startup():
+    """Открытие пула соединений с бэкендом."""
+    await backend_client.start()
+
+
+@dp.shutdown()
+async def on_shutdown():
+    """
+    Отправка накопленных уведомлений, удаление сообщений из очереди
+    и закрытие пула соединений.
+    """
+    await outbox.close()
+    await cleanup.close()
+    logger.info(f'Метрики при остановке: {collect()}')
+    await backend_client.close()
+
+
+async def on_webhook_startup():
+    """Регистрация webhook в Telegram."""
+    await bot.set_webhook(
+        f'{WEBHOOK_BASE_URL}{WEBHOOK_PATH}',
+        secret_token=WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types()
+    )
 
 
 async def main():
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    """
+    Запуск в режиме polling. /ready, /health и /metrics отдаются на том же
+    порту, что и в режиме webhook, для проверки готовности в k8s.
+    """
+    runner = web.AppRunner(create_health_app(
+        backend_client.is_ready,
+        backend_client.health
+    ))
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+    try:
+        await bot.delete_webhook(drop_pending_updates=True)
+        await dp.start_polling(bot)
+    finally:
+        await runner.cleanup()
+
+
+def check_webhook_settings():
+    """
+    Остановка при незаданных настройках webhook: без WEBHOOK_BASE_URL
+    регистрируется неверный адрес, а без WEBHOOK_SECRET публичный
+    эндпоинт принимает апдейты без проверки секретного токена.
+    """
+    missing = [
+        name for name, value in (
+            ('WEBHOOK_BASE_URL', WEBHOOK_BASE_URL),
+            ('WEBHOOK_SECRET', WEBHOOK_SECRET)
+        )
+        if not value
+    ]
+    if missing:
+        error = WEBHOOK_SETTINGS_ERROR.format(settings=', '.join(missing))
+        logger.critical(error)
+        raise SystemExit(error)
+
+
+def run_webhook():
+    """Запуск в режиме webhook (несколько реплик за k8s Service)."""
+    check_webhook_settings()
+    dp.startup.register(on_webhook_startup)
+    web.run_app(
+        create_webhook_app(
+            dp,
+            bot,
+            WEBHOOK_PATH,
+            WEBHOOK_SECRET,
+            backend_client.is_ready,
+            backend_client.health
+        ),
+        host=WEBHOOK_HOST,
+        port=WEBHOOK_PORT
+    )
 
 
 if __name__ == '__main__':
     try:
-        asyncio.run(main())
+        if BOT_MODE == 'webhook':
+            run_webhook()
+        else:
+            asyncio.run(main())
     except Exception as e:
         logger.exception(UNEXPECTED_ERROR.format(error=e))
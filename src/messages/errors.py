@@ -3,6 +3,9 @@ BASE_ERROR_TEXT = '❗️ {} ❗️'
 UNEXPECTED_ERROR = BASE_ERROR_TEXT.format(
     'Непредвиденная ошибка: {error}'
 )
+WEBHOOK_SETTINGS_ERROR = BASE_ERROR_TEXT.format(
+    'Для BOT_MODE=webhook необходимо указать {settings}'
+)
 CREATE_USER_ERROR = BASE_ERROR_TEXT.format(
     'Ошибка создания пользователя. Попробуйте позже'
 )
@@ -54,3 +57,9 @@ LINK_USER_ERROR = BASE_ERROR_TEXT.format(
 UNLINK_USER_ERROR = BASE_ERROR_TEXT.format(
     'Ошибка при отвязке пользователя от пространства. Попробуйте позже'
 )
+TOO_MANY_REQUESTS = BASE_ERROR_TEXT.format(
+    'Слишком много запросов. Подождите немного'
+)
+DEADLINE_EXCEEDED = BASE_ERROR_TEXT.format(
+    'Запрос выполняется слишком долго. Попробуйте позже'
+)
@@ -1,5 +1,19 @@
-from config import LJUST_DOT_DEFAULT, LJUST_PASS_DEFAULT
-from utils.models import Summary
+from decimal import Decimal
+
+from config import (
+    BACKEND_SUMMARY_CACHE_TTL,
+    LJUST_DOT_DEFAULT,
+    LJUST_PASS_DEFAULT,
+    SUMMARY_PAGE_SIZE,
+    SUMMARY_TEXT_CACHE_SIZE
+)
+from utils.cache import TTLCache
+from utils.summary_index import (
+    NO_EXPENSES,
+    NO_INCOMES,
+    SEPARATOR,
+    SummaryIndex
+)
 
 MAIN_TEXT = (
     '<b>'
@@ -38,56 +52,86 @@ ADD_TRANSACTION = (
     '⌨️'
 )
 
+# Части таблицы отчета.
+SUMMARY_HEADER = (
+    '▶️     <b><u>База:</u> {space_name}\n'
+    '▶️     <u>Период:</u> {month}_{year}</b>\n\n'
+    '<code>'
+    f'{"Статья":.<{LJUST_DOT_DEFAULT}} План  / Факт\n'
+    '-----------------------------\n'
+)
+SUMMARY_LINE = '-----------------------------\n'
+SUMMARY_LINES = {
+    NO_INCOMES: 'Доходов нет\n',
+    SEPARATOR: SUMMARY_LINE,
+    NO_EXPENSES: 'Расходов нет\n'
+}
+SUMMARY_PAGE = '\n▶️     Страница {page} из {pages}'
+TENTH = Decimal('0.1')
+
+# Отрисованные страницы отчетов по ключу версии отчета
+# (space_id, месяц, год из данных отчета, эпоха и версия данных
+# пространства) и странице.
+# Время жизни равно времени жизни кеша отчетов, чтобы изменения,
+# внесенные в обход бота, были видны не позже, чем сейчас.
+summary_text_cache = TTLCache(
+    'summary_text_cache',
+    SUMMARY_TEXT_CACHE_SIZE,
+    BACKEND_SUMMARY_CACHE_TTL
+)
 
-def get_summary_text(summary: Summary) -> str:
 
-    # Начало сообщения
-    text = [
-        f'▶️     <b><u>База:</u> {summary.summary[0].space.name}\n'
-        f'▶️     <u>Период:</u> {summary.summary[0].period_month}_'
-        f'{summary.summary[0].period_year}</b>\n\n'
-        '<code>'
-        f'{'Статья':.<{LJUST_DOT_DEFAULT}} План  / Факт\n'
-        '-----------------------------\n'
-    ]
+def _thousands(value: Decimal) -> str:
+    """
+    Значение в тысячах, округленное до десятых, дополненное пробелами.
+    Равно round(value / 1000, 1), но без деления: сдвиг порядка
+    и округление выполняются за одну операцию quantize.
+    """
+    return str(value.scaleb(-3).quantize(TENTH)).ljust(LJUST_PASS_DEFAULT)
 
-    incomes = []
-    expenses = []
 
-    for group in summary.summary:
-        group_text = (
-            f'{group.group_name:.<{LJUST_DOT_DEFAULT}} '
-            f'{(round(group.plan_value / 1000, 1)):<{LJUST_PASS_DEFAULT}}/ '
-            f'{(round(group.fact_value / 1000, 1)):<{LJUST_PASS_DEFAULT}}\n'
-        )
-        if group.type_transaction == 'income':
-            incomes.append(group_text)
-        else:
-            expenses.append(group_text)
-    if incomes:
-        text.extend(incomes)
-    else:
-        text.append('Доходов нет\n')
-    text.append('-----------------------------\n')
-    if expenses:
-        text.extend(expenses)
-    else:
-        text.append('Расходов нет\n')
-    text.append(
-        '-----------------------------\n'
-        f'{'Доходы':.<{LJUST_DOT_DEFAULT}} '
-        f'{(round(summary.sum_income_plan / 1000, 1)):<{LJUST_PASS_DEFAULT}}/ '
-        f'{(round(summary.sum_income_fact / 1000, 1)):<{LJUST_PASS_DEFAULT}}\n'
-        f'{'Расходы':.<{LJUST_DOT_DEFAULT}} '
-        f'{(round(
-            summary.sum_expense_plan / 1000, 1)):<{LJUST_PASS_DEFAULT}}/ '
-        f'{(round(
-            summary.sum_expense_fact / 1000, 1)):<{LJUST_PASS_DEFAULT}}\n'
-        f'{'Сальдо':.<{LJUST_DOT_DEFAULT}} '
-        f'{(round(
-            summary.balance_plan / 1000, 1)):<{LJUST_PASS_DEFAULT}}/ '
-        f'{(round(
-            summary.balance_fact / 1000, 1)):<{LJUST_PASS_DEFAULT}}\n'
-        f'</code>'
+def _row(name: str, plan: Decimal, fact: Decimal) -> str:
+    """Строка таблицы отчета."""
+    return (
+        f'{name.ljust(LJUST_DOT_DEFAULT, ".")} '
+        f'{_thousands(plan)}/ {_thousands(fact)}\n'
     )
-    return ''.join(text)
+
+
+def summary_pages(index: SummaryIndex, page_size: int = SUMMARY_PAGE_SIZE) -> int:
+    """Количество страниц отчета."""
+    return -(-len(index.lines) // page_size)
+
+
+def get_summary_page(
+        index: SummaryIndex,
+        page: int = 0,
+        page_size: int = SUMMARY_PAGE_SIZE
+) -> str:
+    """
+    Страница отчета за период в виде моноширинной таблицы.
+    Форматируются только строки запрошенной страницы,
+    итоги выводятся на каждой странице.
+    """
+    summary = index.summary
+    first = summary.summary[0]
+    pages = summary_pages(index, page_size)
+    start = page * page_size
+    return ''.join((
+        SUMMARY_HEADER.format(
+            space_name=first.space.name,
+            month=first.period_month,
+            year=first.period_year
+        ),
+        *(
+            SUMMARY_LINES[line] if isinstance(line, str)
+            else _row(line.group_name, line.plan_value, line.fact_value)
+            for line in index.lines[start:start + page_size]
+        ),
+        SUMMARY_LINE,
+        _row('Доходы', summary.sum_income_plan, summary.sum_income_fact),
+        _row('Расходы', summary.sum_expense_plan, summary.sum_expense_fact),
+        _row('Сальдо', summary.balance_plan, summary.balance_fact),
+        '</code>',
+        SUMMARY_PAGE.format(page=page + 1, pages=pages) if pages > 1 else ''
+    ))
@@ -94,3 +94,8 @@ NOTICE_TO_JOINT_CHAT_ADD_TRANSACTION = (
     '💾  Сумма операции: {value_transaction} т.р.\n'
     '💾  Описание: {description}'
 )
+DIGEST_TO_JOINT_CHAT = (
+    '📋  Изменения в базе ({count}):\n'
+    '\n'
+    '{notices}'
+)
@@ -1,38 +1,563 @@
 """Взаимодействие с бэкендом."""
 
+import asyncio
+import contextlib
+import functools
+import json
+import time
 from decimal import Decimal
-from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO
 
 import aiohttp
 import logging
 
-from aiogram.types import BufferedInputFile
 from async_lru import alru_cache
-from pydantic import ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from config import AUTH_HEADERS, BACKEND_GET_USER_ID_TTL
+from config import (
+    AUTH_HEADERS,
+    BACKEND_CONNECT_TIMEOUT,
+    BACKEND_READ_TIMEOUT,
+    BACKEND_DNS_CACHE_TTL,
+    BACKEND_GET_USER_ID_TTL,
+    BACKEND_KEEPALIVE_TIMEOUT,
+    BACKEND_POOL_LIMIT,
+    BACKEND_POOL_LIMIT_PER_HOST,
+    BACKEND_BREAKER_FAILURE_THRESHOLD,
+    BACKEND_BREAKER_RESET_TIMEOUT,
+    BACKEND_RETRY_ATTEMPTS,
+    BACKEND_RETRY_BACKOFF_BASE,
+    BACKEND_RETRY_BACKOFF_MAX,
+    BACKEND_REVALIDATE_CACHE_SIZE,
+    BACKEND_REVALIDATE_CACHE_TTL,
+    BACKEND_REVALIDATE_ENDPOINTS,
+    BACKEND_SINGLE_FLIGHT_ENDPOINTS,
+    BACKEND_STREAM_CHUNK_SIZE,
+    EXPORT_SPOOL_MAX_SIZE,
+    BACKEND_SUMMARY_CACHE_SIZE,
+    BACKEND_SUMMARY_CACHE_TTL,
+    BACKEND_USER_CACHE_SIZE,
+    BACKEND_USER_CACHE_TTL,
+    BACKEND_UNREGISTERED_CACHE_SIZE,
+    BACKEND_UNREGISTERED_CACHE_TTL,
+    EXPORT_CACHE_SIZE,
+    EXPORT_CACHE_TTL,
+    TIMEOUT_SESSION
+)
 from messages import errors
-from utils.exceptions import BackendError
+from utils import deadline
+from utils.cache import TTLCache
+from utils.exceptions import BackendError, CircuitOpenError
+from utils.input_files import SpooledInputFile
+from utils.metrics import Metrics
+from utils.resilience import CircuitBreakers, backoff_delay
+from utils.single_flight import SingleFlight
+from utils.summary_index import SummaryIndex
 from utils.models import (
     User,
+    UserId,
+    UserList,
     Summary,
+    SummaryResponse,
+    SummaryLookup,
     CreatedGroup,
     SummaryDetail,
     Transaction,
     TelegramSettings,
     CoreSettingsUpdate,
-    Space
+    Space,
+    Years,
+    Months
 )
 
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> str:
+        """Сериализация тела запроса через orjson."""
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_dumps = json.dumps
+
 logger = logging.getLogger(__name__)
 
 
+def coalesce(endpoint: str):
+    """
+    Декоратор метода BackendClient: одновременные вызовы с одинаковыми
+    аргументами разделяют один запрос к бэкенду.
+    Применяется, только если endpoint есть в single_flight_endpoints.
+
+    :param endpoint: Имя эндпоинта для настроек и счетчиков.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if endpoint not in self.single_flight_endpoints:
+                return await method(self, *args, **kwargs)
+            key = (
+                endpoint,
+                tuple(str(arg) for arg in args),
+                tuple((k, str(v)) for k, v in sorted(kwargs.items()))
+            )
+            return await self.single_flight.do(
+                key,
+                lambda: method(self, *args, **kwargs),
+                label=endpoint
+            )
+        return wrapper
+    return decorator
+
+
 class BackendClient:
     """Класс для взаимодействия с бэкендом."""
 
-    def __init__(self, backend_url: str, headers: dict = None):
+    def __init__(
+            self,
+            backend_url: str,
+            headers: dict = None,
+            single_flight_endpoints: list[str] = None,
+            revalidate_endpoints: list[str] = None
+    ):
         self.backend_url = backend_url
         self.headers = headers or AUTH_HEADERS
+        self.single_flight_endpoints = frozenset(
+            BACKEND_SINGLE_FLIGHT_ENDPOINTS
+            if single_flight_endpoints is None
+            else single_flight_endpoints
+        )
+        self.single_flight = SingleFlight()
+        self.revalidate_endpoints = frozenset(
+            BACKEND_REVALIDATE_ENDPOINTS
+            if revalidate_endpoints is None
+            else revalidate_endpoints
+        )
+
+        # URL -> (ETag, Last-Modified, разобранный ответ).
+        self.conditional_cache = TTLCache(
+            'conditional_cache',
+            BACKEND_REVALIDATE_CACHE_SIZE,
+            BACKEND_REVALIDATE_CACHE_TTL
+        )
+        self.user_cache = TTLCache(
+            'user_cache',
+            BACKEND_USER_CACHE_SIZE,
+            BACKEND_USER_CACHE_TTL
+        )
+
+        # Telegram ID незарегистрированных пользователей.
+        # Попадания (hits) - сэкономленные запросы к бэкенду.
+        self.unregistered_cache = TTLCache(
+            'unregistered_cache',
+            BACKEND_UNREGISTERED_CACHE_SIZE,
+            BACKEND_UNREGISTERED_CACHE_TTL
+        )
+        self.summary_cache = TTLCache(
+            'summary_cache',
+            BACKEND_SUMMARY_CACHE_SIZE,
+            BACKEND_SUMMARY_CACHE_TTL
+        )
+
+        # Версии данных пространств: увеличиваются при изменении статей
+        # и транзакций. _data_epoch - при изменении в неизвестном
+        # пространстве (устаревают версии всех пространств).
+        self._space_versions: dict[int, int] = {}
+        self._data_epoch = 0
+        self.export_cache = TTLCache(
+            'export_cache',
+            EXPORT_CACHE_SIZE,
+            EXPORT_CACHE_TTL
+        )
+        self.retry_attempts = BACKEND_RETRY_ATTEMPTS
+        self.retry_backoff_base = BACKEND_RETRY_BACKOFF_BASE
+        self.retry_backoff_max = BACKEND_RETRY_BACKOFF_MAX
+        self.breakers = CircuitBreakers(
+            BACKEND_BREAKER_FAILURE_THRESHOLD,
+            BACKEND_BREAKER_RESET_TIMEOUT
+        )
+        self._session: aiohttp.ClientSession | None = None
+        self.metrics = Metrics('backend_pool')
+        self.metrics.gauge('in_use', self._pool_in_use)
+        self.metrics.gauge('idle', self._pool_idle)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Общая для процесса HTTP-сессия с пулом соединений.
+
+        Создается в startup хуке диспетчера, но при обращении
+        до старта (или после закрытия) будет создана заново.
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Создание сессии с настроенным коннектором и трассировкой пула."""
+        connector = aiohttp.TCPConnector(
+            limit=BACKEND_POOL_LIMIT,
+            limit_per_host=BACKEND_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=BACKEND_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=BACKEND_DNS_CACHE_TTL
+        )
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_reuseconn)
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=self._timeout(),
+            json_serialize=json_dumps,
+            trace_configs=[trace_config]
+        )
+
+    async def start(self):
+        """Открытие сессии. Вызывается при старте диспетчера."""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+
+    async def close(self):
+        """Закрытие сессии и пула соединений. Вызывается при остановке."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _pool_in_use(self) -> int:
+        """Количество соединений, занятых запросами."""
+        if self._session is None or self._session.closed:
+            return 0
+        return len(getattr(self._session.connector, '_acquired', ()))
+
+    def _pool_idle(self) -> int:
+        """Количество свободных keep-alive соединений в пуле."""
+        if self._session is None or self._session.closed:
+            return 0
+        conns = getattr(self._session.connector, '_conns', {})
+        return sum(len(protocols) for protocols in conns.values())
+
+    async def _on_queued_start(self, session, context, params):
+        context.queued_at = time.monotonic()
+
+    async def _on_queued_end(self, session, context, params):
+        wait = time.monotonic() - context.queued_at
+        self.metrics.inc('acquire_waits')
+        self.metrics.inc('acquire_wait_seconds', value=wait)
+        if wait > self.metrics.counters['acquire_wait_max_seconds']:
+            self.metrics.counters['acquire_wait_max_seconds'] = wait
+
+    async def _on_create_end(self, session, context, params):
+        self.metrics.inc('connections_created')
+
+    async def _on_reuseconn(self, session, context, params):
+        self.metrics.inc('connections_reused')
+
+    def is_ready(self) -> bool:
+        """
+        Готовность клиента: сессия с пулом соединений открыта.
+        Разомкнутые выключатели не учитываются: отказ одного эндпоинта
+        не должен снимать с балансировки все реплики (см. health).
+        """
+        return self._session is not None and not self._session.closed
+
+    def health(self) -> dict[str, Any]:
+        """Состояние клиента: сессия и отключенные эндпоинты бэкенда."""
+        return {
+            'ready': self.is_ready(),
+            'open_breakers': self.breakers.open_endpoints()
+        }
+
+    @staticmethod
+    def _timeout(budget: float = None) -> aiohttp.ClientTimeout:
+        """
+        Таймауты запроса. Внутри обработки апдейта ограничены
+        оставшимся бюджетом, вне ее - общим TIMEOUT_SESSION.
+
+        :param budget: Оставшийся бюджет времени в секундах.
+        """
+        if budget is None:
+            return aiohttp.ClientTimeout(
+                total=TIMEOUT_SESSION,
+                sock_connect=BACKEND_CONNECT_TIMEOUT,
+                sock_read=BACKEND_READ_TIMEOUT
+            )
+        return aiohttp.ClientTimeout(
+            total=budget,
+            sock_connect=min(BACKEND_CONNECT_TIMEOUT, budget),
+            sock_read=min(BACKEND_READ_TIMEOUT, budget)
+        )
+
+    def _deadline_miss(self, endpoint: str) -> asyncio.TimeoutError:
+        """Учет исчерпания бюджета апдейта на запросе к эндпоинту."""
+        deadline.metrics.inc('misses', endpoint)
+        return asyncio.TimeoutError(f'Исчерпан бюджет времени: {endpoint}')
+
+    @contextlib.asynccontextmanager
+    async def _request(
+            self,
+            endpoint: str,
+            method: str,
+            url: str,
+            retry: bool = False,
+            **kwargs
+    ):
+        """
+        Выполнение запроса к бэкенду через circuit breaker эндпоинта.
+
+        Ошибки соединения, таймауты и ответы 5xx считаются отказами.
+        Идемпотентные запросы (retry=True) повторяются с экспоненциальной
+        задержкой и джиттером. Пока выключатель разомкнут, запрос
+        не выполняется и выбрасывается CircuitOpenError.
+
+        Таймауты запроса вычисляются из оставшегося бюджета апдейта
+        (см. DeadlineMiddleware). Повторы, не укладывающиеся в бюджет,
+        не выполняются. Исчерпание бюджета учитывается по эндпоинтам.
+
+        :param endpoint: Имя эндпоинта для выключателя и счетчиков.
+        :param method: HTTP метод.
+        :param url: URL запроса.
+        :param retry: Можно ли повторять запрос.
+        :return: aiohttp.ClientResponse (в контекстном менеджере).
+        """
+        breaker = self.breakers.get(endpoint)
+        attempts = self.retry_attempts if retry else 1
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(errors.BAСKEND_ERROR)
+            budget = deadline.remaining()
+            if budget is not None and budget <= 0:
+                raise self._deadline_miss(endpoint)
+            delay = backoff_delay(
+                attempt,
+                self.retry_backoff_base,
+                self.retry_backoff_max
+            )
+            last_attempt = attempt + 1 >= attempts
+            if budget is not None and delay >= budget:
+                last_attempt = True
+            try:
+                response = await self.session.request(
+                    method,
+                    url,
+                    timeout=self._timeout(budget),
+                    **kwargs
+                )
+            except asyncio.CancelledError:
+                if deadline.expired():
+                    deadline.metrics.inc('misses', endpoint)
+                raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                breaker.record_failure()
+                if deadline.expired():
+                    raise self._deadline_miss(endpoint)
+                if last_attempt:
+                    raise
+            else:
+                if response.status < 500:
+                    breaker.record_success()
+                    break
+                breaker.record_failure()
+                if last_attempt:
+                    break
+                response.release()
+            self.breakers.metrics.inc('retries', endpoint)
+            await asyncio.sleep(delay)
+        try:
+            yield response
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if deadline.expired():
+                deadline.metrics.inc('misses', endpoint)
+            raise
+        finally:
+            response.release()
+
+    async def _call(
+            self,
+            endpoint: str,
+            method: str,
+            url: str,
+            model: type[BaseModel] | TypeAdapter = None,
+            status: int = None,
+            error: str = errors.BAСKEND_ERROR,
+            missing_ok: bool = False,
+            retry: bool = False,
+            stream_to: BinaryIO = None,
+            **kwargs
+    ) -> Any:
+        """
+        Выполнение запроса к бэкенду и разбор ответа.
+
+        Тело ответа читается один раз и валидируется в модель
+        сразу из байтов, без промежуточного словаря.
+
+        Для GET-запросов эндпоинтов из revalidate_endpoints разобранный
+        ответ запоминается вместе с ETag / Last-Modified, следующий
+        запрос отправляется с условными заголовками, и ответ 304
+        возвращает сохраненный результат.
+
+        :param endpoint: Имя эндпоинта (см. _request).
+        :param method: HTTP метод.
+        :param url: URL запроса.
+        :param model: Опционально. Модель или TypeAdapter ответа.
+        :param status: Опционально. Ожидаемый статус, по умолчанию любой 2xx.
+        :param error: Текст BackendError при неожиданном статусе
+        или структуре ответа.
+        :param missing_ok: Вернуть None при неожиданном статусе.
+        :param retry: Можно ли повторять запрос.
+        :param stream_to: Опционально. Файл, в который тело успешного ответа
+        записывается частями, не загружаясь в память целиком.
+        :return: Модель, тело ответа (bytes), если модель не задана,
+        stream_to или None.
+        """
+        conditional = endpoint in self.revalidate_endpoints
+        if method != 'GET' or stream_to is not None:
+            conditional = False
+        cached = self.conditional_cache.get(url) if conditional else None
+        if cached is not None:
+            etag, last_modified, _ = cached
+            headers = dict(kwargs.pop('headers', None) or {})
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            kwargs['headers'] = headers
+            self.conditional_cache.metrics.inc('revalidations', endpoint)
+        try:
+            async with self._request(
+                endpoint,
+                method,
+                url,
+                retry=retry,
+                **kwargs
+            ) as response:
+                if cached is not None and response.status == 304:
+                    self.conditional_cache.metrics.inc(
+                        'not_modified',
+                        endpoint
+                    )
+                    return cached[2]
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if status is None:
+                    status_ok = 200 <= response.status < 300
+                else:
+                    status_ok = response.status == status
+                if status_ok and stream_to is not None:
+                    async for chunk in response.content.iter_chunked(
+                        BACKEND_STREAM_CHUNK_SIZE
+                    ):
+                        stream_to.write(chunk)
+                    return stream_to
+                body = await response.read()
+        except BackendError:
+            raise
+        except Exception:
+            logger.exception(f'{url=}\n{kwargs=}')
+            raise BackendError(errors.BAСKEND_ERROR)
+
+        if not status_ok:
+            if missing_ok:
+                logger.debug(f'{error}\n{url=}\n{response.status=}')
+                return None
+            logger.error(
+                f'{error}\n{url=}\n{kwargs=}\n'
+                f'{response.status=}\n{body[:1000]=}'
+            )
+            raise BackendError(error)
+
+        if model is None:
+            return body
+        try:
+            if isinstance(model, TypeAdapter):
+                result = model.validate_json(body)
+            else:
+                result = model.model_validate_json(body)
+        except ValidationError:
+            logger.exception(
+                f'{errors.BACKEND_RESPONSE_NOT_EXPECTED}\n{url=}\n'
+                f'{kwargs=}\n{body[:1000]=}'
+            )
+            raise BackendError(error)
+
+        if conditional:
+            if cached is not None:
+                self.conditional_cache.metrics.inc('modified', endpoint)
+            if etag or last_modified:
+                self.conditional_cache.set(url, (etag, last_modified, result))
+            elif cached is not None:
+                # Бэкенд перестал отдавать валидаторы.
+                self.conditional_cache.invalidate(url)
+        return result
+
+    @staticmethod
+    def _user_space_ids(user: User) -> set[int]:
+        """ID всех пространств, которые видит пользователь."""
+        spaces = (user.spaces or []) + (user.available_linked_spaces or [])
+        if user.core_settings and user.core_settings.current_space:
+            spaces.append(user.core_settings.current_space)
+        return {space.id for space in spaces}
+
+    def _invalidate_conditional(self, user_ids: set[int] | None):
+        """
+        Удаление сохраненных ETag / Last-Modified ответов пользователей
+        бэкенда (всех, если user_ids неизвестны). Иначе следующий запрос
+        после изменения данных может получить 304 и вернуть прежний ответ.
+        """
+        if user_ids is None:
+            prefixes = (f'{self.backend_url}users/',)
+        else:
+            prefixes = tuple(
+                f'{self.backend_url}users/{user_id}/' for user_id in user_ids
+            )
+        self.conditional_cache.invalidate_where(
+            lambda url, _: url.startswith(prefixes)
+        )
+
+    def invalidate_user(self, id_telegram: int | str):
+        """
+        Удаление пользователя из кеша по Telegram ID,
+        в том числе из кеша незарегистрированных,
+        и валидаторов его условных запросов.
+        """
+        user = self.user_cache.get(str(id_telegram))
+        self.user_cache.invalidate(str(id_telegram))
+        self.unregistered_cache.invalidate(str(id_telegram))
+        self.conditional_cache.invalidate(
+            f'{self.backend_url}users?id_telegram={id_telegram}'
+        )
+        self._invalidate_conditional({user.id} if user else None)
+
+    def invalidate_space(self, space_id: int | str):
+        """
+        Удаление из кеша всех пользователей, которым видно пространство
+        (владелец и подключенные пользователи).
+        """
+        space_id = int(space_id)
+        self.user_cache.invalidate_where(
+            lambda _, user: space_id in self._user_space_ids(user)
+        )
+
+    def invalidate_backend_user(self, user_id: int | str):
+        """
+        Удаление из кеша пользователя по ID бэкенда, а также всех,
+        чьи пространства связаны с этим пользователем.
+        """
+        user_id = int(user_id)
+
+        def is_related(_, user: User) -> bool:
+            if user.id == user_id:
+                return True
+            spaces = (user.spaces or []) + (user.available_linked_spaces or [])
+            for space in spaces:
+                linked_ids = {
+                    linked.id for linked in space.available_linked_users or []
+                }
+                if space.owner_id == user_id or user_id in linked_ids:
+                    return True
+            return False
+        self.user_cache.invalidate_where(is_related)
 
     async def create_user(self, id_telegram: int | str) -> User:
         """
@@ -41,73 +566,106 @@ class BackendClient:
         :param id_telegram: Telegram ID пользователя.
         :return: User
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            url = f'{self.backend_url}users/'
-            try:
-                response = await session.post(
-                    url,
-                    json={
-                        'username': str(id_telegram),
-                        'telegram_only': True,
-                        'id_telegram': str(id_telegram)
-                    }
-                )
-                return User(**(await response.json()))
-            except ValidationError:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.CREATE_USER_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        url = f'{self.backend_url}users/'
+        try:
+            return await self._call(
+                'create_user',
+                'POST',
+                url,
+                User,
+                error=errors.CREATE_USER_ERROR,
+                json={
+                    'username': str(id_telegram),
+                    'telegram_only': True,
+                    'id_telegram': str(id_telegram)
+                }
+            )
+        finally:
+            self.invalidate_user(id_telegram)
 
-    @alru_cache(ttl=BACKEND_GET_USER_ID_TTL)
     async def get_user_id(self, id_telegram: str | int):
         """
         Получение ID пользователя по Telegram ID.
+        Если пользователь есть в кеше, запрос к бэкенду не выполняется.
 
         :param id_telegram: Telegram ID пользователя.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            url = (
-                f'{self.backend_url}users/'
-                f'get-id/?id_telegram={id_telegram}'
-            )
-            try:
-                response = await session.get(url)
-                response_json = await response.json()
-                if 'user_id' not in response_json:
-                    logger.error(
-                        f'{errors.BACKEND_RESPONSE_NOT_EXPECTED}\n'
-                        f'{url=}\n{response_json=}'
-                    )
-                    raise BackendError(errors.BAСKEND_ERROR)
-                return response_json['user_id']
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user = self.user_cache.get(str(id_telegram))
+        if user is not None:
+            return user.id
+        return await self._request_user_id(id_telegram)
+
+    @alru_cache(ttl=BACKEND_GET_USER_ID_TTL)
+    async def _request_user_id(self, id_telegram: str | int):
+        """
+        Запрос ID пользователя по Telegram ID у бэкенда.
+
+        :param id_telegram: Telegram ID пользователя.
+        """
+        url = (
+            f'{self.backend_url}users/'
+            f'get-id/?id_telegram={id_telegram}'
+        )
+        response = await self._call(
+            'get_user_id',
+            'GET',
+            url,
+            UserId,
+            retry=True
+        )
+        return response.user_id
 
     async def get_user(self, id_telegram: int | str) -> User | None:
         """
         Получение пользователя по Telegram ID.
+        Пользователь берется из кеша, если он там есть.
+        Отсутствие пользователя также кешируется на короткое время.
+        Если бэкенд недоступен, отдается устаревшая запись кеша.
 
         :param id_telegram: Telegram ID пользователя.
         :return: User
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            url = f'{self.backend_url}users?id_telegram={id_telegram}'
-            try:
-                response = await session.get(url)
-                response_json = await response.json()
-                if 'results' not in response_json:
-                    logger.error(f'{errors.BACKEND_RESPONSE_NOT_EXPECTED}\n'
-                                 f'{id_telegram=}\n{response_json=}')
-                    raise BackendError(errors.BAСKEND_ERROR)
-                if not response_json['results']:
-                    return None
-                return User(**response_json['results'][0])
-            except Exception:
-                logger.exception(f'{errors.BAСKEND_ERROR}\n{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user = self.user_cache.get(str(id_telegram))
+        if user is not None:
+            return user
+        if str(id_telegram) in self.unregistered_cache:
+            return None
+        generation = self.user_cache.generation
+        unregistered_generation = self.unregistered_cache.generation
+        try:
+            user = await self._request_user(id_telegram)
+        except BackendError:
+            user = self.user_cache.get_stale(str(id_telegram))
+            if user is None:
+                raise
+            logger.warning(f'Устаревший кеш пользователя: {id_telegram=}')
+            return user
+
+        # Если за время запроса кеш инвалидировали, ответ мог устареть.
+        if user is None:
+            if unregistered_generation == self.unregistered_cache.generation:
+                self.unregistered_cache.set(str(id_telegram), True)
+        elif generation == self.user_cache.generation:
+            self.user_cache.set(str(id_telegram), user)
+        return user
+
+    @coalesce('get_user')
+    async def _request_user(self, id_telegram: int | str) -> User | None:
+        """
+        Запрос пользователя по Telegram ID у бэкенда.
+
+        :param id_telegram: Telegram ID пользователя.
+        :return: User
+        """
+        url = f'{self.backend_url}users?id_telegram={id_telegram}'
+        response = await self._call(
+            'get_user',
+            'GET',
+            url,
+            UserList,
+            retry=True
+        )
+        return response.results[0] if response.results else None
 
     async def delete_user(self, id_telegram: int | str):
         """
@@ -115,20 +673,19 @@ class BackendClient:
 
         :param id_telegram: Telegram ID пользователя.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/'
-            try:
-                response = await session.delete(url)
-                if response.status != 204:
-                    logger.error(
-                        f'{errors.DELETE_USER_ERROR}\n'
-                        f'{response.status=}\n{await response.json()}'
-                    )
-                    raise BackendError(errors.DELETE_USER_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/'
+        try:
+            await self._call(
+                'delete_user',
+                'DELETE',
+                url,
+                status=204,
+                error=errors.DELETE_USER_ERROR
+            )
+        finally:
+            self.invalidate_user(id_telegram)
+            self.invalidate_backend_user(user_id)
 
     async def create_group(
             self,
@@ -146,27 +703,25 @@ class BackendClient:
         :param plan_value: Плановое значение.
         :return: CreatedGroup | None
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/summary/'
-            data = {
-                'type_transaction': type_transaction,
-                'group_name': group_name,
-                'plan_value': float(plan_value)
-            }
-            try:
-                response = await session.post(url, json=data)
-                response_json = await response.json()
-                if response.status != 201:
-                    logger.error(
-                        f'{errors.CREATE_GROUP_ERROR}\n{url=}\n'
-                        f'{data}\n{response_json=}'
-                    )
-                    raise BackendError(errors.CREATE_GROUP_ERROR)
-                return CreatedGroup(**response_json)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/summary/'
+        data = {
+            'type_transaction': type_transaction,
+            'group_name': group_name,
+            'plan_value': float(plan_value)
+        }
+        try:
+            return await self._call(
+                'create_group',
+                'POST',
+                url,
+                CreatedGroup,
+                status=201,
+                error=errors.CREATE_GROUP_ERROR,
+                json=data
+            )
+        finally:
+            self.invalidate_summary(id_telegram)
 
     async def group_name_is_exist(
             self,
@@ -174,29 +729,46 @@ class BackendClient:
             group_name: str
     ):
         """
-        Проверка существования статьи по имени.
+        Проверка существования статьи по имени в текущем периоде.
+        Если отчет за период есть в кеше, проверка выполняется
+        по его индексу без запроса к бэкенду.
 
         :param id_telegram: Telegram ID пользователя.
         :param group_name: Название статьи.
         :return: Bool
         """
-        async with (aiohttp.ClientSession(headers=self.headers) as session):
-            user_id = await self.get_user_id(id_telegram)
-            url = (f'{self.backend_url}users/{user_id}/'
-                   f'summary/?group_name={group_name}')
-            try:
-                response = await session.get(url)
-                response_json = await response.json()
-                if 'summary' not in response_json:
-                    logger.error(
-                        f'{errors.BACKEND_RESPONSE_NOT_EXPECTED}\n{url=}'
-                        f'{id_telegram=}\n{group_name=}\n{response_json=}'
-                    )
-                    raise BackendError(errors.BAСKEND_ERROR)
-                return True if response_json['summary'] else False
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        index = self._peek_summary_index(id_telegram)
+        if index is not None:
+            return index.group_name_is_exist(group_name)
+        return await self._request_group_name_is_exist(
+            id_telegram,
+            group_name
+        )
+
+    @coalesce('group_name_is_exist')
+    async def _request_group_name_is_exist(
+            self,
+            id_telegram: int | str,
+            group_name: str
+    ) -> bool:
+        """
+        Проверка существования статьи по имени запросом к бэкенду.
+
+        :param id_telegram: Telegram ID пользователя.
+        :param group_name: Название статьи.
+        :return: Bool
+        """
+        user_id = await self.get_user_id(id_telegram)
+        url = (f'{self.backend_url}users/{user_id}/'
+               f'summary/?group_name={group_name}')
+        response = await self._call(
+            'group_name_is_exist',
+            'GET',
+            url,
+            SummaryLookup,
+            retry=True
+        )
+        return bool(response.summary)
 
     async def list_group(
             self,
@@ -205,33 +777,24 @@ class BackendClient:
     ) -> Summary | None:
         """
         Получение списка статей.
+        Статьи выбираются из отчета за текущий период (см. get_summary),
+        отдельный запрос к бэкенду не выполняется.
 
         :param id_telegram: Telegram ID пользователя.
         :param type_transaction: Опционально. Тип транзакции.
         :return: Summary | None
         """
-        async with (aiohttp.ClientSession(headers=self.headers) as session):
-            user_id = await self.get_user_id(id_telegram)
-            if not type_transaction:
-                url = f'{self.backend_url}users/{user_id}/summary/'
-            else:
-                url = (
-                    f'{self.backend_url}users/'
-                    f'{await self.get_user_id(id_telegram)}/'
-                    f'summary/?type_transaction={type_transaction}'
-                )
-            try:
-                response = await session.get(url)
-                response_json = await response.json()
-                if 'summary' in response_json and not response_json['summary']:
-                    return None
-                return Summary(**(await response.json()))
-            except ValidationError:
-                logger.exception(f'{errors.LIST_GROUP_ERROR}\n{url=}')
-                raise BackendError(errors.LIST_GROUP_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        summary = await self.get_summary(id_telegram)
+        if summary is None or not type_transaction:
+            return summary
+        return summary.model_copy(
+            update={
+                'summary': [
+                    group for group in summary.summary
+                    if group.type_transaction == type_transaction
+                ]
+            }
+        )
 
     async def get_group(
             self,
@@ -240,26 +803,42 @@ class BackendClient:
     ) -> SummaryDetail | None:
         """
         Получение детальной информации о статье.
+        Статья берется из индекса отчета в кеше, если он есть.
 
         :param id_telegram: Telegram ID пользователя.
         :param group_id: ID статьи.
         :return: SummaryDetail | None
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/summary/{group_id}/'
-            try:
-                response = await session.get(url)
-                if response.status != 200:
-                    logger.debug(f'{errors.GET_GROUP_ERROR}\n{url}')
-                    return None
-                return SummaryDetail(**(await response.json()))
-            except ValidationError:
-                logger.exception(f'{errors.GET_GROUP_ERROR}\n{url=}')
-                raise BackendError(errors.GET_GROUP_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        index = self._peek_summary_index(id_telegram)
+        if index is not None and (group := index.get_group(group_id)):
+            return group
+        return await self._request_group(id_telegram, group_id)
+
+    @coalesce('get_group')
+    async def _request_group(
+            self,
+            id_telegram: int | str,
+            group_id: int | str
+    ) -> SummaryDetail | None:
+        """
+        Запрос детальной информации о статье у бэкенда.
+
+        :param id_telegram: Telegram ID пользователя.
+        :param group_id: ID статьи.
+        :return: SummaryDetail | None
+        """
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/summary/{group_id}/'
+        return await self._call(
+            'get_group',
+            'GET',
+            url,
+            SummaryDetail,
+            status=200,
+            error=errors.GET_GROUP_ERROR,
+            missing_ok=True,
+            retry=True
+        )
 
     async def delete_group(
             self,
@@ -273,45 +852,187 @@ class BackendClient:
         :param group_id: ID статьи.
         :return: bool
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/summary/{group_id}/'
-            try:
-                response = await session.delete(url)
-                if response.status != 204:
-                    logger.error(
-                        f'{errors.DELETE_GROUP_ERROR}\n{url=}'
-                        f'{response.status=}\n{await response.json()}'
-                    )
-                    raise BackendError(errors.DELETE_GROUP_ERROR)
-                return True
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/summary/{group_id}/'
+        try:
+            await self._call(
+                'delete_group',
+                'DELETE',
+                url,
+                status=204,
+                error=errors.DELETE_GROUP_ERROR
+            )
+            return True
+        finally:
+            self.invalidate_summary(id_telegram)
+
+    @staticmethod
+    def _summary_key(user: User) -> tuple[int, int, int] | None:
+        """Ключ отчета в кеше: текущие пространство и период пользователя."""
+        settings = user.core_settings if user else None
+        if settings is None or settings.current_space is None:
+            return None
+        if not (settings.current_month and settings.current_year):
+            return None
+        return (
+            settings.current_space.id,
+            settings.current_month,
+            settings.current_year
+        )
+
+    def invalidate_summary(self, id_telegram: int | str):
+        """
+        Удаление из кеша отчетов текущего пространства пользователя
+        (за все периоды), валидаторов условных запросов пользователей
+        пространства и увеличение версии данных пространства.
+        Если пространство неизвестно, кеши очищаются.
+        """
+        user = self.user_cache.get(str(id_telegram))
+        key = self._summary_key(user)
+        if key is None:
+            self._data_epoch += 1
+            self.summary_cache.clear()
+            self.export_cache.clear()
+            self._invalidate_conditional(None)
+            return
+        space = user.core_settings.current_space
+        user_ids = {user.id, space.owner_id}
+        user_ids.update(
+            linked.id for linked in space.available_linked_users or []
+        )
+        self._invalidate_conditional(user_ids)
+        space_id = key[0]
+        self._space_versions[space_id] = self.data_version(space_id)[1] + 1
+        self.summary_cache.invalidate_where(lambda k, _: k[0] == space_id)
+        self.export_cache.invalidate_where(lambda k, _: k[0] == space_id)
+
+    def data_version(self, space_id: int) -> tuple[int, int]:
+        """Версия данных пространства (статей и транзакций)."""
+        return self._data_epoch, self._space_versions.get(space_id, 0)
+
+    async def export_key(
+            self,
+            id_telegram: int | str
+    ) -> tuple[int, int, int] | None:
+        """
+        Ключ кеша экспорта: текущее пространство пользователя
+        и версия его данных.
+
+        :param id_telegram: Telegram ID пользователя.
+        :return: (space_id, epoch, version) или None.
+        """
+        user = await self.get_user(id_telegram)
+        settings = user.core_settings if user else None
+        if settings is None or settings.current_space is None:
+            return None
+        space_id = settings.current_space.id
+        return space_id, *self.data_version(space_id)
+
+    def summary_version_key(
+            self,
+            index: SummaryIndex
+    ) -> tuple[int, int, int, int, int] | None:
+        """
+        Ключ версии отчета: пространство и период из данных отчета
+        и версия данных пространства.
+
+        :param index: Индекс отчета (см. get_summary_index).
+        :return: (space_id, month, year, epoch, version) или None.
+        """
+        key = index.key
+        if key is None:
+            return None
+        return *key, *self.data_version(key[0])
+
+    def _peek_summary_index(
+            self,
+            id_telegram: int | str
+    ) -> SummaryIndex | None:
+        """Индекс отчета за текущий период из кеша, без запроса к бэкенду."""
+        key = self._summary_key(self.user_cache.get(str(id_telegram)))
+        if key is None:
+            return None
+        return self.summary_cache.get(key)
+
+    async def get_summary_index(self, id_telegram: int | str) -> SummaryIndex:
+        """
+        Получение индекса отчета пользователя за период,
+        установленный в базовых настройках.
+
+        Отчет принадлежит пространству и периоду, а не пользователю,
+        поэтому кешируется по (space_id, month, year) и общий для всех
+        пользователей, подключенных к пространству. Если бэкенд
+        недоступен, отдается устаревшая запись кеша.
+
+        Ответ кешируется, только если его пространство и период совпадают
+        с настройками пользователя из кеша. Иначе кешированный пользователь
+        устарел (настройки изменены на другой реплике или через сайт)
+        и удаляется из кеша, а пустой отчет не кешируется.
+
+        :param id_telegram: Telegram ID пользователя.
+        :return: SummaryIndex
+        """
+        user = self.user_cache.get(str(id_telegram))
+        if user is None:
+            user = await self.get_user(id_telegram)
+        key = self._summary_key(user)
+        if key is None:
+            return SummaryIndex(await self._request_summary(id_telegram))
+        index = self.summary_cache.get(key)
+        if index is not None:
+            return index
+        generation = self.summary_cache.generation
+        try:
+            index = SummaryIndex(await self._request_summary(id_telegram))
+        except BackendError:
+            index = self.summary_cache.get_stale(key)
+            if index is None:
+                raise
+            logger.warning(f'Устаревший кеш отчета: {key=}')
+            return index
+        if index.key != key:
+            if index.key is not None:
+                logger.info(
+                    f'Устаревшие настройки в кеше: {key=}, {index.key=}'
+                )
+                self.user_cache.invalidate(str(id_telegram))
+            return index
+        if generation == self.summary_cache.generation:
+            self.summary_cache.set(key, index)
+        return index
 
     async def get_summary(self, id_telegram: int | str) -> Summary | None:
         """
         Получение отчета пользователя за период,
-        установленный в базовых настройках.
+        установленный в базовых настройках (см. get_summary_index).
 
         :param id_telegram: Telegram ID пользователя.
         :return: Summary | None
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/summary/'
-            try:
-                response = await session.get(url)
-                response_json = await response.json()
-                if 'summary' in response_json and not response_json['summary']:
-                    return None
-                return Summary(**(await response.json()))
-            except ValidationError:
-                logger.exception(f'{errors.GET_SUMMARY_ERROR}\n{url=}')
-                raise BackendError(errors.GET_SUMMARY_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        return (await self.get_summary_index(id_telegram)).summary
+
+    @coalesce('get_summary')
+    async def _request_summary(
+            self,
+            id_telegram: int | str
+    ) -> Summary | None:
+        """
+        Запрос отчета пользователя за текущий период у бэкенда.
+
+        :param id_telegram: Telegram ID пользователя.
+        :return: Summary | None
+        """
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/summary/'
+        summary = await self._call(
+            'get_summary',
+            'GET',
+            url,
+            SummaryResponse,
+            error=errors.GET_SUMMARY_ERROR,
+            retry=True
+        )
+        return summary if isinstance(summary, Summary) else None
 
     async def add_transaction(
             self,
@@ -331,26 +1052,25 @@ class BackendClient:
         :param value_transaction: Значение транзакции.
         :return: Transaction
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/transactions/'
-            data = {
-                'type_transaction': type_transaction,
-                'group_name': group_name,
-                'description': description,
-                'value_transaction': float(value_transaction)
-            }
-            try:
-                response = await session.post(url, json=data)
-                return Transaction(**(await response.json()))
-            except ValidationError:
-                logger.exception(
-                    f'{errors.ADD_TRANSACTION_ERROR}\n{url=}'
-                    f'{data=}')
-                raise BackendError(errors.ADD_TRANSACTION_ERROR)
-            except Exception:
-                logger.exception(f'{url=}\n{data=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/transactions/'
+        data = {
+            'type_transaction': type_transaction,
+            'group_name': group_name,
+            'description': description,
+            'value_transaction': float(value_transaction)
+        }
+        try:
+            return await self._call(
+                'add_transaction',
+                'POST',
+                url,
+                Transaction,
+                error=errors.ADD_TRANSACTION_ERROR,
+                json=data
+            )
+        finally:
+            self.invalidate_summary(id_telegram)
 
     async def update_core_settings(
             self,
@@ -366,20 +1086,20 @@ class BackendClient:
 
         :return: CoreSettingsUpdate
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/core-settings/'
-            try:
-                response = await session.patch(url, json=data)
-                return CoreSettingsUpdate(**(await response.json()))
-            except ValidationError:
-                logger.exception(
-                    f'{errors.UPDATE_SETTINGS_ERROR}\n{url=}\n{data=}'
-                )
-                raise BackendError(errors.UPDATE_SETTINGS_ERROR)
-            except Exception:
-                logger.exception(f'{url}\n{data=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/core-settings/'
+        try:
+            return await self._call(
+                'update_core_settings',
+                'PATCH',
+                url,
+                CoreSettingsUpdate,
+                error=errors.UPDATE_SETTINGS_ERROR,
+                retry=True,
+                json=data
+            )
+        finally:
+            self.invalidate_user(id_telegram)
 
     async def update_telegram_settings(
             self,
@@ -393,20 +1113,20 @@ class BackendClient:
         :param data: Новые данные для Telegram settings в словаре.
         :return: TelegramSettings | None
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/telegram-settings/'
-            try:
-                response = await session.patch(url, json=data)
-                return TelegramSettings(**(await response.json()))
-            except ValidationError:
-                logger.exception(
-                    f'{errors.UPDATE_SETTINGS_ERROR}\n{url=}\n{data=}'
-                )
-                raise BackendError(errors.UPDATE_SETTINGS_ERROR)
-            except Exception:
-                logger.exception(f'{url=}\n{data=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/telegram-settings/'
+        try:
+            return await self._call(
+                'update_telegram_settings',
+                'PATCH',
+                url,
+                TelegramSettings,
+                error=errors.UPDATE_SETTINGS_ERROR,
+                retry=True,
+                json=data
+            )
+        finally:
+            self.invalidate_user(id_telegram)
 
     async def update_space(
             self,
@@ -422,20 +1142,21 @@ class BackendClient:
         :param data: Новые данные для Space в словаре.
         :return: Space
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/spaces/{space_id}/'
-            try:
-                response = await session.patch(url, json=data)
-                return Space(**(await response.json()))
-            except ValidationError:
-                logger.exception(
-                    f'{errors.UPDATE_SETTINGS_ERROR}\n{url=}\n{data=}'
-                )
-                raise BackendError(errors.UPDATE_SETTINGS_ERROR)
-            except Exception:
-                logger.exception(f'{url=}\n{data=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/spaces/{space_id}/'
+        try:
+            return await self._call(
+                'update_space',
+                'PATCH',
+                url,
+                Space,
+                error=errors.UPDATE_SETTINGS_ERROR,
+                retry=True,
+                json=data
+            )
+        finally:
+            self.invalidate_user(id_telegram)
+            self.invalidate_space(space_id)
 
     async def link_user_to_space(
             self,
@@ -450,23 +1171,23 @@ class BackendClient:
         :param id_space: ID пространства.
         :param id_link_user: ID пользователя для связывания.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = (f'{self.backend_url}users/{user_id}/'
-                   f'spaces/{id_space}/link_user/')
-            data = {'id': id_link_user}
-            try:
-                response = await session.post(url, json=data)
-                response_json = await response.json()
-                if response.status != 200:
-                    logger.error(
-                        f'{errors.LINK_USER_ERROR}\n'
-                        f'{response.status=}\n{response_json}\n{url=}\n{data=}'
-                    )
-                    raise BackendError(errors.LINK_USER_ERROR)
-            except Exception:
-                logger.exception(f'{url=}\n{data=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = (f'{self.backend_url}users/{user_id}/'
+               f'spaces/{id_space}/link_user/')
+        data = {'id': id_link_user}
+        try:
+            await self._call(
+                'link_user_to_space',
+                'POST',
+                url,
+                status=200,
+                error=errors.LINK_USER_ERROR,
+                json=data
+            )
+        finally:
+            self.invalidate_user(id_telegram)
+            self.invalidate_space(id_space)
+            self.invalidate_backend_user(id_link_user)
 
     async def unlink_user_to_space(
             self,
@@ -481,51 +1202,52 @@ class BackendClient:
         :param id_space: ID пространства.
         :param id_unlink_user: ID пользователя для отключения.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = (f'{self.backend_url}users/{user_id}/'
-                   f'spaces/{id_space}/unlink_user/')
-            data = {'id': id_unlink_user}
-            try:
-                response = await session.post(url, json=data)
-                if response.status != 200:
-                    logger.error(
-                        f'{errors.UNLINK_USER_ERROR}\n{url=}\n{data=}\n'
-                        f'{response.status=}\n{await response.json()}'
-                    )
-                    raise BackendError(errors.UNLINK_USER_ERROR)
-            except Exception:
-                logger.exception(f'{url=}\n{data=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = (f'{self.backend_url}users/{user_id}/'
+               f'spaces/{id_space}/unlink_user/')
+        data = {'id': id_unlink_user}
+        try:
+            await self._call(
+                'unlink_user_to_space',
+                'POST',
+                url,
+                status=200,
+                error=errors.UNLINK_USER_ERROR,
+                json=data
+            )
+        finally:
+            self.invalidate_user(id_telegram)
+            self.invalidate_space(id_space)
+            self.invalidate_backend_user(id_unlink_user)
 
     async def get_export_excel(self, id_telegram):
         """
         Запрос excel файла с детализацией.
+        Файл скачивается частями во временный файл: до EXPORT_SPOOL_MAX_SIZE
+        он хранится в памяти, больший - на диске.
+        После отправки файл нужно закрыть (SpooledInputFile.close).
 
         :param id_telegram: Telegram ID пользователя.
-        :return: bytes
+        :return: SpooledInputFile
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/export/excel/'
-            try:
-                response = await session.get(url)
-                if response.status == 200:
-                    file_buffer = BytesIO(await response.read())
-                    file_buffer.seek(0)
-                    return BufferedInputFile(
-                        file_buffer.getvalue(),
-                        'transactions.xlsx'
-                    )
-                else:
-                    logger.error(
-                        f'{errors.BAСKEND_ERROR}\n{response.status=}\n{url=}'
-                    )
-                    raise BackendError(errors.BAСKEND_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/export/excel/'
+        spool = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+        try:
+            await self._call(
+                'get_export_excel',
+                'GET',
+                url,
+                status=200,
+                retry=True,
+                stream_to=spool
+            )
+        except BaseException:
+            spool.close()
+            raise
+        return SpooledInputFile(spool, 'transactions.xlsx')
 
+    @coalesce('get_all_years')
     async def get_all_years(self, id_telegram) -> list[str]:
         """
         Запрос годов, в которых есть данные в текущем пространстве пользователя.
@@ -533,23 +1255,19 @@ class BackendClient:
         :param id_telegram: Telegram ID пользователя.
         :return: Список годов.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/periods/years/'
-            try:
-                response = await session.get(url)
-                if response.status == 200:
-                    result = await response.json()
-                    return result['years']
-                else:
-                    logger.error(
-                        f'{errors.BAСKEND_ERROR}\n{response.status=}\n{url=}'
-                    )
-                    raise BackendError(errors.BAСKEND_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/periods/years/'
+        response = await self._call(
+            'get_all_years',
+            'GET',
+            url,
+            Years,
+            status=200,
+            retry=True
+        )
+        return response.years
 
+    @coalesce('get_all_months_in_year')
     async def get_all_months_in_year(self, id_telegram, year) -> list[str]:
         """
         Запрос месяцев, в которых есть данные в указанном году и текущем пространстве пользователя.
@@ -558,19 +1276,14 @@ class BackendClient:
         :param year: Год.
         :return: Список месяцев.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            user_id = await self.get_user_id(id_telegram)
-            url = f'{self.backend_url}users/{user_id}/periods/months/?year={year}'
-            try:
-                response = await session.get(url)
-                if response.status == 200:
-                    result = await response.json()
-                    return result['months']
-                else:
-                    logger.error(
-                        f'{errors.BAСKEND_ERROR}\n{response.status=}\n{url=}'
-                    )
-                    raise BackendError(errors.BAСKEND_ERROR)
-            except Exception:
-                logger.exception(f'{url=}')
-                raise BackendError(errors.BAСKEND_ERROR)
+        user_id = await self.get_user_id(id_telegram)
+        url = f'{self.backend_url}users/{user_id}/periods/months/?year={year}'
+        response = await self._call(
+            'get_all_months_in_year',
+            'GET',
+            url,
+            Months,
+            status=200,
+            retry=True
+        )
+        return response.months
@@ -0,0 +1,83 @@
+"""Кеши в памяти процесса."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from utils.metrics import Metrics
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру кеш с временем жизни записей.
+
+    При переполнении вытесняется запись, к которой дольше всего
+    не обращались (LRU). Ведет счетчики попаданий, промахов и вытеснений.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.generation = 0
+        self.metrics = Metrics(name)
+        self.metrics.gauge('size', lambda: len(self._data))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Получение значения, если оно есть и не устарело."""
+        item = self._data.get(key)
+        if item is None:
+            self.metrics.inc('misses')
+            return default
+        expires_at, value = item
+        # Устаревшая запись остается до вытеснения: она может быть
+        # отдана через get_stale, если источник данных недоступен.
+        if expires_at < time.monotonic():
+            self.metrics.inc('misses')
+            self.metrics.inc('expired')
+            return default
+        self._data.move_to_end(key)
+        self.metrics.inc('hits')
+        return value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Получение значения без учета времени жизни."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        self.metrics.inc('stale_hits')
+        return item[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Сохранение значения с вытеснением самой старой записи."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.metrics.inc('evictions')
+
+    def invalidate(self, key: Hashable):
+        """Удаление записи по ключу."""
+        self.generation += 1
+        if self._data.pop(key, None) is not None:
+            self.metrics.inc('invalidations')
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]):
+        """Удаление всех записей, для которых predicate(key, value) истинно."""
+        self.generation += 1
+        for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+            del self._data[key]
+            self.metrics.inc('invalidations')
+
+    def clear(self):
+        """Очистка кеша."""
+        self.generation += 1
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
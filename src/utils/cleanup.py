@@ -0,0 +1,109 @@
+"""Фоновое удаление сообщений."""
+
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+
+from config import (
+    CLEANUP_BATCH_DELAY,
+    MAX_DELETE_MESSAGES,
+    MAX_TRY_DELETE_MSG,
+    TIMEOUT_TRY_DELETE_MSG
+)
+from utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CleanupQueue:
+    """
+    Очередь удаления сообщений.
+
+    Хэндлер только ставит сообщения в очередь и не ждет удаления.
+    Сообщения чата, накопившиеся за delay секунд, удаляются одним
+    запросом deleteMessages (до MAX_DELETE_MESSAGES за запрос).
+    Ошибки повторяются max_attempts раз с паузой retry_timeout секунд.
+    """
+
+    def __init__(
+            self,
+            bot: Bot,
+            delay: float = CLEANUP_BATCH_DELAY,
+            max_attempts: int = MAX_TRY_DELETE_MSG,
+            retry_timeout: float = TIMEOUT_TRY_DELETE_MSG
+    ):
+        self.bot = bot
+        self.delay = delay
+        self.max_attempts = max_attempts
+        self.retry_timeout = retry_timeout
+        self.pending: dict[int, set[int]] = {}
+        self.tasks: dict[int, asyncio.Task] = {}
+        self.metrics = Metrics('cleanup')
+        self.metrics.gauge(
+            'pending',
+            lambda: sum(len(ids) for ids in self.pending.values())
+        )
+
+    def delete(self, chat_id: int, *message_ids: int | None):
+        """
+        Постановка сообщений чата в очередь на удаление.
+
+        :param chat_id: ID чата.
+        :param message_ids: ID сообщений (None пропускаются).
+        """
+        ids = self.pending.setdefault(chat_id, set())
+        ids.update(message_id for message_id in message_ids if message_id)
+        if chat_id not in self.tasks:
+            self.tasks[chat_id] = asyncio.create_task(self._deliver(chat_id))
+
+    async def close(self):
+        """Немедленное удаление сообщений из очереди при остановке."""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self.pending:
+            chat_id, message_ids = self.pending.popitem()
+            await self._delete(chat_id, message_ids)
+
+    async def _deliver(self, chat_id: int):
+        """Удаление сообщений чата, пока в его очереди есть сообщения."""
+        try:
+            while self.pending.get(chat_id):
+                await asyncio.sleep(self.delay)
+                await self._delete(chat_id, self.pending.pop(chat_id))
+        finally:
+            self.tasks.pop(chat_id, None)
+
+    async def _delete(self, chat_id: int, message_ids: set[int]):
+        """Удаление сообщений чата пачками."""
+        message_ids = sorted(message_ids)
+        for start in range(0, len(message_ids), MAX_DELETE_MESSAGES):
+            batch = message_ids[start:start + MAX_DELETE_MESSAGES]
+            for attempt in range(self.max_attempts):
+                try:
+                    await self.bot.delete_messages(chat_id, batch)
+                    self.metrics.inc('requests')
+                    self.metrics.inc('deleted', value=len(batch))
+                    break
+
+                # Сообщения уже удалены или слишком старые для удаления.
+                except TelegramBadRequest as e:
+                    self.metrics.inc('failed', value=len(batch))
+                    logger.warning(
+                        f'Сообщения {batch} в чате {chat_id} не удалены: {e}'
+                    )
+                    break
+
+                except TelegramAPIError as e:
+                    if attempt == self.max_attempts - 1:
+                        self.metrics.inc('failed', value=len(batch))
+                        logger.error(
+                            f'Сообщения {batch} в чате {chat_id} '
+                            f'не удалены: {e}'
+                        )
+                        break
+                    self.metrics.inc('retries')
+                    await asyncio.sleep(self.retry_timeout)
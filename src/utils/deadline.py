@@ -0,0 +1,51 @@
+"""Дедлайн обработки входящего апдейта."""
+
+import asyncio
+from contextvars import ContextVar
+
+from utils.metrics import Metrics
+
+# Момент (по часам event loop), к которому обработка апдейта
+# должна завершиться. None - дедлайн не установлен.
+deadline: ContextVar[float | None] = ContextVar('deadline', default=None)
+
+# Таймаут, отменяющий обработку апдейта по истечении дедлайна.
+timeout: ContextVar[asyncio.Timeout | None] = ContextVar(
+    'timeout',
+    default=None
+)
+
+metrics = Metrics('deadline')
+
+
+def remaining() -> float | None:
+    """Оставшийся бюджет времени в секундах или None без дедлайна."""
+    value = deadline.get()
+    if value is None:
+        return None
+    return value - asyncio.get_running_loop().time()
+
+
+def expired() -> bool:
+    """Истек ли бюджет времени."""
+    budget = remaining()
+    return budget is not None and budget <= 0
+
+
+def extend(budget: float):
+    """
+    Продление дедлайна текущего апдейта до budget секунд от текущего
+    момента. Более ранний дедлайн, чем установленный, не применяется.
+
+    :param budget: Бюджет времени в секундах.
+    """
+    current = deadline.get()
+    if current is None:
+        return
+    when = asyncio.get_running_loop().time() + budget
+    if when <= current:
+        return
+    deadline.set(when)
+    current_timeout = timeout.get()
+    if current_timeout is not None:
+        current_timeout.reschedule(when)
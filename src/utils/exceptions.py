@@ -4,3 +4,7 @@ class InputValidationError(Exception):
 
 class BackendError(Exception):
     pass
+
+
+class CircuitOpenError(BackendError):
+    pass
@@ -0,0 +1,304 @@
+"""Хранилища FSM, переживающие перезапуск и общие для нескольких реплик."""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    StateType,
+    StorageKey
+)
+from aiogram.fsm.storage.redis import RedisStorage
+
+from config import (
+    FSM_FLUSH_INTERVAL,
+    FSM_REDIS_TIMEOUT,
+    FSM_REDIS_URL,
+    FSM_SQLITE_PATH,
+    FSM_STATE_TTL,
+    FSM_STORAGE
+)
+from utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    dumps = orjson.dumps
+    loads = orjson.loads
+except ImportError:
+    def dumps(obj: Any) -> bytes:
+        """Компактная сериализация в JSON."""
+        return json.dumps(
+            obj,
+            separators=(',', ':'),
+            ensure_ascii=False
+        ).encode()
+
+    loads = json.loads
+
+key_builder = DefaultKeyBuilder(with_destiny=True)
+
+
+def state_name(state: StateType) -> str | None:
+    """Название состояния."""
+    return state.state if isinstance(state, State) else state
+
+
+class TTLMemoryStorage(BaseStorage):
+    """
+    Хранилище FSM в памяти процесса.
+
+    В отличие от MemoryStorage, запись создается только при установке
+    непустого состояния или данных и удаляется при их очистке.
+    Записи, не изменявшиеся дольше ttl секунд, удаляются.
+    """
+
+    def __init__(self, ttl: float = FSM_STATE_TTL):
+        self.ttl = ttl
+
+        # key -> (expires_at, state, data), по возрастанию expires_at.
+        self._records: OrderedDict[
+            StorageKey, tuple[float, str | None, dict]
+        ] = OrderedDict()
+        self.metrics = Metrics('fsm_storage')
+        self.metrics.gauge('states', lambda: len(self._records))
+        self.metrics.gauge('bytes', self.size_bytes)
+
+    def size_bytes(self) -> int:
+        """Примерный объем состояний в сериализованном виде."""
+        return sum(
+            len(dumps((state, data)))
+            for _, state, data in self._records.values()
+        )
+
+    def _read(self, key: StorageKey) -> tuple[str | None, dict]:
+        record = self._records.get(key)
+        if record is None:
+            return None, {}
+        expires_at, state, data = record
+        if expires_at <= time.monotonic():
+            del self._records[key]
+            return None, {}
+        return state, data
+
+    def _write(self, key: StorageKey, state: str | None, data: dict):
+        now = time.monotonic()
+        self._records.pop(key, None)
+        if state is not None or data:
+            self._records[key] = (now + self.ttl, state, data)
+
+        # Брошенные записи в начале словаря.
+        while self._records:
+            expires_at, _, _ = next(iter(self._records.values()))
+            if expires_at > now:
+                break
+            self._records.popitem(last=False)
+
+    async def set_state(self, key: StorageKey, state: StateType = None):
+        self._write(key, state_name(state), self._read(key)[1])
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return self._read(key)[0]
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]):
+        self._write(key, self._read(key)[0], data.copy())
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return self._read(key)[1].copy()
+
+    async def close(self):
+        pass
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище FSM в SQLite (WAL).
+
+    Записи сначала попадают в буфер в памяти и сбрасываются в базу
+    одной транзакцией раз в flush_interval секунд (write-behind).
+    Записи, не изменявшиеся дольше ttl секунд, считаются брошенными
+    и удаляются.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            ttl: float = FSM_STATE_TTL,
+            flush_interval: float = FSM_FLUSH_INTERVAL
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._writer = self._connect()
+        self._writer.execute(
+            'CREATE TABLE IF NOT EXISTS fsm ('
+            'key TEXT PRIMARY KEY, record BLOB NOT NULL, '
+            'expires_at REAL NOT NULL)'
+        )
+        self._reader = self._connect()
+
+        # key -> (state, data). Пустая запись означает удаление.
+        self._buffer: dict[str, tuple[str | None, dict]] = {}
+        self._flushing: dict[str, tuple[str | None, dict]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._closed = False
+        self.metrics = Metrics('fsm_storage')
+        self.metrics.gauge('states', lambda: self._stats()[0])
+        self.metrics.gauge('bytes', lambda: self._stats()[1])
+
+    def _stats(self) -> tuple[int, int]:
+        """Количество и объем сохраненных в базе состояний."""
+        if self._closed:
+            return 0, 0
+        count, size = self._reader.execute(
+            'SELECT count(*), total(length(record)) FROM fsm '
+            'WHERE expires_at > ?',
+            (time.time(),)
+        ).fetchone()
+        return count, int(size)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _read(self, key: str) -> tuple[str | None, dict]:
+        """Запись из буфера или из базы."""
+        record = self._buffer.get(key) or self._flushing.get(key)
+        if record is not None:
+            return record
+        row = self._reader.execute(
+            'SELECT record FROM fsm WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None, {}
+        state, data = loads(row[0])
+        return state, data
+
+    def _write(self, key: str, record: tuple[str | None, dict]):
+        """Запись в буфер и планирование сброса в базу."""
+        self._buffer[key] = record
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Сброс буфера в базу одной транзакцией."""
+        if not self._buffer:
+            return
+        self._flushing, self._buffer = self._buffer, {}
+        try:
+            await asyncio.to_thread(self._flush_sync, self._flushing)
+        except Exception:
+            logger.exception('Ошибка записи FSM в SQLite')
+            # Несохраненные записи возвращаются в буфер,
+            # более новые записи из буфера остаются приоритетнее.
+            self._buffer = {**self._flushing, **self._buffer}
+        finally:
+            self._flushing = {}
+
+    def _flush_sync(self, records: dict[str, tuple[str | None, dict]]):
+        now = time.time()
+        upsert, delete = [], []
+        for key, (state, data) in records.items():
+            if state is None and not data:
+                delete.append((key,))
+            else:
+                upsert.append((key, dumps((state, data)), now + self.ttl))
+        with self._writer:
+            self._writer.execute('BEGIN')
+            self._writer.executemany(
+                'INSERT INTO fsm (key, record, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET '
+                'record = excluded.record, expires_at = excluded.expires_at',
+                upsert
+            )
+            self._writer.executemany('DELETE FROM fsm WHERE key = ?', delete)
+            self._writer.execute('DELETE FROM fsm WHERE expires_at <= ?', (now,))
+
+    async def set_state(self, key: StorageKey, state: StateType = None):
+        key = key_builder.build(key)
+        _, data = self._read(key)
+        self._write(key, (state_name(state), data))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return self._read(key_builder.build(key))[0]
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]):
+        key = key_builder.build(key)
+        state, _ = self._read(key)
+        self._write(key, (state, data.copy()))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return self._read(key_builder.build(key))[1].copy()
+
+    async def close(self):
+        task = self._flush_task
+        if task is not None and not task.done():
+            if self._flushing:
+                # Запись уже идет в потоке, дожидаемся ее.
+                await task
+            else:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        await self.flush()
+        self._closed = True
+        self._reader.close()
+        self._writer.close()
+
+
+def create_redis_storage(
+        url: str = FSM_REDIS_URL,
+        ttl: float = FSM_STATE_TTL
+) -> RedisStorage:
+    """
+    Хранилище FSM в Redis (RedisStorage из aiogram).
+
+    Учитываются схема URL (rediss:// - TLS) и имя пользователя ACL.
+    Соединение и команды ограничены таймаутом FSM_REDIS_TIMEOUT,
+    состояние и данные удаляются через ttl секунд после записи.
+    """
+    return RedisStorage.from_url(
+        url,
+        connection_kwargs={
+            'socket_connect_timeout': FSM_REDIS_TIMEOUT,
+            'socket_timeout': FSM_REDIS_TIMEOUT
+        },
+        key_builder=key_builder,
+        state_ttl=int(ttl),
+        data_ttl=int(ttl),
+        json_loads=loads,
+        json_dumps=dumps
+    )
+
+
+def create_storage() -> BaseStorage:
+    """Хранилище FSM в соответствии с настройкой FSM_STORAGE."""
+    if FSM_STORAGE == 'sqlite':
+        return SQLiteStorage(FSM_SQLITE_PATH)
+    if FSM_STORAGE == 'redis':
+        return create_redis_storage(FSM_REDIS_URL)
+    return TTLMemoryStorage()
@@ -0,0 +1,40 @@
+"""Файлы для отправки в Telegram."""
+
+from tempfile import SpooledTemporaryFile
+from typing import AsyncGenerator
+
+from aiogram import Bot
+from aiogram.types import InputFile
+from aiogram.types.input_file import DEFAULT_CHUNK_SIZE
+
+
+class SpooledInputFile(InputFile):
+    """
+    Файл из SpooledTemporaryFile. Отправляется частями по chunk_size,
+    не загружаясь в память целиком. Закрывается после отправки
+    (close или контекстный менеджер).
+    """
+
+    def __init__(
+            self,
+            file: SpooledTemporaryFile,
+            filename: str,
+            chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
+
+    def close(self):
+        """Закрытие (и удаление с диска) временного файла."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -10,117 +10,19 @@ class GeneratorKb:
     """Класс для генерации клавиатур."""
 
     @staticmethod
-    def generate_for_choose_period() -> KeyboardBuilder:
+    def generate_for_choose_period(today: date = None) -> KeyboardBuilder:
         """
         Генерация кнопок для выбора периода.
         Генерирует кнопку текущего месяца, а также
         кнопки 2 предыдущих и 2 следующих месяцев.
         """
         builder = InlineKeyboardBuilder()
-        today = date.today()
-
-        # Если текущий месяц январь.
-        if today.month == 1:
-            builder.button(
-                text=f'11_{today.year - 1}',
-                callback_data=f'period_11_{today.year - 1}'
-            )
-            builder.button(
-                text=f'12_{today.year - 1}',
-                callback_data=f'period_12_{today.year - 1}'
-            )
-            builder.button(
-                text=f'01_{today.year}',
-                callback_data=f'period_01_{today.year}'
-            )
-            builder.button(
-                text=f'02_{today.year}',
-                callback_data=f'period_02_{today.year}'
-            )
-            builder.button(
-                text=f'03_{today.year}',
-                callback_data=f'period_03_{today.year}'
-            )
-
-        # Если текущий месяц февраль.
-        elif today.month == 2:
-            builder.button(
-                text=f'12_{today.year - 1}',
-                callback_data=f'period_12_{today.year - 1}'
-            )
-            builder.button(
-                text=f'01_{today.year}',
-                callback_data=f'period_01_{today.year}'
-            )
-            builder.button(
-                text=f'02_{today.year}',
-                callback_data=f'period_02_{today.year}'
-            )
-            builder.button(
-                text=f'03_{today.year}',
-                callback_data=f'period_03_{today.year}'
-            )
-            builder.button(
-                text=f'04_{today.year}',
-                callback_data=f'period_04_{today.year}'
-            )
-
-        # Если текущий месяц ноябрь.
-        elif today.month == 11:
-            builder.button(
-                text=f'09_{today.year}',
-                callback_data=f'period_09_{today.year}'
-            )
-            builder.button(
-                text=f'10_{today.year}',
-                callback_data=f'period_10_{today.year}'
-            )
-            builder.button(
-                text=f'11_{today.year}',
-                callback_data=f'period_11_{today.year}'
-            )
-            builder.button(
-                text=f'12_{today.year}',
-                callback_data=f'period_12_{today.year}'
-            )
-            builder.button(
-                text=f'01_{today.year}',
-                callback_data=f'period_01_{today.year + 1}'
-            )
-
-        # Если текущий месяц декабрь.
-        elif today.month == 12:
-            builder.button(
-                text=f'10_{today.year}',
-                callback_data=f'period_10_{today.year}'
-            )
-            builder.button(
-                text=f'11_{today.year}',
-                callback_data=f'period_11_{today.year}'
-            )
-            builder.button(
-                text=f'12_{today.year}',
-                callback_data=f'period_12_{today.year}'
-            )
-            builder.button(
-                text=f'01_{today.year + 1}',
-                callback_data=f'period_01_{today.year + 1}'
-            )
-            builder.button(
-                text=f'02_{today.year + 1}',
-                callback_data=f'period_02_{today.year + 1}'
-            )
-
-        # В остальных случаях.
-        else:
-            for offset in range(-2, 3):
-                builder.button(
-                    text=f'{str(today.month + offset).zfill(2)}_'
-                         f'{today.year}',
-                    callback_data=f'period_'
-                                  f'{str(today.month + offset).zfill(2)}_'
-                                  f'{today.year}'
-                )
+        today = today or date.today()
+        for offset in range(-2, 3):
+            # Номер месяца от начала эры, чтобы переходить через год.
+            year, month = divmod(today.year * 12 + today.month - 1 + offset, 12)
+            period = f'{month + 1:02}_{year}'
+            builder.button(text=period, callback_data=f'period_{period}')
         return builder.adjust(2, 1, 2)
 
     @staticmethod
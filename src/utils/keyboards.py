@@ -1,12 +1,49 @@
 """Создание клавиатур."""
 
-from aiogram.types import InlineKeyboardButton
+from datetime import date
+from typing import Callable, Hashable
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from pydantic import ConfigDict
 
+from config import KEYBOARD_CACHE_SIZE, KEYBOARD_CACHE_TTL
+from utils.cache import TTLCache
 from utils.keyboard_generators import GeneratorKb
 from utils.models import Summary, Space, UserShort
 
 
+class FrozenKeyboardMarkup(InlineKeyboardMarkup):
+    """Неизменяемая клавиатура, общая для всех сообщений."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+def freeze(rows: list[list[InlineKeyboardButton]]) -> FrozenKeyboardMarkup:
+    """Неизменяемая клавиатура из рядов кнопок."""
+    return FrozenKeyboardMarkup(inline_keyboard=rows)
+
+
+# Клавиатуры, построенные из данных (статьи, пространства, периоды),
+# по ключу из содержимого этих данных.
+keyboard_cache = TTLCache('keyboards', KEYBOARD_CACHE_SIZE, KEYBOARD_CACHE_TTL)
+
+
+def memoize(
+        key: Hashable,
+        build: Callable[[], InlineKeyboardBuilder]
+) -> FrozenKeyboardMarkup:
+    """
+    Клавиатура из кеша по ключу содержимого.
+    При промахе клавиатура строится функцией build и кешируется.
+    """
+    markup = keyboard_cache.get(key)
+    if markup is None:
+        markup = freeze(build().export())
+        keyboard_cache.set(key, markup)
+    return markup
+
+
 class FamilyFinanceKb:
     """Базовый класс Inline клавиатуры приложения."""
 
@@ -17,12 +54,12 @@ class FamilyFinanceKb:
     button_choose_period = InlineKeyboardButton(
         text='Выбрать период', callback_data='choose_period')
 
+    markup_go_to_main = freeze([[button_back_to_start]])
+
     @classmethod
     def go_to_main(cls):
         """Клавиатура для перехода на главную."""
-        builder = InlineKeyboardBuilder()
-        builder.row(cls.button_back_to_start)
-        return builder.as_markup()
+        return cls.markup_go_to_main
 
 
 class WorkWithBase(FamilyFinanceKb):
@@ -62,31 +99,60 @@ class WorkWithBase(FamilyFinanceKb):
         [FamilyFinanceKb.button_back_to_start]
     ]
 
+    markup_main_menu = freeze(buttons_main_menu)
+    markup_choose_type = freeze(buttons_choose_type)
+    markup_look_base = freeze(buttons_look_base)
+
     @classmethod
     def main_menu(cls):
         """Клавиатура главного меню."""
-        builder = InlineKeyboardBuilder(markup=cls.buttons_main_menu)
-        return builder.as_markup()
+        return cls.markup_main_menu
 
     @classmethod
     def choose_type(cls):
         """Клавиатура выбора типа операции."""
-        builder = InlineKeyboardBuilder(markup=cls.buttons_choose_type)
-        return builder.as_markup()
+        return cls.markup_choose_type
 
     @classmethod
     def choose_group_name(cls, summary: Summary):
         """Клавиатура выбора статьи."""
-        builder = GeneratorKb.generate_choose_group_name(summary)
-        builder.row(cls.button_back_to_start)
-        builder.adjust(1)
-        return builder.as_markup()
+        return memoize(
+            (
+                'choose_group_name',
+                tuple((group.id, group.group_name) for group in summary.summary)
+            ),
+            lambda: GeneratorKb.generate_choose_group_name(summary)
+            .row(cls.button_back_to_start)
+            .adjust(1)
+        )
 
     @classmethod
-    def look_base(cls):
-        """Клавиатура просмотра отчета."""
-        builder = InlineKeyboardBuilder(markup=cls.buttons_look_base)
-        return builder.as_markup()
+    def look_base(cls, page: int = 0, pages: int = 1):
+        """
+        Клавиатура просмотра отчета.
+        Для многостраничного отчета добавляются кнопки перехода
+        на предыдущую и следующую страницы.
+        """
+        if pages <= 1:
+            return cls.markup_look_base
+
+        def build():
+            navigation = []
+            if page > 0:
+                navigation.append(InlineKeyboardButton(
+                    text='◀️ Назад',
+                    callback_data=f'look_base_{page - 1}'
+                ))
+            if page < pages - 1:
+                navigation.append(InlineKeyboardButton(
+                    text='Вперед ▶️',
+                    callback_data=f'look_base_{page + 1}'
+                ))
+            return InlineKeyboardBuilder(
+                markup=[navigation, *cls.buttons_look_base]
+            )
+
+        return memoize(('look_base', page, pages), build)
 
 
 class RegistrationKb(FamilyFinanceKb):
@@ -104,20 +170,20 @@ class RegistrationKb(FamilyFinanceKb):
         button_registration_delete_cancel
     ]]
 
+    markup_add_registration = freeze([[button_registration]])
+    markup_confirm_delete_registration = freeze(
+        buttons_confirm_delete_registration
+    )
+
     @classmethod
     def add_registration(cls):
         """Клавиатура для регистрации."""
-        builder = InlineKeyboardBuilder()
-        builder.row(cls.button_registration)
-        return builder.as_markup()
+        return cls.markup_add_registration
 
     @classmethod
     def confirm_delete_registration(cls):
         """Клавиатура подтверждения/отмены удаления аккаунта."""
-        builder = InlineKeyboardBuilder(
-            markup=cls.buttons_confirm_delete_registration
-        ).adjust(cls.default_adjust)
-        return builder.as_markup()
+        return cls.markup_confirm_delete_registration
 
 
 class SettingsKb(FamilyFinanceKb):
@@ -158,41 +224,53 @@ class SettingsKb(FamilyFinanceKb):
         [button_delete_linked_account],
         [button_instruction_linked_account],
         [button_back_to_settings]]
+    buttons_joint_chat_add = [
+        [button_joint_chat_instruction],
+        [button_back_to_settings]]
+    buttons_joint_chat_delete = [
+        [button_joint_chat_delete],
+        [button_back_to_settings]]
+
+    markup_back_to_settings = freeze(buttons_back_to_settings)
+    markup_settings = freeze(buttons_settings)
+    markup_choose_period = freeze([[FamilyFinanceKb.button_choose_period]])
+    markup_manage_linked_accounts = freeze(buttons_manage_linked_accounts)
+    markup_joint_chat_add = freeze(buttons_joint_chat_add)
+    markup_joint_chat_delete = freeze(buttons_joint_chat_delete)
 
     @classmethod
     def back_to_settings(cls):
         """Клавиатура возврата в настройки приложения."""
-        builder = InlineKeyboardBuilder(markup=cls.buttons_back_to_settings)
-        return builder.as_markup()
+        return cls.markup_back_to_settings
 
     @classmethod
     def settings(cls):
         """Клавиатура меню настроек приложения."""
-        builder = InlineKeyboardBuilder(markup=cls.buttons_settings)
-        return builder.as_markup()
+        return cls.markup_settings
 
     @classmethod
     def choose_period(cls):
         """Клавиатура выбора периода."""
-        builder = InlineKeyboardBuilder()
-        builder.row(cls.button_choose_period)
-        return builder.as_markup()
+        return cls.markup_choose_period
 
     @classmethod
     def generate_choose_period(cls):
-        """Клавиатура генерирующая кнопки периодов для выбора."""
-        builder = GeneratorKb.generate_for_choose_period()
-        builder.row(cls.button_archive)
-        builder.row(cls.button_back_to_start)
-        return builder.as_markup()
+        """
+        Клавиатура генерирующая кнопки периодов для выбора.
+        Строится один раз за календарный день.
+        """
+        today = date.today()
+        return memoize(
+            ('choose_period', today),
+            lambda: GeneratorKb.generate_for_choose_period(today)
+            .row(cls.button_archive)
+            .row(cls.button_back_to_start)
+        )
 
     @classmethod
     def manage_linked_accounts(cls):
         """Клавиатура меню для управления привязанными аккаунтами."""
-        builder = InlineKeyboardBuilder(
-            markup=cls.buttons_manage_linked_accounts
-        )
-        return builder.as_markup()
+        return cls.markup_manage_linked_accounts
 
     @classmethod
     def generate_users_for_unlink(
@@ -203,10 +281,15 @@ class SettingsKb(FamilyFinanceKb):
         Клавиатура генерирует кнопки для выбора пользователя
         и его отвязки от выбранного пространства.
         """
-        builder = GeneratorKb.generate_users_for_unlink(linked_users)
-        builder.row(cls.button_back_to_settings)
-        builder.adjust(1)
-        return builder.as_markup()
+        return memoize(
+            (
+                'users_for_unlink',
+                tuple((user.id, user.username) for user in linked_users)
+            ),
+            lambda: GeneratorKb.generate_users_for_unlink(linked_users)
+            .row(cls.button_back_to_settings)
+            .adjust(1)
+        )
 
     @classmethod
     def generate_choose_space(
@@ -218,37 +301,42 @@ class SettingsKb(FamilyFinanceKb):
         Клавиатура генерирует кнопки для выбора
         доступного пользователю пространства.
         """
-        builder = GeneratorKb.generate_choose_space(owner_id, spaces)
-        builder.add(cls.button_back_to_settings)
-        builder.adjust(1)
-        return builder.as_markup()
+        return memoize(
+            (
+                'choose_space',
+                int(owner_id),
+                tuple(
+                    (space.id, space.name, space.owner_id, space.owner_username)
+                    for space in spaces
+                )
+            ),
+            lambda: GeneratorKb.generate_choose_space(owner_id, spaces)
+            .add(cls.button_back_to_settings)
+            .adjust(1)
+        )
 
     @classmethod
     def joint_chat_add(cls):
         """Клавиатура подключения пользователя к текущему пространству."""
-        builder = InlineKeyboardBuilder()
-        builder.row(cls.button_joint_chat_instruction)
-        builder.row(cls.button_back_to_settings)
-        builder.adjust(1)
-        return builder.as_markup()
+        return cls.markup_joint_chat_add
 
     @classmethod
     def joint_chat_delete(cls):
         """Клавиатура отключения пользователя от текущего пространства."""
-        builder = InlineKeyboardBuilder()
-        builder.row(cls.button_joint_chat_delete)
-        builder.row(cls.button_back_to_settings)
-        builder.adjust(1)
-        return builder.as_markup()
+        return cls.markup_joint_chat_delete
 
     @classmethod
     def generate_choose_all_years_in_space(cls, years: list[str]):
-        builder = GeneratorKb.generate_years(years)
-        builder.row(cls.button_back_to_start)
-        return builder.as_markup()
+        return memoize(
+            ('years', tuple(years)),
+            lambda: GeneratorKb.generate_years(years)
+            .row(cls.button_back_to_start)
+        )
 
     @classmethod
     def generate_choose_month_in_year(cls, months: list[str]):
-        builder = GeneratorKb.generate_months(months)
-        builder.row(cls.button_back_to_start)
-        return builder.as_markup()
+        return memoize(
+            ('months', tuple(months)),
+            lambda: GeneratorKb.generate_months(months)
+            .row(cls.button_back_to_start)
+        )
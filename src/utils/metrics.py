@@ -0,0 +1,52 @@
+"""Метрики компонентов приложения."""
+
+from collections import Counter
+from typing import Callable
+
+registry: dict[str, 'Metrics'] = {}
+
+
+class Metrics:
+    """
+    Счетчики и гейджи одного компонента приложения.
+
+    Экземпляр регистрируется в общем реестре под своим именем,
+    новый экземпляр с тем же именем заменяет предыдущий.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counters: Counter = Counter()
+        self.gauges: dict[str, Callable[[], int | float]] = {}
+        registry[name] = self
+
+    def inc(self, name: str, label: str = None, value: int | float = 1):
+        """
+        Увеличение счетчика.
+
+        :param name: Название счетчика.
+        :param label: Опционально. Метка (например, эндпоинт).
+        :param value: Величина увеличения.
+        """
+        self.counters[f'{name}:{label}' if label else name] += value
+
+    def gauge(self, name: str, callback: Callable[[], int | float]):
+        """
+        Регистрация гейджа, значение которого вычисляется при снятии метрик.
+
+        :param name: Название гейджа.
+        :param callback: Функция без аргументов, возвращающая значение.
+        """
+        self.gauges[name] = callback
+
+    def snapshot(self) -> dict:
+        """Текущие значения счетчиков и гейджей."""
+        result = dict(self.counters)
+        for name, callback in self.gauges.items():
+            result[name] = callback()
+        return result
+
+
+def collect() -> dict[str, dict]:
+    """Снятие метрик всех компонентов."""
+    return {name: metrics.snapshot() for name, metrics in registry.items()}
@@ -1,19 +1,188 @@
 """Мидлвари."""
 
+import asyncio
+import logging
+from contextlib import suppress
+
 from aiogram import BaseMiddleware
-from aiogram.types import CallbackQuery, Message, TelegramObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import CallbackQuery, Message, TelegramObject, Update
 from typing import Callable, Dict, Any, Awaitable
 
 import messages.texts
+from config import (
+    THROTTLE_GLOBAL_BURST,
+    THROTTLE_GLOBAL_RATE,
+    THROTTLE_MAX_USERS,
+    THROTTLE_USER_BURST,
+    THROTTLE_USER_RATE,
+    UPDATE_DEADLINE
+)
 from engine import backend_client
-from utils import keyboards
+from messages import errors
+from utils import deadline, keyboards, render
 from utils.exceptions import BackendError
+from utils.metrics import Metrics
+from utils.throttling import TokenBucket, TokenBuckets
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничивает частоту апдейтов от каждого пользователя и в целом.
+    Апдейты сверх лимита не обрабатываются (и не запрашивают бэкенд),
+    на callback отвечается коротким уведомлением.
+    """
+
+    def __init__(
+            self,
+            user_rate: float = THROTTLE_USER_RATE,
+            user_burst: float = THROTTLE_USER_BURST,
+            global_rate: float = THROTTLE_GLOBAL_RATE,
+            global_burst: float = THROTTLE_GLOBAL_BURST,
+            max_users: int = THROTTLE_MAX_USERS
+    ):
+        self.users = TokenBuckets(user_rate, user_burst, max_users)
+        self.total = TokenBucket(global_rate, global_burst)
+        self.metrics = Metrics('throttling')
+        self.metrics.gauge('buckets', lambda: len(self.users))
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get('event_from_user')
+        if user is not None and not self.users.consume(user.id):
+            return await self._throttled(event, 'user')
+        if not self.total.consume():
+            return await self._throttled(event, 'global')
+        self.metrics.inc('passed')
+        return await handler(event, data)
+
+    async def _throttled(self, event: Update, scope: str):
+        """Учет отброшенного апдейта и ответ на callback."""
+        self.metrics.inc('throttled', scope)
+        if event.callback_query is not None:
+            with suppress(TelegramAPIError):
+                await event.callback_query.answer(errors.TOO_MANY_REQUESTS)
+
+
+class DeadlineMiddleware(BaseMiddleware):
+    """
+    Устанавливает дедлайн обработки апдейта.
+    Запросы к бэкенду получают таймауты из оставшегося бюджета,
+    а по его истечении обработка апдейта отменяется и пользователю
+    отправляется сообщение об ошибке (на callback - уведомление).
+    Хэндлер может продлить бюджет флагом deadline
+    (см. DeadlineFlagMiddleware).
+    """
+
+    def __init__(self, budget: float = UPDATE_DEADLINE):
+        self.budget = budget
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        when = asyncio.get_running_loop().time() + self.budget
+        timeout = asyncio.timeout_at(when)
+        token = deadline.deadline.set(when)
+        timeout_token = deadline.timeout.set(timeout)
+        try:
+            async with timeout:
+                return await handler(event, data)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            deadline.metrics.inc('exceeded')
+            logger.warning(f'Превышен дедлайн обработки апдейта: {event}')
+            await self._notify(event)
+        finally:
+            deadline.timeout.reset(timeout_token)
+            deadline.deadline.reset(token)
+
+    @staticmethod
+    async def _notify(event: Update):
+        """Сообщение пользователю о прерванной обработке апдейта."""
+        callback = getattr(event, 'callback_query', None)
+        message = getattr(event, 'message', None)
+        with suppress(TelegramAPIError):
+            if callback is not None:
+                await callback.answer(
+                    errors.DEADLINE_EXCEEDED,
+                    show_alert=True
+                )
+            elif message is not None:
+                await message.answer(errors.DEADLINE_EXCEEDED)
+
+
+class DeadlineFlagMiddleware(BaseMiddleware):
+    """
+    Продлевает дедлайн апдейта для хэндлеров с флагом deadline
+    (бюджет в секундах), например для экспорта в Excel:
+    @router.callback_query(..., flags={'deadline': EXPORT_DEADLINE}).
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        budget = get_flag(data, 'deadline')
+        if budget is not None:
+            deadline.extend(budget)
+        return await handler(event, data)
+
+
+class CallbackDedupMiddleware(BaseMiddleware):
+    """
+    Отбрасывает повторные нажатия той же кнопки того же сообщения,
+    пока обработка первого нажатия не завершилась.
+    На отброшенный callback отвечается без уведомления.
+    """
+
+    def __init__(self):
+        self.in_flight: set[tuple] = set()
+        self.metrics = Metrics('callback_dedup')
+        self.metrics.gauge('in_flight', lambda: len(self.in_flight))
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        key = (
+            event.from_user.id,
+            event.data,
+            event.message.message_id if event.message
+            else event.inline_message_id
+        )
+        if key in self.in_flight:
+            self.metrics.inc('suppressed')
+            with suppress(TelegramAPIError):
+                await event.answer()
+            return None
+        self.in_flight.add(key)
+        try:
+            return await handler(event, data)
+        finally:
+            self.in_flight.discard(key)
 
 
 class AuthMessageMiddleware(BaseMiddleware):
     """
     Проверяет регистрацию пользователя при входящем событии Message.
     Если пользователь не зарегистрирован, предлагается регистрация.
+    Проверенный пользователь передается в хэндлер аргументами
+    user (User) и user_id (ID пользователя в бэкенде).
     """
 
     async def __call__(
@@ -57,6 +226,8 @@ class AuthMessageMiddleware(BaseMiddleware):
             )
 
         # Если пользователь найден, выполняется вызываемое событие.
+        data['user'] = user
+        data['user_id'] = user.id
         return await handler(event, data)
 
 
@@ -64,8 +235,14 @@ class AuthCallbackMiddleware(BaseMiddleware):
     """
     Проверяет регистрацию пользователя при входящем событии Callback.
     Если пользователь не зарегистрирован, предлагается регистрация.
+    Проверенный пользователь передается в хэндлер аргументами
+    user (User) и user_id (ID пользователя в бэкенде).
     """
 
+    # Callback, которые сами устанавливают базу или период,
+    # поэтому проверка настроек для них не выполняется.
+    setup_callbacks = ('choose_space', 'all_periods')
+
     async def __call__(
             self,
             handler: Callable[
@@ -84,7 +261,8 @@ class AuthCallbackMiddleware(BaseMiddleware):
 
         # Обработка BackendError.
         except BackendError as e:
-            return await event.message.edit_text(
+            return await render.edit_text(
+                event.message,
                 str(e),
                 reply_markup=keyboards.FamilyFinanceKb.go_to_main()
             )
@@ -92,14 +270,22 @@ class AuthCallbackMiddleware(BaseMiddleware):
         # Если пользователь не зарегистрирован,
         # отправляется предложение регистрации.
         if not user:
-            return await event.message.edit_text(
+            return await render.edit_text(
+                event.message,
                 messages.texts.START_TEXT_FOR_NEW_USER,
                 reply_markup=keyboards.RegistrationKb().add_registration()
             )
 
+        # Пользователь настраивает базу или период.
+        if event.data.startswith(self.setup_callbacks):
+            data['user'] = user
+            data['user_id'] = user.id
+            return await handler(event, data)
+
         # Если space не установлено, сообщение о необходимости выбрать space.
         if user.core_settings.current_space is None:
-            return await event.message.edit_text(
+            return await render.edit_text(
+                event.message,
                 messages.texts.CHOOSE_SPACE,
                 reply_markup=keyboards.SettingsKb.generate_choose_space(
                     user.id,
@@ -110,10 +296,13 @@ class AuthCallbackMiddleware(BaseMiddleware):
         # Если current_month или current_year не установлены,
         # сообщение о необходимости выбрать период.
         if user.core_settings.current_month is None or user.core_settings.current_year is None:
-            return await event.message.edit_text(
+            return await render.edit_text(
+                event.message,
                 messages.texts.CHOOSE_PERIOD,
                 reply_markup=keyboards.SettingsKb.generate_choose_period()
             )
 
         # Если пользователь найден, выполняется вызываемое событие.
+        data['user'] = user
+        data['user_id'] = user.id
         return await handler(event, data)
@@ -2,8 +2,8 @@
 
 from decimal import Decimal
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Annotated, Any, Optional
 from datetime import datetime
 
 
@@ -115,3 +115,45 @@ class Transaction(BaseModel):
     description: str
     value_transaction: Decimal
     author: int
+
+
+class EmptySummary(BaseModel):
+    """Модель суммарного отчета без статей."""
+
+    summary: list[Any] = Field(max_length=0)
+
+
+# Ответ на запрос отчета: пустой отчет или Summary.
+SummaryResponse = TypeAdapter(
+    Annotated[EmptySummary | Summary, Field(union_mode='left_to_right')]
+)
+
+
+class SummaryLookup(BaseModel):
+    """Модель ответа на поиск статей по названию."""
+
+    summary: list[Any]
+
+
+class UserId(BaseModel):
+    """Модель ответа с ID пользователя."""
+
+    user_id: int
+
+
+class UserList(BaseModel):
+    """Модель списка пользователей."""
+
+    results: list[User]
+
+
+class Years(BaseModel):
+    """Модель списка годов, в которых есть данные."""
+
+    years: list[int | str]
+
+
+class Months(BaseModel):
+    """Модель списка месяцев, в которых есть данные."""
+
+    months: list[int | str]
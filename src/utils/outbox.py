@@ -0,0 +1,144 @@
+"""Очередь уведомлений в совместные чаты."""
+
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramForbiddenError
+)
+
+from config import (
+    MAX_MESSAGE_LENGTH,
+    OUTBOX_BACKOFF_BASE,
+    OUTBOX_BACKOFF_MAX,
+    OUTBOX_DIGEST_WINDOW,
+    OUTBOX_MAX_ATTEMPTS
+)
+from messages.transaction_texts import DIGEST_TO_JOINT_CHAT
+from utils.metrics import Metrics
+from utils.resilience import backoff_delay
+from utils.send_queue import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationOutbox:
+    """
+    Асинхронная отправка уведомлений в совместные чаты.
+
+    Хэндлер только ставит уведомление в очередь и не ждет доставки.
+    Уведомления в чат, накопившиеся за window секунд с первого
+    из них, отправляются одним сообщением-дайджестом. Ошибки отправки
+    повторяются с экспоненциальной задержкой; если чат недоступен
+    (бот удален из группы, чат не найден), уведомления отбрасываются.
+    """
+
+    def __init__(
+            self,
+            bot: Bot,
+            window: float = OUTBOX_DIGEST_WINDOW,
+            max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+            backoff_base: float = OUTBOX_BACKOFF_BASE,
+            backoff_max: float = OUTBOX_BACKOFF_MAX
+    ):
+        self.bot = bot
+        self.window = window
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pending: dict[str, list[str]] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.metrics = Metrics('notification_outbox')
+        self.metrics.gauge(
+            'pending',
+            lambda: sum(len(notices) for notices in self.pending.values())
+        )
+
+    def notify(self, chat_id: str, text: str):
+        """
+        Постановка уведомления в очередь чата.
+
+        :param chat_id: ID совместного чата.
+        :param text: Текст уведомления.
+        """
+        self.pending.setdefault(chat_id, []).append(text)
+        self.metrics.inc('enqueued')
+        if chat_id not in self.tasks:
+            self.tasks[chat_id] = asyncio.create_task(self._deliver(chat_id))
+
+    async def close(self):
+        """Немедленная отправка накопленных уведомлений при остановке."""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self.pending:
+            chat_id, notices = self.pending.popitem()
+            await self._send(chat_id, notices)
+
+    async def _deliver(self, chat_id: str):
+        """Отправка дайджестов чата, пока в его очереди есть уведомления."""
+        try:
+            while self.pending.get(chat_id):
+                await asyncio.sleep(self.window)
+                await self._send(chat_id, self.pending.pop(chat_id))
+        finally:
+            self.tasks.pop(chat_id, None)
+
+    async def _send(self, chat_id: str, notices: list[str]):
+        """Отправка уведомлений чата одним или несколькими сообщениями."""
+        for text in self._digests(notices):
+            for attempt in range(self.max_attempts):
+                try:
+                    with priority(Priority.NOTIFICATION):
+                        await self.bot.send_message(chat_id, text)
+                    self.metrics.inc('delivered')
+                    break
+
+                # Чат недоступен - повтор не поможет.
+                except (TelegramBadRequest, TelegramForbiddenError) as e:
+                    self.metrics.inc('dropped', value=len(notices))
+                    logger.warning(f'Чат {chat_id} недоступен: {e}')
+                    return
+
+                except TelegramAPIError as e:
+                    if attempt == self.max_attempts - 1:
+                        self.metrics.inc('dropped', value=len(notices))
+                        logger.error(
+                            f'Уведомление в чат {chat_id} не доставлено: {e}'
+                        )
+                        return
+                    self.metrics.inc('retries')
+                    await asyncio.sleep(backoff_delay(
+                        attempt,
+                        self.backoff_base,
+                        self.backoff_max
+                    ))
+
+    @staticmethod
+    def _digests(notices: list[str]) -> list[str]:
+        """
+        Объединение уведомлений в сообщения не длиннее лимита Telegram.
+        Одиночное уведомление отправляется без заголовка дайджеста.
+        """
+        if len(notices) == 1:
+            return notices
+        parts, part, length = [], [], 0
+        limit = MAX_MESSAGE_LENGTH - len(DIGEST_TO_JOINT_CHAT) - 10
+        for notice in notices:
+            if part and length + len(notice) + 2 > limit:
+                parts.append(part)
+                part, length = [], 0
+            part.append(notice)
+            length += len(notice) + 2
+        parts.append(part)
+        return [
+            DIGEST_TO_JOINT_CHAT.format(
+                count=len(part),
+                notices='\n\n'.join(part)
+            ) if len(part) > 1 else part[0]
+            for part in parts
+        ]
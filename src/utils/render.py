@@ -0,0 +1,87 @@
+"""Отображение сообщений бота."""
+
+from typing import Any
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, Message
+
+from config import BOT_MODE, RENDER_CACHE_SIZE, RENDER_CACHE_TTL
+from utils.cache import TTLCache
+from utils.metrics import Metrics
+
+# Отпечатки последнего отображенного содержимого сообщений
+# по (chat_id, message_id).
+fingerprints = TTLCache(
+    'render_fingerprints',
+    RENDER_CACHE_SIZE,
+    RENDER_CACHE_TTL
+)
+metrics = Metrics('render')
+
+# Пропуск правок безопасен, только если все апдейты получает этот процесс
+# (polling). В режиме webhook сообщение могла изменить другая реплика,
+# и локальный отпечаток устарел.
+skip_unchanged = BOT_MODE == 'polling'
+
+
+def fingerprint(
+        text: str,
+        reply_markup: InlineKeyboardMarkup | None,
+        kwargs: dict[str, Any]
+) -> int:
+    """Отпечаток текста, клавиатуры и параметров сообщения."""
+    markup = (
+        reply_markup.model_dump_json(exclude_none=True) if reply_markup
+        else None
+    )
+    return hash((text, markup, repr(sorted(kwargs.items()))))
+
+
+async def edit_text(
+        message: Message,
+        text: str,
+        reply_markup: InlineKeyboardMarkup | None = None,
+        **kwargs
+) -> Message | bool:
+    """
+    Редактирование текста сообщения.
+
+    Если текст и клавиатура не отличаются от последних отображенных
+    в этом сообщении, запрос к Telegram не выполняется
+    (только при skip_unchanged).
+
+    :param message: Редактируемое сообщение.
+    :param text: Новый текст.
+    :param reply_markup: Опционально. Новая инлайн клавиатура.
+    :return: Отредактированное сообщение или исходное, если
+        редактирование пропущено.
+    """
+    key = (message.chat.id, message.message_id)
+    current = None
+    if skip_unchanged:
+        current = fingerprint(text, reply_markup, kwargs)
+    if current is not None and fingerprints.get(key) == current:
+        metrics.inc('skipped')
+        return message
+    try:
+        result = await message.edit_text(
+            text,
+            reply_markup=reply_markup,
+            **kwargs
+        )
+
+    # Содержимое сообщения изменено вне этого модуля (например, до
+    # перезапуска бота) и совпадает с новым.
+    except TelegramBadRequest as e:
+        if 'message is not modified' not in e.message:
+            fingerprints.invalidate(key)
+            raise
+        metrics.inc('not_modified')
+        if current is not None:
+            fingerprints.set(key, current)
+        return message
+
+    if current is not None:
+        fingerprints.set(key, current)
+    metrics.inc('edited')
+    return result
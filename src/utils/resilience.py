@@ -0,0 +1,122 @@
+"""Повторные запросы и автоматический выключатель (circuit breaker)."""
+
+import random
+import time
+
+from utils.metrics import Metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Задержка перед повтором: экспоненциальный рост с полным джиттером.
+
+    :param attempt: Номер повтора, начиная с 0.
+    :param base: Базовая задержка в секундах.
+    :param cap: Максимальная задержка в секундах.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Выключатель одного эндпоинта.
+
+    После failure_threshold ошибок подряд размыкается и отклоняет запросы
+    reset_timeout секунд, затем пропускает один пробный запрос:
+    успех замыкает выключатель, ошибка снова размыкает.
+    """
+
+    def __init__(
+            self,
+            endpoint: str,
+            failure_threshold: int,
+            reset_timeout: float,
+            metrics: Metrics
+    ):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at: float | None = None
+
+    def allow(self) -> bool:
+        """Можно ли выполнить запрос."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                self.metrics.inc('rejected', self.endpoint)
+                return False
+            self.state = HALF_OPEN
+            self.probe_at = None
+
+        # Пробный запрос один. Если он завис или был отменен,
+        # через reset_timeout разрешается следующий.
+        if self.probe_at is not None and now - self.probe_at < self.reset_timeout:
+            self.metrics.inc('rejected', self.endpoint)
+            return False
+        self.probe_at = now
+        return True
+
+    def record_success(self):
+        """Учет успешного запроса."""
+        if self.state != CLOSED:
+            self.metrics.inc('closed', self.endpoint)
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_at = None
+
+    def record_failure(self):
+        """Учет неудачного запроса."""
+        self.failures += 1
+        self.probe_at = None
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.metrics.inc('opened', self.endpoint)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class CircuitBreakers:
+    """Выключатели эндпоинтов бэкенда, создаются при первом обращении."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.metrics = Metrics('backend_resilience')
+        self.metrics.gauge('open_breakers', self.count_open)
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        """Выключатель эндпоинта."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                self.failure_threshold,
+                self.reset_timeout,
+                self.metrics
+            )
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def count_open(self) -> int:
+        """Количество разомкнутых выключателей."""
+        return sum(
+            breaker.state == OPEN for breaker in self._breakers.values()
+        )
+
+    def open_endpoints(self) -> list[str]:
+        """Эндпоинты с разомкнутыми выключателями."""
+        return sorted(
+            breaker.endpoint for breaker in self._breakers.values()
+            if breaker.state == OPEN
+        )
@@ -0,0 +1,249 @@
+"""Планировщик исходящих запросов к Telegram."""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Hashable
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    CopyMessage,
+    DeleteMessage,
+    DeleteMessages,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessage,
+    SendDocument,
+    SendMessage,
+    SendPhoto,
+    TelegramMethod
+)
+from aiogram.methods.base import Response, TelegramType
+
+from config import (
+    SEND_CHAT_BURST,
+    SEND_CHAT_RATE,
+    SEND_GLOBAL_BURST,
+    SEND_GLOBAL_RATE,
+    SEND_GROUP_BURST,
+    SEND_GROUP_RATE,
+    SEND_MAX_CHATS,
+    SEND_MAX_RETRIES
+)
+from utils.metrics import Metrics
+from utils.throttling import TokenBucket, TokenBuckets
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Приоритет исходящего запроса (меньше - раньше)."""
+
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+    CLEANUP = 2
+
+
+# Запросы, на которые распространяются лимиты отправки Telegram.
+SCHEDULED_METHODS = (
+    SendMessage,
+    SendDocument,
+    SendPhoto,
+    CopyMessage,
+    ForwardMessage,
+    EditMessageText,
+    EditMessageReplyMarkup,
+    DeleteMessage,
+    DeleteMessages
+)
+CLEANUP_METHODS = (DeleteMessage, DeleteMessages)
+
+# Приоритет, явно заданный для запросов текущей задачи.
+send_priority: ContextVar[Priority | None] = ContextVar(
+    'send_priority',
+    default=None
+)
+
+
+@contextmanager
+def priority(value: Priority):
+    """
+    Установка приоритета запросов к Telegram внутри блока.
+
+    Пример: уведомления в совместный чат отправляются
+    с Priority.NOTIFICATION и не задерживают ответы пользователям.
+    """
+    token = send_priority.set(value)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Мидлварь сессии бота, пропускающая запросы отправки, редактирования
+    и удаления сообщений в пределах общего лимита и лимита чата.
+
+    Ожидающие запросы выпускаются в порядке приоритета: ответы
+    пользователю раньше уведомлений, уведомления раньше удаления
+    сообщений. После ответа 429 (RetryAfter) чат ставится на паузу
+    на retry_after секунд, и запрос повторяется.
+    """
+
+    def __init__(
+            self,
+            global_rate: float = SEND_GLOBAL_RATE,
+            global_burst: float = SEND_GLOBAL_BURST,
+            chat_rate: float = SEND_CHAT_RATE,
+            chat_burst: float = SEND_CHAT_BURST,
+            group_rate: float = SEND_GROUP_RATE,
+            group_burst: float = SEND_GROUP_BURST,
+            max_chats: int = SEND_MAX_CHATS,
+            max_retries: int = SEND_MAX_RETRIES
+    ):
+        self.total = TokenBucket(global_rate, global_burst)
+        self.chats = TokenBuckets(chat_rate, chat_burst, max_chats)
+        self.groups = TokenBuckets(group_rate, group_burst, max_chats)
+        self.max_retries = max_retries
+        self.paused_until: dict[Hashable, float] = {}
+        self._waiters: list[tuple] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._pump_task: asyncio.Task | None = None
+        self.metrics = Metrics('send_queue')
+        self.metrics.gauge('queue_depth', lambda: len(self._waiters))
+        self.metrics.gauge('paused_chats', lambda: len(self.paused_until))
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        if not isinstance(method, SCHEDULED_METHODS):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, 'chat_id', None)
+        level = send_priority.get()
+        if level is None:
+            level = (
+                Priority.CLEANUP if isinstance(method, CLEANUP_METHODS)
+                else Priority.INTERACTIVE
+            )
+
+        for attempt in itertools.count():
+            await self._acquire(level, chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                self.metrics.inc('retry_after', level.name.lower())
+                self._pause(chat_id, e.retry_after)
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(
+                    f'Лимит Telegram для чата {chat_id}, '
+                    f'повтор через {e.retry_after} с.'
+                )
+
+    def _buckets(self, chat_id) -> TokenBuckets:
+        """Ведра токенов для типа чата (группы имеют отрицательный id)."""
+        return self.groups if str(chat_id).startswith('-') else self.chats
+
+    def _pause(self, chat_id, seconds: float):
+        """Пауза отправки в чат (или всех запросов, если чат неизвестен)."""
+        self.paused_until[chat_id] = time.monotonic() + seconds
+        self._wakeup.set()
+
+    def _chat_delay(self, chat_id, now: float) -> float:
+        """Время до возможности отправки в чат, секунд."""
+        delay = 0.0
+        paused_until = self.paused_until.get(chat_id)
+        if paused_until is not None:
+            if paused_until <= now:
+                del self.paused_until[chat_id]
+            else:
+                delay = paused_until - now
+        if chat_id is not None:
+            delay = max(delay, self._buckets(chat_id).delay(chat_id, now))
+        return delay
+
+    def _global_delay(self, now: float) -> float:
+        """Время до возможности отправки любого запроса, секунд."""
+        return max(self.total.delay(now), self._chat_delay(None, now))
+
+    def _grant(self, chat_id, now: float):
+        """Списание токенов общего ведра и ведра чата."""
+        self.total.consume(now)
+        if chat_id is not None:
+            self._buckets(chat_id).consume(chat_id, now)
+
+    async def _acquire(self, level: Priority, chat_id):
+        """Ожидание очереди на отправку запроса."""
+        now = time.monotonic()
+        is_free = not self._waiters and not any((
+            self._global_delay(now),
+            self._chat_delay(chat_id, now)
+        ))
+        if is_free:
+            self._grant(chat_id, now)
+            self.metrics.inc('sent', level.name.lower())
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((level, next(self._seq), chat_id, future, now))
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        # Отмененное ожидание удаляется из очереди при ее разборе.
+        await future
+
+    async def _pump(self):
+        """Выпуск ожидающих запросов, пока очередь не опустеет."""
+        while self._waiters:
+            delay = self._release(time.monotonic())
+            if delay is None:
+                continue
+            self._wakeup.clear()
+            with suppress(TimeoutError):
+                async with asyncio.timeout(delay):
+                    await self._wakeup.wait()
+
+    def _release(self, now: float) -> float | None:
+        """
+        Выпуск первого по приоритету запроса, чат которого доступен.
+        Возвращает None, если запрос выпущен, иначе время до повторной
+        проверки очереди.
+        """
+        delay = self._global_delay(now)
+        if delay > 0:
+            return delay
+        delays = []
+        for waiter in sorted(self._waiters):
+            level, _, chat_id, future, enqueued_at = waiter
+            # Ожидание отменено (например, истек дедлайн апдейта).
+            if future.done():
+                self._waiters.remove(waiter)
+                return None
+            chat_delay = self._chat_delay(chat_id, now)
+            if chat_delay > 0:
+                delays.append(chat_delay)
+                continue
+            self._waiters.remove(waiter)
+            self._grant(chat_id, now)
+            future.set_result(None)
+            name = level.name.lower()
+            self.metrics.inc('sent', name)
+            self.metrics.inc('queued', name)
+            self.metrics.inc('wait_seconds', name, now - enqueued_at)
+            return None
+        return min(delays)
@@ -0,0 +1,53 @@
+"""Объединение одинаковых одновременных запросов (single-flight)."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from utils.metrics import Metrics
+
+
+class SingleFlight:
+    """
+    Одновременные вызовы с одинаковым ключом разделяют
+    один выполняющийся запрос и его результат (или исключение).
+    """
+
+    def __init__(self, name: str = 'single_flight'):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.metrics = Metrics(name)
+        self.metrics.gauge('in_flight', lambda: len(self._calls))
+
+    async def do(
+            self,
+            key: Hashable,
+            func: Callable[[], Awaitable[Any]],
+            label: str = None
+    ) -> Any:
+        """
+        Выполнение func или присоединение к уже выполняющемуся вызову.
+
+        Отмена одного из ожидающих не отменяет общий запрос
+        для остальных.
+
+        :param key: Ключ идентичности вызова.
+        :param func: Фабрика корутины запроса.
+        :param label: Опционально. Метка для счетчиков (эндпоинт).
+        :return: Результат func.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.metrics.inc('calls', label)
+        else:
+            self.metrics.inc('coalesced', label)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        """Удаление завершенного вызова."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Исключение считается полученным, даже если все ожидающие отменены.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,71 @@
+"""Индекс статей отчета за период."""
+
+from utils.models import Summary, SummaryDetail
+
+
+def normalize_group_name(group_name: str) -> str:
+    """Приведение названия статьи к виду для сравнения без учета регистра."""
+    return group_name.strip().casefold()
+
+
+# Строки таблицы отчета, которые не являются статьями.
+NO_INCOMES = 'no_incomes'
+SEPARATOR = 'separator'
+NO_EXPENSES = 'no_expenses'
+
+
+class SummaryIndex:
+    """
+    Отчет за период с индексами статей по ID и по названию.
+    Строится один раз на каждый полученный от бэкенда отчет.
+    """
+
+    __slots__ = ('summary', 'by_id', 'by_name', '_lines')
+
+    def __init__(self, summary: Summary | None):
+        self.summary = summary
+        groups = summary.summary if summary else []
+        self.by_id: dict[int, SummaryDetail] = {
+            group.id: group for group in groups
+        }
+        self.by_name: dict[str, SummaryDetail] = {
+            normalize_group_name(group.group_name): group for group in groups
+        }
+        self._lines: list[SummaryDetail | str] | None = None
+
+    @property
+    def key(self) -> tuple[int, int, int] | None:
+        """
+        Пространство и период отчета по данным бэкенда:
+        (space_id, month, year) или None, если отчет пуст.
+        """
+        if not self.summary or not self.summary.summary:
+            return None
+        group = self.summary.summary[0]
+        return group.space.id, group.period_month, group.period_year
+
+    @property
+    def lines(self) -> list[SummaryDetail | str]:
+        """
+        Строки таблицы отчета в порядке вывода: доходы, разделитель,
+        расходы. Строятся при первом обращении и хранятся вместе
+        с индексом в кеше, поэтому страница отчета - это срез списка.
+        """
+        if self._lines is None:
+            groups = self.summary.summary if self.summary else []
+            incomes = [g for g in groups if g.type_transaction == 'income']
+            expenses = [g for g in groups if g.type_transaction != 'income']
+            self._lines = [
+                *(incomes or [NO_INCOMES]),
+                SEPARATOR,
+                *(expenses or [NO_EXPENSES])
+            ]
+        return self._lines
+
+    def get_group(self, group_id: int | str) -> SummaryDetail | None:
+        """Статья по ID."""
+        return self.by_id.get(int(group_id))
+
+    def group_name_is_exist(self, group_name: str) -> bool:
+        """Проверка, есть ли в периоде статья с таким названием."""
+        return normalize_group_name(group_name) in self.by_name
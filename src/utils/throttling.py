@@ -0,0 +1,93 @@
+"""Ограничение частоты запросов (token bucket)."""
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucket:
+    """
+    Ведро токенов: вмещает до capacity токенов,
+    восполняется со скоростью rate токенов в секунду.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def consume(self, now: float = None) -> bool:
+        """Списание токена. False, если токенов нет."""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def delay(self, now: float = None) -> float:
+        """Время до появления токена, секунд (0, если токен есть)."""
+        now = time.monotonic() if now is None else now
+        tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate
+        )
+        return max(0.0, (1 - tokens) / self.rate)
+
+
+class TokenBuckets:
+    """
+    Ведра токенов по ключу (например, по пользователю).
+
+    Для ключа хранится только пара (tokens, updated_at). Ведро, которое
+    простаивало дольше времени полного восполнения, не отличается
+    от нового и удаляется. Число ведер ограничено maxsize (LRU).
+    """
+
+    def __init__(self, rate: float, capacity: float, maxsize: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.maxsize = maxsize
+        self.idle_after = capacity / rate
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = (
+            OrderedDict()
+        )
+
+    def consume(self, key: Hashable, now: float = None) -> bool:
+        """Списание токена из ведра ключа. False, если токенов нет."""
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+        tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    def delay(self, key: Hashable, now: float = None) -> float:
+        """Время до появления токена в ведре ключа, секунд."""
+        now = time.monotonic() if now is None else now
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        return max(0.0, (1 - tokens) / self.rate)
+
+    def _evict_idle(self, now: float):
+        """Удаление простаивающих ведер (они в начале словаря)."""
+        while self._buckets:
+            _, updated_at = next(iter(self._buckets.values()))
+            if now - updated_at < self.idle_after:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,79 @@
+"""Приложения aiohttp: webhook и проверки готовности."""
+
+from typing import Any, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import (
+    SimpleRequestHandler,
+    setup_application
+)
+from aiohttp import web
+
+from utils.metrics import collect
+
+
+def create_health_app(
+        is_ready: Callable[[], bool],
+        health: Callable[[], dict[str, Any]]
+) -> web.Application:
+    """
+    Создание приложения с /ready (готовность для k8s), /health
+    (состояние, например отключенные эндпоинты бэкенда) и /metrics.
+    В режиме polling запускается отдельно, в режиме webhook
+    на нем же регистрируется обработчик webhook.
+
+    :param is_ready: Функция проверки готовности.
+    :param health: Функция получения состояния.
+    :return: web.Application
+    """
+    async def ready(request: web.Request) -> web.Response:
+        if is_ready():
+            return web.Response(text='ok')
+        return web.Response(status=503, text='not ready')
+
+    async def health_status(request: web.Request) -> web.Response:
+        return web.json_response(health())
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.json_response(collect())
+
+    app = web.Application()
+    app.router.add_get('/ready', ready)
+    app.router.add_get('/health', health_status)
+    app.router.add_get('/metrics', metrics)
+    return app
+
+
+def create_webhook_app(
+        dispatcher: Dispatcher,
+        bot: Bot,
+        path: str,
+        secret_token: str | None,
+        is_ready: Callable[[], bool],
+        health: Callable[[], dict[str, Any]]
+) -> web.Application:
+    """
+    Создание приложения с обработчиком webhook.
+
+    Апдейты обрабатываются в фоне: Telegram сразу получает ответ 200,
+    а обработка идет конкурентно. Запросы без верного
+    X-Telegram-Bot-Api-Secret-Token отклоняются.
+    Также доступны /ready, /health и /metrics (см. create_health_app).
+
+    :param dispatcher: Диспетчер.
+    :param bot: Бот.
+    :param path: Путь webhook.
+    :param secret_token: Секретный токен webhook.
+    :param is_ready: Функция проверки готовности.
+    :param health: Функция получения состояния.
+    :return: web.Application
+    """
+    app = create_health_app(is_ready, health)
+    SimpleRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=secret_token
+    ).register(app, path=path)
+    setup_application(app, dispatcher, bot=bot)
+    return app
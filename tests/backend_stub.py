@@ -0,0 +1,62 @@
+"""Локальный stub-сервер бэкенда для тестов BackendClient."""
+
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+USER_PAYLOAD = {
+    'id': 1,
+    'username': '100',
+    'core_settings': {
+        'user': '100',
+        'current_space': {
+            'id': 10,
+            'name': 'Моя база',
+            'owner_id': 1,
+            'owner_username': '100',
+            'linked_chat': '',
+            'available_linked_users': []
+        },
+        'current_year': 2024,
+        'current_month': 12
+    },
+    'spaces': [],
+    'available_linked_spaces': []
+}
+
+
+@asynccontextmanager
+async def run_backend(routes: list[web.RouteDef]):
+    """Запуск stub-сервера, возвращает базовый URL бэкенда."""
+    app = web.Application()
+    app.add_routes(routes)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        yield str(server.make_url('/api/'))
+    finally:
+        await server.close()
+
+GROUP_PAYLOAD = {
+    'id': 5,
+    'space': USER_PAYLOAD['core_settings']['current_space'],
+    'period_month': 12,
+    'period_year': 2024,
+    'type_transaction': 'expense',
+    'group_name': 'Продукты',
+    'plan_value': '15000.00',
+    'fact_value': '12345.00',
+    'created_at': '2024-12-01T10:00:00Z',
+    'updated_at': '2024-12-02T10:00:00Z'
+}
+
+SUMMARY_PAYLOAD = {
+    'sum_income_plan': '0',
+    'sum_income_fact': '0',
+    'sum_expense_plan': '15000.00',
+    'sum_expense_fact': '12345.00',
+    'balance_plan': '-15000.00',
+    'balance_fact': '-12345.00',
+    'summary': [GROUP_PAYLOAD]
+}
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Переменные окружения, необходимые для импорта engine и config.
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:TEST-token')
+os.environ.setdefault('BACKEND_URL', 'http://backend.test/api/')
+os.environ.setdefault('BACKEND_TOKEN', 'test-token')
+
+# Логи тестов пишутся во временную папку, а не в logs/ репозитория.
+os.environ.setdefault('LOG_FOLDER', f'{tempfile.mkdtemp()}/')
@@ -0,0 +1,210 @@
+"""Количество запросов к бэкенду на обработку одного события."""
+
+import asyncio
+import inspect
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendDocument
+from aiohttp import web
+
+from backend_stub import (
+    GROUP_PAYLOAD,
+    SUMMARY_PAYLOAD,
+    USER_PAYLOAD,
+    run_backend
+)
+from handlers import (
+    export_handlers,
+    main_handlers,
+    settings_handlers,
+    transaction_handlers
+)
+from utils import middlewares
+from utils.backend_client import BackendClient
+
+
+def make_routes(hits: Counter) -> list[web.RouteDef]:
+    def route(method, path, payload, status=200):
+        async def handler(request):
+            hits[f'{method} {path}'] += 1
+            if status == 204:
+                return web.Response(status=204)
+            return web.json_response(payload, status=status)
+        return web.route(method, path, handler)
+
+    return [
+        route('GET', '/api/users', {'results': [USER_PAYLOAD]}),
+        route('GET', '/api/users/1/summary/', SUMMARY_PAYLOAD),
+        route('GET', '/api/users/1/summary/5/', GROUP_PAYLOAD),
+        route('DELETE', '/api/users/1/summary/5/', None, status=204),
+    ]
+
+
+def make_callback(data: str):
+    return SimpleNamespace(
+        data=data,
+        from_user=SimpleNamespace(id=100, first_name='Тест'),
+        message=AsyncMock()
+    )
+
+
+def make_state(data: dict = None):
+    state = AsyncMock()
+    state.get_data.return_value = data or {}
+    return state
+
+
+async def dispatch(handler, event, state):
+    """Вызов хэндлера через мидлварь так же, как это делает aiogram."""
+    params = inspect.signature(handler).parameters
+
+    async def call(event, data):
+        return await handler(
+            event,
+            **{k: v for k, v in data.items() if k in params}
+        )
+
+    await middlewares.AuthCallbackMiddleware()(call, event, {'state': state})
+
+
+@pytest.fixture
+def count_backend_calls(monkeypatch):
+    async def run(handler, event, state):
+        hits = Counter()
+        async with run_backend(make_routes(hits)) as url:
+            client = BackendClient(url, {})
+            get_user = client.get_user
+            get_user_calls = 0
+
+            async def counting_get_user(*args, **kwargs):
+                nonlocal get_user_calls
+                get_user_calls += 1
+                return await get_user(*args, **kwargs)
+
+            client.get_user = counting_get_user
+            for module in (
+                    main_handlers,
+                    settings_handlers,
+                    transaction_handlers,
+                    middlewares
+            ):
+                monkeypatch.setattr(module, 'backend_client', client)
+            await dispatch(handler, event, state)
+            await client.close()
+        return sum(hits.values()), get_user_calls
+
+    return lambda *args: asyncio.run(run(*args))
+
+
+@pytest.mark.parametrize('handler, callback_data, state_data, expected', [
+    (main_handlers.start_callback, 'start', None, 1),
+    (main_handlers.look_summary, 'look_base', None, 2),
+    (settings_handlers.manage_linked_accounts, 'linked_accounts', None, 1),
+    (settings_handlers.choose_base, 'choose_space', None, 1),
+    (
+        transaction_handlers.delete_group_get_name,
+        'group_id_5',
+        {'type': 'expense'},
+        3
+    ),
+])
+def test_backend_calls_per_handler(
+        count_backend_calls,
+        handler,
+        callback_data,
+        state_data,
+        expected
+):
+    callback = make_callback(callback_data)
+    requests, get_user_calls = count_backend_calls(
+        handler,
+        callback,
+        make_state(state_data)
+    )
+    assert callback.message.edit_text.await_count >= 1
+    # Пользователь запрашивается только мидлварью.
+    assert get_user_calls == 1
+    assert requests == expected
+
+
+def test_export_reuses_file_id_until_space_changes(monkeypatch):
+    hits = Counter()
+    routes = make_routes(hits)
+
+    async def export(request):
+        hits['GET export'] += 1
+        return web.Response(body=b'xlsx')
+
+    routes.append(web.get('/api/users/1/export/excel/', export))
+    bot = AsyncMock()
+    bot.send_document.return_value = SimpleNamespace(
+        document=SimpleNamespace(file_id='FILE_ID')
+    )
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            monkeypatch.setattr(export_handlers, 'backend_client', client)
+            monkeypatch.setattr(export_handlers, 'bot', bot)
+            for _ in range(2):
+                await export_handlers.export_excel(
+                    make_callback('export_excel'),
+                    make_state()
+                )
+            client.invalidate_summary(100)
+            await export_handlers.export_excel(
+                make_callback('export_excel'),
+                make_state()
+            )
+            await client.close()
+
+    asyncio.run(scenario())
+    assert hits['GET export'] == 2
+    sent = [call.args[1] for call in bot.send_document.await_args_list]
+    assert sent[1] == 'FILE_ID'
+    assert sent[0] != 'FILE_ID' and sent[2] != 'FILE_ID'
+
+
+def test_export_uploads_again_when_file_id_rejected(monkeypatch):
+    hits = Counter()
+    routes = make_routes(hits)
+
+    async def export(request):
+        hits['GET export'] += 1
+        return web.Response(body=b'xlsx')
+
+    routes.append(web.get('/api/users/1/export/excel/', export))
+    bot = AsyncMock()
+
+    async def send_document(chat_id, document):
+        if document == 'EXPIRED':
+            raise TelegramBadRequest(
+                SendDocument(chat_id=chat_id, document=document),
+                'Bad Request: wrong file identifier'
+            )
+        return SimpleNamespace(document=SimpleNamespace(file_id='NEW'))
+
+    bot.send_document.side_effect = send_document
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            monkeypatch.setattr(export_handlers, 'backend_client', client)
+            monkeypatch.setattr(export_handlers, 'bot', bot)
+            export_key = await client.export_key(100)
+            client.export_cache.set(export_key, 'EXPIRED')
+            await export_handlers.export_excel(
+                make_callback('export_excel'),
+                make_state()
+            )
+            await client.close()
+        return client.export_cache.get(export_key)
+
+    assert asyncio.run(scenario()) == 'NEW'
+    assert hits['GET export'] == 1
+    assert bot.send_document.await_count == 2
+    bot.send_message.assert_awaited_once()
@@ -0,0 +1,476 @@
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+from aiohttp import web
+
+from backend_stub import (
+    GROUP_PAYLOAD,
+    SUMMARY_PAYLOAD,
+    USER_PAYLOAD,
+    run_backend
+)
+from utils.backend_client import BackendClient
+from utils import deadline
+from utils.exceptions import BackendError
+from utils.middlewares import DeadlineMiddleware
+
+
+def test_session_is_reused_between_calls():
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def scenario():
+        async with run_backend([web.get('/api/users', get_users)]) as url:
+            client = BackendClient(url, {})
+            await client.start()
+            session = client.session
+            for id_telegram in (100, 101, 102):
+                user = await client.get_user(id_telegram)
+                assert user.id == 1
+            assert client.session is session
+            stats = client.metrics.snapshot()
+            await client.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats['connections_created'] == 1
+    assert stats['connections_reused'] == 2
+
+
+def test_concurrent_identical_reads_are_coalesced():
+    hits = 0
+
+    async def get_users(request):
+        nonlocal hits
+        hits += 1
+        await asyncio.sleep(0.05)
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def scenario(endpoints):
+        async with run_backend([web.get('/api/users', get_users)]) as url:
+            client = BackendClient(url, {}, single_flight_endpoints=endpoints)
+            users = await asyncio.gather(
+                *(client.get_user(100) for _ in range(5))
+            )
+            await client.close()
+        assert all(user.id == 1 for user in users)
+        return client.single_flight.metrics.snapshot()
+
+    stats = asyncio.run(scenario(['get_user']))
+    assert hits == 1
+    assert stats['coalesced:get_user'] == 4
+
+    hits = 0
+    asyncio.run(scenario([]))
+    assert hits == 5
+
+
+def test_get_user_cache_invalidated_by_writes():
+    hits = 0
+
+    async def get_users(request):
+        nonlocal hits
+        hits += 1
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def get_user_id(request):
+        return web.json_response({'user_id': 1})
+
+    async def patch_space(request):
+        return web.json_response(USER_PAYLOAD['core_settings']['current_space'])
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/get-id/', get_user_id),
+        web.patch('/api/users/1/spaces/10/', patch_space),
+    ]
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            await client.get_user(100)
+            await client.get_user(100)
+            assert hits == 1
+
+            # Изменение пространства сбрасывает кеш всех его участников.
+            await client.get_user(200)
+            assert hits == 2
+            await client.update_space(300, 10, {'linked_chat': '-1'})
+            await client.get_user(100)
+            await client.get_user(200)
+            await client.close()
+        return client.user_cache.metrics.snapshot()
+
+    stats = asyncio.run(scenario())
+    assert hits == 4
+    assert stats['hits'] == 1
+
+
+def test_summary_cache_shared_by_space_and_period():
+    hits = 0
+
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def get_summary(request):
+        nonlocal hits
+        hits += 1
+        return web.json_response(SUMMARY_PAYLOAD)
+
+    async def add_transaction(request):
+        return web.json_response({
+            'id': 1,
+            'type_transaction': 'expense',
+            'group_name': 'Продукты',
+            'description': '',
+            'value_transaction': '100',
+            'author': 1
+        })
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/summary/', get_summary),
+        web.post('/api/users/1/transactions/', add_transaction),
+    ]
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+
+            # Оба пользователя смотрят одно пространство и период.
+            await client.get_summary(100)
+            await client.get_summary(200)
+            expenses = await client.list_group(200, 'expense')
+            incomes = await client.list_group(200, 'income')
+            assert hits == 1
+            assert len(expenses.summary) == 1
+            assert incomes.summary == []
+
+            await client.add_transaction(100, 'expense', 'Продукты', '', 100)
+            await client.get_summary(200)
+            await client.close()
+
+    asyncio.run(scenario())
+    assert hits == 2
+
+
+
+def test_summary_cached_under_period_of_response():
+    hits = 0
+    # Период изменен на другой реплике: в кеше пользователь с декабрем,
+    # а бэкенд уже отдает отчет за ноябрь.
+    november = {
+        **SUMMARY_PAYLOAD,
+        'summary': [{**GROUP_PAYLOAD, 'period_month': 11}]
+    }
+
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def get_summary(request):
+        nonlocal hits
+        hits += 1
+        return web.json_response(november if hits == 1 else SUMMARY_PAYLOAD)
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/summary/', get_summary),
+    ]
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            await client.get_user(100)
+            first = await client.get_summary(100)
+            assert first.summary[0].period_month == 11
+            assert (10, 12, 2024) not in client.summary_cache
+            assert '100' not in client.user_cache
+
+            second = await client.get_summary(200)
+            assert second.summary[0].period_month == 12
+            assert client.summary_cache.get((10, 12, 2024)).key == (10, 12, 2024)
+            await client.close()
+
+    asyncio.run(scenario())
+    assert hits == 2
+
+
+def test_group_lookups_resolved_from_summary_index():
+    remote = 0
+
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def get_summary(request):
+        nonlocal remote
+        if 'group_name' in request.query:
+            remote += 1
+            return web.json_response({**SUMMARY_PAYLOAD, 'summary': []})
+        return web.json_response(SUMMARY_PAYLOAD)
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/summary/', get_summary),
+    ]
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+
+            # Индекс еще не построен - запрос уходит в бэкенд.
+            await client.get_user(100)
+            assert await client.group_name_is_exist(100, 'Продукты') is False
+            assert remote == 1
+
+            await client.get_summary(100)
+            assert await client.group_name_is_exist(100, ' продукты ')
+            assert not await client.group_name_is_exist(100, 'Кафе')
+            group = await client.get_group(100, '5')
+            assert group.group_name == 'Продукты'
+            assert remote == 1
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_retries_and_circuit_breaker():
+    hits = 0
+    failing = True
+
+    async def get_users(request):
+        nonlocal hits
+        hits += 1
+        if failing or hits == 1:
+            return web.Response(status=503)
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def scenario():
+        nonlocal failing, hits
+        async with run_backend([web.get('/api/users', get_users)]) as url:
+            client = BackendClient(url, {})
+            client.retry_backoff_base = 0
+            client.breakers.failure_threshold = 3
+            client.breakers.reset_timeout = 60
+
+            # Первый ответ 503, повтор успешен.
+            failing = False
+            assert (await client.get_user(100)).id == 1
+            assert hits == 2
+            assert client.breakers.metrics.counters['retries:get_user'] == 1
+
+            # Устаревшая запись кеша отдается, пока бэкенд недоступен.
+            client.user_cache.ttl = 0
+            client.user_cache.set('100', await client.get_user(100))
+            failing = True
+            hits = 0
+            assert (await client.get_user(100)).id == 1
+            assert hits == 3
+            # Отказ эндпоинта не снимает реплику с балансировки.
+            assert client.is_ready()
+            assert client.health()['open_breakers'] == ['get_user']
+
+            # Выключатель разомкнут - запросы к бэкенду не выполняются.
+            with pytest.raises(BackendError):
+                await client.get_user(200)
+            assert hits == 3
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_deadline_cancels_update_and_counts_endpoint():
+    async def get_users(request):
+        await asyncio.sleep(1)
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def scenario():
+        async with run_backend([web.get('/api/users', get_users)]) as url:
+            client = BackendClient(url, {})
+            client.retry_backoff_base = 0
+
+            async def handler(event, data):
+                try:
+                    await client.get_user(100)
+                except BackendError:
+                    # Таймаут запроса из бюджета сработал раньше отмены.
+                    await asyncio.sleep(1)
+
+            middleware = DeadlineMiddleware(budget=0.1)
+            started = time.monotonic()
+            assert await middleware(handler, None, {}) is None
+            assert time.monotonic() - started < 0.5
+            await client.close()
+
+    asyncio.run(scenario())
+    counters = deadline.metrics.counters
+    assert counters['exceeded'] == 1
+    assert counters['misses:get_user'] == 1
+
+
+def test_export_streamed_with_bounded_memory():
+    chunk = b'x' * 64 * 1024
+    chunks = 320  # 20 МБ
+
+    async def export(request):
+        response = web.StreamResponse()
+        response.content_length = len(chunk) * chunks
+        await response.prepare(request)
+        for _ in range(chunks):
+            await response.write(chunk)
+        return response
+
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/export/excel/', export),
+    ]
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            await client.get_user(100)
+            tracemalloc.start()
+            export_file = await client.get_export_excel(100)
+            with export_file:
+                size = 0
+                async for part in export_file.read(None):
+                    size += len(part)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            await client.close()
+        return size, peak
+
+    size, peak = asyncio.run(scenario())
+    assert size == len(chunk) * chunks
+    assert peak < 5 * 1024 * 1024
+
+
+def test_conditional_requests_revalidate_summary():
+    hits = 0
+    etag = '"v1"'
+
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def get_summary(request):
+        nonlocal hits
+        hits += 1
+        if etag is None:
+            return web.json_response(SUMMARY_PAYLOAD)
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.json_response(SUMMARY_PAYLOAD, headers={'ETag': etag})
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/summary/', get_summary),
+    ]
+
+    async def scenario():
+        nonlocal etag
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            client.summary_cache.ttl = 0
+            first = await client.get_summary(100)
+            second = await client.get_summary(100)
+            assert second is first
+
+            etag = '"v2"'
+            assert await client.get_summary(100) == first
+
+            # Бэкенд без ETag: ответы разбираются как обычно.
+            etag = None
+            await client.get_summary(100)
+            await client.get_summary(100)
+            stats = client.conditional_cache.metrics.snapshot()
+            await client.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert hits == 5
+    assert stats['revalidations:get_summary'] == 3
+    assert stats['not_modified:get_summary'] == 1
+    assert stats['modified:get_summary'] == 2
+
+
+
+def test_writes_drop_conditional_validators():
+    revalidated = []
+
+    async def get_users(request):
+        return web.json_response(
+            {'results': [USER_PAYLOAD]},
+            headers={'ETag': '"user"'}
+        )
+
+    async def get_summary(request):
+        revalidated.append('If-Modified-Since' in request.headers)
+        # Last-Modified с точностью до секунды не меняется
+        # при записи в ту же секунду.
+        return web.json_response(
+            SUMMARY_PAYLOAD,
+            headers={'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+        )
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/summary/', get_summary),
+    ]
+
+    async def scenario():
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            client.summary_cache.ttl = 0
+            await client.get_summary(100)
+            await client.get_summary(100)
+            client.invalidate_summary(100)
+            await client.get_summary(100)
+            client.invalidate_user(100)
+            size = len(client.conditional_cache)
+            await client.close()
+        return size
+
+    assert asyncio.run(scenario()) == 0
+    assert revalidated == [False, True, False]
+
+
+def test_unregistered_users_negative_cache():
+    hits = 0
+    registered = False
+
+    async def get_users(request):
+        nonlocal hits
+        hits += 1
+        return web.json_response(
+            {'results': [USER_PAYLOAD] if registered else []}
+        )
+
+    async def create_user(request):
+        return web.json_response(USER_PAYLOAD, status=201)
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.post('/api/users/', create_user),
+    ]
+
+    async def scenario():
+        nonlocal registered
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            for _ in range(3):
+                assert await client.get_user(100) is None
+            assert hits == 1
+
+            registered = True
+            await client.create_user(100)
+            assert (await client.get_user(100)).id == 1
+            assert hits == 2
+            stats = client.unregistered_cache.metrics.snapshot()
+            await client.close()
+        return stats
+
+    assert asyncio.run(scenario())['hits'] == 2
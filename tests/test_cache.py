@@ -0,0 +1,31 @@
+import time
+
+from utils.cache import TTLCache
+
+
+def test_lru_eviction():
+    cache = TTLCache('test_cache', maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    stats = cache.metrics.snapshot()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+
+
+def test_ttl_expiration_and_invalidation():
+    cache = TTLCache('test_cache', maxsize=10, ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    cache.ttl = 60
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.invalidate_where(lambda key, value: value > 1)
+    assert 'a' in cache
+    assert 'b' not in cache
@@ -0,0 +1,35 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from aiogram.exceptions import TelegramNetworkError
+from aiogram.methods import DeleteMessages
+
+from utils.cleanup import CleanupQueue
+
+
+def test_deletions_batched_per_chat_and_retried():
+    bot = AsyncMock()
+    bot.delete_messages.side_effect = [
+        TelegramNetworkError(
+            DeleteMessages(chat_id=1, message_ids=[1]),
+            'timeout'
+        ),
+        True
+    ]
+    cleanup = CleanupQueue(bot, delay=0.02, retry_timeout=0)
+
+    async def scenario():
+        # Шаги мастера добавления транзакции.
+        cleanup.delete(1, 11, 10)
+        cleanup.delete(1, 13, 12, None)
+        assert bot.delete_messages.await_count == 0
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert bot.delete_messages.await_count == 2
+    bot.delete_messages.assert_awaited_with(1, [10, 11, 12, 13])
+    stats = cleanup.metrics.snapshot()
+    assert stats['deleted'] == 4
+    assert stats['retries'] == 1
+    assert stats['pending'] == 0
+    assert not cleanup.tasks
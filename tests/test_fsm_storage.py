@@ -0,0 +1,221 @@
+"""Хранилища FSM и бенчмарк пропускной способности update_data."""
+
+import asyncio
+import os
+import time
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from redis.exceptions import RedisError
+
+from utils.fsm import AddTransaction
+from utils import fsm_storage
+from utils.fsm_storage import (
+    SQLiteStorage,
+    TTLMemoryStorage,
+    create_redis_storage
+)
+
+KEY = StorageKey(bot_id=1, chat_id=100, user_id=100)
+
+
+async def check_storage(storage):
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_data(KEY) == {}
+    await storage.set_state(KEY, AddTransaction.get_value)
+    await storage.update_data(KEY, {'type': 'expense', 'group_id': 5})
+    await storage.update_data(KEY, {'value': 12.5})
+    assert await storage.get_state(KEY) == AddTransaction.get_value.state
+    assert await storage.get_data(KEY) == {
+        'type': 'expense',
+        'group_id': 5,
+        'value': 12.5
+    }
+
+
+def test_memory_storage_evicts_idle_and_empty_states():
+    async def scenario():
+        storage = TTLMemoryStorage(ttl=60)
+        await check_storage(storage)
+        snapshot = storage.metrics.snapshot()
+        assert snapshot['states'] == 1
+        assert snapshot['bytes'] > 0
+
+        # Чтение не создает записей, очистка удаляет запись.
+        other = StorageKey(bot_id=1, chat_id=200, user_id=200)
+        assert await storage.get_state(other) is None
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        assert storage.metrics.snapshot()['states'] == 0
+
+        storage.ttl = 0
+        await storage.set_state(KEY, AddTransaction.get_value)
+        await storage.set_state(other, AddTransaction.get_value)
+        assert await storage.get_state(KEY) is None
+        assert storage.metrics.snapshot()['states'] <= 1
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_storage_persists_between_restarts(tmp_path):
+    path = str(tmp_path / 'fsm.sqlite3')
+
+    async def scenario():
+        storage = SQLiteStorage(path, flush_interval=0.01)
+        await check_storage(storage)
+        await asyncio.sleep(0.05)
+        await storage.set_data(KEY, {'type': 'income'})
+        await storage.close()
+
+        # После перезапуска состояние читается из базы.
+        storage = SQLiteStorage(path)
+        assert await storage.get_state(KEY) == AddTransaction.get_value.state
+        assert await storage.get_data(KEY) == {'type': 'income'}
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        await storage.close()
+
+        storage = SQLiteStorage(path)
+        rows = storage._reader.execute('SELECT count(*) FROM fsm').fetchone()
+        await storage.close()
+        return rows[0]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_sqlite_storage_expires_abandoned_states(tmp_path):
+    path = str(tmp_path / 'fsm.sqlite3')
+
+    async def scenario():
+        storage = SQLiteStorage(path, ttl=0)
+        await storage.set_state(KEY, AddTransaction.get_value)
+        await storage.close()
+        storage = SQLiteStorage(path)
+        state = await storage.get_state(KEY)
+        await storage.close()
+        return state
+
+    assert asyncio.run(scenario()) is None
+
+
+def resp_stub(values: dict, commands: list):
+    """Минимальный RESP сервер с командами SET, GET и DEL."""
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                commands.append(args)
+                command, name, *rest = args
+                if command == b'SET':
+                    values[name] = rest[0]
+                    writer.write(b'+OK\r\n')
+                elif command == b'GET':
+                    value = values.get(name)
+                    writer.write(
+                        b'$-1\r\n' if value is None
+                        else b'$%d\r\n%s\r\n' % (len(value), value)
+                    )
+                elif command == b'DEL':
+                    writer.write(b':%d\r\n' % (values.pop(name, None) is not None))
+                else:
+                    writer.write(b'-ERR unknown command\r\n')
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+    return handle
+
+
+def test_redis_storage():
+    values, commands = {}, []
+
+    async def scenario():
+        url = os.getenv('TEST_REDIS_URL')
+        server = None
+        if url is None:
+            server = await asyncio.start_server(
+                resp_stub(values, commands),
+                '127.0.0.1',
+                0
+            )
+            url = f'redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0'
+        storage = create_redis_storage(url, ttl=60)
+        try:
+            await storage.set_state(KEY, None)
+            await storage.set_data(KEY, {})
+            await check_storage(storage)
+
+            keys = [
+                StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(50)
+            ]
+            await asyncio.gather(*(
+                storage.set_data(key, {'id': key.user_id}) for key in keys
+            ))
+            data = await asyncio.gather(*map(storage.get_data, keys))
+            assert [item['id'] for item in data] == list(range(50))
+        finally:
+            await storage.close()
+            if server is not None:
+                server.close()
+
+    try:
+        asyncio.run(scenario())
+    except OSError as e:
+        pytest.skip(f'Redis недоступен: {e}')
+
+    # Записи создаются со временем жизни.
+    sets = [args for args in commands if args[0] == b'SET']
+    assert all(args[3:] == [b'EX', b'60'] for args in sets)
+
+
+def test_redis_storage_connect_timeout(monkeypatch):
+    monkeypatch.setattr(fsm_storage, 'FSM_REDIS_TIMEOUT', 0.05)
+
+    async def scenario():
+        # Сервер принимает соединение, но не отвечает.
+        server = await asyncio.start_server(
+            lambda reader, writer: None,
+            '127.0.0.1',
+            0
+        )
+        port = server.sockets[0].getsockname()[1]
+        storage = create_redis_storage(f'redis://127.0.0.1:{port}/1')
+        started = time.monotonic()
+        try:
+            with pytest.raises(RedisError):
+                await storage.get_state(KEY)
+        finally:
+            await storage.close()
+            server.close()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 1
+
+
+def test_update_throughput_against_memory_storage(tmp_path):
+    updates = 5000
+
+    async def throughput(storage) -> float:
+        keys = [
+            StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(100)
+        ]
+        started = time.perf_counter()
+        for i in range(updates):
+            await storage.update_data(keys[i % 100], {'msg_id': i})
+        elapsed = time.perf_counter() - started
+        await storage.close()
+        return updates / elapsed
+
+    memory = asyncio.run(throughput(MemoryStorage()))
+    sqlite = asyncio.run(throughput(
+        SQLiteStorage(str(tmp_path / 'fsm.sqlite3'))
+    ))
+    print(f'\nupdate_data/с: MemoryStorage {memory:.0f}, '
+          f'SQLiteStorage {sqlite:.0f}')
+    assert sqlite > memory / 20
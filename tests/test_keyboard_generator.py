@@ -1,4 +1,12 @@
+import tracemalloc
+from datetime import date
+
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from backend_stub import SUMMARY_PAYLOAD
 from utils.keyboard_generators import GeneratorKb
+from utils.keyboards import SettingsKb, WorkWithBase
+from utils.models import Summary
 
 
 def test_structure_generate_for_choose_period():
@@ -28,3 +36,71 @@ def test_structure_generate_months():
     assert len(keyboard[1]) == 2
     assert len(keyboard[2]) == 1
     assert keyboard[0][0].callback_data.startswith('all_periods_month_')
+
+
+def test_choose_period_crosses_year_boundary():
+    for today, expected in (
+        (date(2024, 1, 15), ['12_2023', '01_2024', '02_2024', '03_2024']),
+        (date(2024, 11, 15), ['09_2024', '10_2024', '11_2024', '01_2025']),
+        (date(2024, 12, 15), ['10_2024', '11_2024', '12_2024', '02_2025']),
+    ):
+        builder = GeneratorKb.generate_for_choose_period(today)
+        buttons = [
+            button
+            for row in builder.as_markup().inline_keyboard
+            for button in row
+        ]
+        assert set(expected) <= {button.text for button in buttons}
+        assert all(
+            button.callback_data == f'period_{button.text}'
+            for button in buttons
+        )
+
+
+def allocated_per_call(build, calls=200):
+    """Объем памяти, выделенной одним вызовом и удерживаемой результатом."""
+    results = []
+    tracemalloc.start()
+    for _ in range(calls):
+        results.append(build())
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / calls
+
+
+def test_keyboards_allocations_per_call():
+    summary = Summary.model_validate({
+        **SUMMARY_PAYLOAD,
+        'summary': [
+            {**SUMMARY_PAYLOAD['summary'][0], 'id': i, 'group_name': f'{i}'}
+            for i in range(20)
+        ]
+    })
+
+    def build_main_menu():
+        return InlineKeyboardBuilder(
+            markup=WorkWithBase.buttons_main_menu
+        ).as_markup()
+
+    def build_choose_group_name():
+        builder = GeneratorKb.generate_choose_group_name(summary)
+        builder.row(WorkWithBase.button_back_to_start)
+        return builder.adjust(1).as_markup()
+
+    for name, before, after in (
+        ('main_menu', build_main_menu, WorkWithBase.main_menu),
+        (
+            'choose_group_name',
+            build_choose_group_name,
+            lambda: WorkWithBase.choose_group_name(summary)
+        ),
+        (
+            'choose_period',
+            lambda: GeneratorKb.generate_for_choose_period().as_markup(),
+            SettingsKb.generate_choose_period
+        ),
+    ):
+        assert after() is after()
+        built, cached = allocated_per_call(before), allocated_per_call(after)
+        print(f'{name}: {built:.0f} -> {cached:.0f} байт на вызов')
+        assert cached < built / 2
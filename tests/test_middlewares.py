@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from aiogram import Dispatcher, F
+from aiogram.methods import AnswerCallbackQuery
+from aiogram.types import CallbackQuery, Update
+
+from messages import errors
+from utils.middlewares import (
+    CallbackDedupMiddleware,
+    DeadlineFlagMiddleware,
+    DeadlineMiddleware,
+    ThrottlingMiddleware
+)
+from utils.throttling import TokenBuckets
+
+
+def test_token_buckets_refill_and_evict_idle():
+    buckets = TokenBuckets(rate=1, capacity=2, maxsize=100)
+    assert buckets.consume('a', now=0)
+    assert buckets.consume('a', now=0)
+    assert not buckets.consume('a', now=0.5)
+    assert buckets.consume('a', now=1.5)
+
+    # Ведро 'a' восполнилось полностью и удаляется как простаивающее.
+    assert buckets.consume('b', now=10)
+    assert len(buckets) == 1
+
+
+def test_token_buckets_bounded():
+    buckets = TokenBuckets(rate=1, capacity=2, maxsize=3)
+    for key in range(10):
+        buckets.consume(key, now=0)
+    assert len(buckets) == 3
+
+
+def test_throttled_callbacks_acknowledged_without_handler():
+    middleware = ThrottlingMiddleware(
+        user_rate=0.001,
+        user_burst=2,
+        global_rate=1000,
+        global_burst=1000
+    )
+    handler = AsyncMock()
+    event = SimpleNamespace(callback_query=AsyncMock())
+    data = {'event_from_user': SimpleNamespace(id=1)}
+
+    async def scenario():
+        for _ in range(5):
+            await middleware(handler, event, data)
+
+    asyncio.run(scenario())
+    assert handler.await_count == 2
+    assert event.callback_query.answer.await_count == 3
+    assert middleware.metrics.counters['throttled:user'] == 3
+
+
+def test_duplicate_callbacks_suppressed_while_in_flight():
+    middleware = CallbackDedupMiddleware()
+    started = 0
+
+    async def handler(event, data):
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.05)
+
+    def press(data='look_base', message_id=1):
+        return SimpleNamespace(
+            from_user=SimpleNamespace(id=1),
+            data=data,
+            message=SimpleNamespace(message_id=message_id),
+            inline_message_id=None,
+            answer=AsyncMock()
+        )
+
+    async def scenario():
+        presses = [press(), press(), press(), press(message_id=2)]
+        await asyncio.gather(*(middleware(handler, p, {}) for p in presses))
+        # После завершения первой обработки кнопка снова доступна.
+        await middleware(handler, press(), {})
+        return presses
+
+    presses = asyncio.run(scenario())
+    assert started == 3
+    assert sum(p.answer.await_count for p in presses) == 2
+    assert middleware.metrics.counters['suppressed'] == 2
+    assert not middleware.in_flight
+
+
+def test_deadline_answers_callback_and_honours_handler_flag():
+    dp = Dispatcher()
+    dp.update.outer_middleware(DeadlineMiddleware(budget=0.05))
+    dp.callback_query.middleware(DeadlineFlagMiddleware())
+    finished = []
+
+    @dp.callback_query(F.data == 'look_base')
+    async def look_base(callback: CallbackQuery):
+        await asyncio.sleep(0.2)
+        finished.append(callback.data)
+
+    # Экспорт получает больший бюджет флагом хэндлера.
+    @dp.callback_query(F.data == 'export_excel', flags={'deadline': 1})
+    async def export_excel(callback: CallbackQuery):
+        await asyncio.sleep(0.2)
+        finished.append(callback.data)
+
+    def make_update(update_id: int, data: str) -> Update:
+        return Update.model_validate({
+            'update_id': update_id,
+            'callback_query': {
+                'id': str(update_id),
+                'from': {'id': 100, 'is_bot': False, 'first_name': 'Тест'},
+                'chat_instance': '1',
+                'data': data
+            }
+        })
+
+    bot = AsyncMock()
+
+    async def scenario():
+        await dp.feed_update(bot, make_update(1, 'look_base'))
+        await dp.feed_update(bot, make_update(2, 'export_excel'))
+
+    asyncio.run(scenario())
+    assert finished == ['export_excel']
+    method = bot.await_args_list[0].args[0]
+    assert bot.await_count == 1
+    assert isinstance(method, AnswerCallbackQuery)
+    assert method.callback_query_id == '1'
+    assert method.text == errors.DEADLINE_EXCEEDED
@@ -0,0 +1,48 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from aiogram.exceptions import TelegramNetworkError
+from aiogram.methods import SendMessage
+
+from utils.outbox import NotificationOutbox
+
+
+def test_burst_merged_into_digest_and_failures_retried():
+    bot = AsyncMock()
+    bot.send_message.side_effect = [
+        TelegramNetworkError(SendMessage(chat_id='-1', text=''), 'timeout'),
+        None,
+        None
+    ]
+    outbox = NotificationOutbox(bot, window=0.05, backoff_base=0)
+
+    async def scenario():
+        for number in range(3):
+            outbox.notify('-1', f'запись {number}')
+        outbox.notify('-2', 'статья')
+        # Хэндлер не ждет доставки.
+        assert bot.send_message.await_count == 0
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert bot.send_message.await_count == 3
+    texts = {call.args[0]: call.args[1] for call in bot.send_message.await_args_list}
+    assert 'запись 0' in texts['-1'] and 'запись 2' in texts['-1']
+    assert texts['-2'] == 'статья'
+    stats = outbox.metrics.snapshot()
+    assert stats['delivered'] == 2
+    assert stats['retries'] == 1
+    assert stats['pending'] == 0
+    assert not outbox.tasks
+
+
+def test_close_sends_pending_notices():
+    bot = AsyncMock()
+    outbox = NotificationOutbox(bot, window=60)
+
+    async def scenario():
+        outbox.notify('-1', 'запись')
+        await outbox.close()
+
+    asyncio.run(scenario())
+    bot.send_message.assert_awaited_once_with('-1', 'запись')
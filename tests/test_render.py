@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageText
+
+from utils import render
+from utils.keyboards import FamilyFinanceKb, WorkWithBase
+
+
+def test_identical_edits_skipped_locally():
+    def message(message_id):
+        return SimpleNamespace(
+            chat=SimpleNamespace(id=1),
+            message_id=message_id,
+            edit_text=AsyncMock()
+        )
+
+    first, other = message(1), message(2)
+    before = render.metrics.counters.copy()
+
+    async def scenario():
+        for _ in range(3):
+            await render.edit_text(first, 'Меню', reply_markup=WorkWithBase.main_menu())
+        await render.edit_text(first, 'Меню', reply_markup=FamilyFinanceKb.go_to_main())
+        await render.edit_text(other, 'Меню', reply_markup=WorkWithBase.main_menu())
+
+        # Сообщение не изменено, хотя отпечатка нет (например, после рестарта).
+        other.edit_text.side_effect = TelegramBadRequest(
+            EditMessageText(text=''),
+            'Bad Request: message is not modified'
+        )
+        await render.edit_text(other, 'Другое')
+        await render.edit_text(other, 'Другое')
+
+    asyncio.run(scenario())
+    assert first.edit_text.await_count == 2
+    assert other.edit_text.await_count == 2
+    counters = render.metrics.counters - before
+    assert counters['skipped'] == 3
+    assert counters['not_modified'] == 1
+
+
+def test_edits_not_skipped_with_several_replicas(monkeypatch):
+    # Webhook: сообщение могла изменить другая реплика.
+    monkeypatch.setattr(render, 'skip_unchanged', False)
+    message = SimpleNamespace(
+        chat=SimpleNamespace(id=2),
+        message_id=1,
+        edit_text=AsyncMock()
+    )
+
+    async def scenario():
+        for _ in range(2):
+            await render.edit_text(message, 'Меню', reply_markup=WorkWithBase.main_menu())
+
+    asyncio.run(scenario())
+    assert message.edit_text.await_count == 2
+    assert (2, 1) not in render.fingerprints
@@ -0,0 +1,76 @@
+"""Бенчмарк разбора ответов бэкенда: Model(**dict) и валидация из байтов."""
+
+import json
+import timeit
+
+from backend_stub import GROUP_PAYLOAD, SUMMARY_PAYLOAD, USER_PAYLOAD
+from utils.models import EmptySummary, Summary, SummaryResponse, User, UserList
+
+NUMBER = 500
+REPEAT = 7
+
+SUMMARY_30_GROUPS = {
+    **SUMMARY_PAYLOAD,
+    'summary': [
+        {**GROUP_PAYLOAD, 'id': i, 'group_name': f'Статья {i}'}
+        for i in range(30)
+    ]
+}
+
+
+def compare(old, new) -> tuple[float, float]:
+    """
+    Лучшее процессорное время NUMBER вызовов старого и нового разбора.
+    Замеры чередуются, чтобы фоновая нагрузка влияла на оба одинаково.
+    """
+    old_times, new_times = [], []
+    for _ in range(REPEAT):
+        for func, times in ((old, old_times), (new, new_times)):
+            times.append(timeit.timeit(
+                func,
+                number=NUMBER,
+                timer=timeit.time.process_time
+            ))
+    return min(old_times), min(new_times)
+
+
+def test_user_parsed_from_bytes_faster():
+    body = json.dumps({'results': [USER_PAYLOAD]}).encode()
+
+    def old():
+        return User(**json.loads(body)['results'][0])
+
+    def new():
+        return UserList.model_validate_json(body).results[0]
+
+    assert old() == new()
+    old_time, new_time = compare(old, new)
+    print(f'\nUser: {old_time / NUMBER * 1e6:.1f} мкс -> '
+          f'{new_time / NUMBER * 1e6:.1f} мкс')
+    # Выигрыш на маленьком payload невелик, проверяется отсутствие регрессии.
+    assert new_time < old_time * 1.2
+
+
+def test_summary_parsed_from_bytes_faster():
+    body = json.dumps(SUMMARY_30_GROUPS).encode()
+
+    def old():
+        # Раньше тело ответа декодировалось дважды.
+        response_json = json.loads(body)
+        if 'summary' in response_json and not response_json['summary']:
+            return None
+        return Summary(**json.loads(body))
+
+    def new():
+        return SummaryResponse.validate_json(body)
+
+    assert old() == new()
+    old_time, new_time = compare(old, new)
+    print(f'\nSummary: {old_time / NUMBER * 1e6:.1f} мкс -> '
+          f'{new_time / NUMBER * 1e6:.1f} мкс')
+    assert new_time < old_time
+
+
+def test_empty_summary_response():
+    body = json.dumps({**SUMMARY_PAYLOAD, 'summary': []}).encode()
+    assert isinstance(SummaryResponse.validate_json(body), EmptySummary)
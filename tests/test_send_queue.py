@@ -0,0 +1,61 @@
+import asyncio
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import DeleteMessage, GetMe, SendMessage
+
+from utils.send_queue import Priority, SendScheduler, priority
+
+
+def test_queued_requests_released_by_priority_within_limits():
+    scheduler = SendScheduler(
+        global_rate=50,
+        global_burst=1,
+        chat_rate=1000,
+        chat_burst=1000
+    )
+    sent = []
+
+    async def make_request(bot, method):
+        sent.append(method)
+
+    async def notify(chat_id):
+        with priority(Priority.NOTIFICATION):
+            await scheduler(make_request, None, SendMessage(chat_id=chat_id, text='n'))
+
+    async def scenario():
+        requests = [
+            scheduler(make_request, None, DeleteMessage(chat_id=1, message_id=1)),
+            notify(-100),
+            scheduler(make_request, None, SendMessage(chat_id=2, text='r')),
+            scheduler(make_request, None, GetMe())
+        ]
+        await asyncio.gather(*requests)
+
+    asyncio.run(scenario())
+    # GetMe не ограничивается, удаление выпущено первым из свободной очереди,
+    # остальные запросы ждали токена и выпущены по приоритету.
+    assert [type(m).__name__ for m in sent] == [
+        'DeleteMessage', 'GetMe', 'SendMessage', 'SendMessage'
+    ]
+    assert sent[2].text == 'r'
+    stats = scheduler.metrics.snapshot()
+    assert stats['queued:interactive'] == 1
+    assert stats['queued:notification'] == 1
+    assert stats['queue_depth'] == 0
+
+
+def test_retry_after_pauses_chat_and_repeats_request():
+    scheduler = SendScheduler(max_retries=2)
+    calls = 0
+
+    async def make_request(bot, method):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise TelegramRetryAfter(method, 'Too Many Requests', 0)
+        return 'ok'
+
+    method = SendMessage(chat_id=1, text='r')
+    assert asyncio.run(scheduler(make_request, None, method)) == 'ok'
+    assert calls == 2
+    assert scheduler.metrics.counters['retry_after:interactive'] == 1
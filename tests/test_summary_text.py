@@ -0,0 +1,223 @@
+"""Отрисовка отчета: совпадение с прежним форматом, страницы, бенчмарк и кеш."""
+
+import asyncio
+import timeit
+from collections import Counter
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from aiohttp import web
+
+from backend_stub import (
+    GROUP_PAYLOAD,
+    SUMMARY_PAYLOAD,
+    USER_PAYLOAD,
+    run_backend
+)
+from config import (
+    LJUST_DOT_DEFAULT,
+    LJUST_PASS_DEFAULT,
+    MAX_MESSAGE_LENGTH,
+    SUMMARY_PAGE_SIZE
+)
+from handlers import main_handlers
+from messages import main_texts
+from utils.backend_client import BackendClient
+from utils.keyboards import WorkWithBase
+from utils.models import Summary
+from utils.summary_index import SummaryIndex
+from test_backend_calls import make_routes
+
+
+def legacy_summary_text(summary: Summary) -> str:
+    """Прежняя реализация get_summary_text (весь отчет одним сообщением)."""
+    first = summary.summary[0]
+    text = [
+        f'▶️     <b><u>База:</u> {first.space.name}\n'
+        f'▶️     <u>Период:</u> {first.period_month}_'
+        f'{first.period_year}</b>\n\n'
+        '<code>'
+        f'{"Статья":.<{LJUST_DOT_DEFAULT}} План  / Факт\n'
+        '-----------------------------\n'
+    ]
+    incomes = []
+    expenses = []
+    for group in summary.summary:
+        group_text = (
+            f'{group.group_name:.<{LJUST_DOT_DEFAULT}} '
+            f'{(round(group.plan_value / 1000, 1)):<{LJUST_PASS_DEFAULT}}/ '
+            f'{(round(group.fact_value / 1000, 1)):<{LJUST_PASS_DEFAULT}}\n'
+        )
+        if group.type_transaction == 'income':
+            incomes.append(group_text)
+        else:
+            expenses.append(group_text)
+    text.extend(incomes or ['Доходов нет\n'])
+    text.append('-----------------------------\n')
+    text.extend(expenses or ['Расходов нет\n'])
+    text.append('-----------------------------\n')
+    for name, plan, fact in (
+        ('Доходы', summary.sum_income_plan, summary.sum_income_fact),
+        ('Расходы', summary.sum_expense_plan, summary.sum_expense_fact),
+        ('Сальдо', summary.balance_plan, summary.balance_fact),
+    ):
+        text.append(
+            f'{name:.<{LJUST_DOT_DEFAULT}} '
+            f'{(round(plan / 1000, 1)):<{LJUST_PASS_DEFAULT}}/ '
+            f'{(round(fact / 1000, 1)):<{LJUST_PASS_DEFAULT}}\n'
+        )
+    text.append('</code>')
+    return ''.join(text)
+
+
+def make_summary(groups: int) -> Summary:
+    return Summary.model_validate({
+        **SUMMARY_PAYLOAD,
+        'sum_income_plan': '1234567.89',
+        'balance_plan': '-5050.00',
+        'summary': [
+            {
+                **GROUP_PAYLOAD,
+                'id': i,
+                'group_name': f'Статья {i}',
+                'type_transaction': 'income' if i % 3 == 0 else 'expense',
+                'plan_value': str(Decimal(i * 1050 + 5)),
+                'fact_value': str(Decimal(i * 777) / 100)
+            }
+            for i in range(groups)
+        ]
+    })
+
+
+def full_page(summary: Summary) -> str:
+    """Весь отчет одной страницей."""
+    index = SummaryIndex(summary)
+    return main_texts.get_summary_page(index, page_size=len(index.lines))
+
+
+@pytest.mark.parametrize('groups', [10, 100, 1000])
+def test_summary_page_benchmark(groups):
+    summary = make_summary(groups)
+    assert full_page(summary) == legacy_summary_text(summary)
+
+    # Индекс со строками отчета хранится в кеше отчетов.
+    index = SummaryIndex(summary)
+    index.lines
+
+    number = max(1, 2000 // groups)
+    old_times, new_times = [], []
+    for _ in range(5):
+        for func, times in (
+            (legacy_summary_text, old_times),
+            (lambda _: main_texts.get_summary_page(index), new_times)
+        ):
+            times.append(timeit.timeit(
+                lambda: func(summary),
+                number=number,
+                timer=timeit.time.process_time
+            ))
+    old_time, new_time = min(old_times), min(new_times)
+    print(f'\n{groups} статей: {old_time / number * 1e6:.0f} мкс -> '
+          f'{new_time / number * 1e6:.0f} мкс на страницу')
+    assert new_time < old_time
+
+
+def test_large_summary_paged_within_message_limit():
+    index = SummaryIndex(make_summary(1000))
+    pages = main_texts.summary_pages(index)
+    assert pages == -(-1001 // SUMMARY_PAGE_SIZE)
+    texts = [main_texts.get_summary_page(index, page) for page in range(pages)]
+    assert all(len(text) < MAX_MESSAGE_LENGTH for text in texts)
+    # Последняя статья расходов - в конце последней страницы.
+    assert 'Статья 998.' in texts[-1] and 'Статья 998.' not in texts[0]
+    assert texts[1].endswith(f'Страница 2 из {pages}')
+
+    keyboard = WorkWithBase.look_base(1, pages).inline_keyboard
+    assert [b.callback_data for b in keyboard[0]] == [
+        'look_base_0', 'look_base_2'
+    ]
+    assert WorkWithBase.look_base() is WorkWithBase.markup_look_base
+
+
+def test_summary_text_shared_by_space_members(monkeypatch):
+    hits = Counter()
+
+    def make_callback(id_telegram):
+        return SimpleNamespace(
+            data='look_base',
+            from_user=SimpleNamespace(id=id_telegram),
+            message=AsyncMock()
+        )
+
+    async def scenario():
+        async with run_backend(make_routes(hits)) as url:
+            client = BackendClient(url, {})
+            monkeypatch.setattr(main_handlers, 'backend_client', client)
+            main_texts.summary_text_cache.clear()
+            callbacks = [make_callback(100), make_callback(200)]
+            for callback in callbacks:
+                await main_handlers.look_summary(callback, AsyncMock())
+
+            # Изменение данных пространства меняет версию отчета.
+            client.summary_cache.clear()
+            client.invalidate_summary(100)
+            await main_handlers.look_summary(make_callback(100), AsyncMock())
+            await client.close()
+        return callbacks
+
+    callbacks = asyncio.run(scenario())
+    assert hits['GET /api/users/1/summary/'] == 2
+    texts = [c.message.edit_text.await_args.args[0] for c in callbacks]
+    assert texts[0] is texts[1]
+
+
+def test_period_switch_never_serves_old_period_page(monkeypatch):
+    month = 11
+
+    async def get_users(request):
+        return web.json_response({'results': [USER_PAYLOAD]})
+
+    async def get_summary(request):
+        return web.json_response({
+            **SUMMARY_PAYLOAD,
+            'summary': [{**GROUP_PAYLOAD, 'period_month': month}]
+        })
+
+    routes = [
+        web.get('/api/users', get_users),
+        web.get('/api/users/1/summary/', get_summary),
+    ]
+
+    def make_callback():
+        return SimpleNamespace(
+            data='look_base',
+            from_user=SimpleNamespace(id=100),
+            message=AsyncMock()
+        )
+
+    async def look():
+        callback = make_callback()
+        await main_handlers.look_summary(callback, AsyncMock())
+        return callback.message.edit_text.await_args.args[0]
+
+    async def scenario():
+        nonlocal month
+        async with run_backend(routes) as url:
+            client = BackendClient(url, {})
+            monkeypatch.setattr(main_handlers, 'backend_client', client)
+            main_texts.summary_text_cache.clear()
+
+            # В кеше пользователь с декабрем, а период уже переключен
+            # на ноябрь в обход этой реплики.
+            await client.get_user(100)
+            assert 'Период:</u> 11_2024' in await look()
+
+            month = 12
+            client.summary_cache.clear()
+            text = await look()
+            await client.close()
+        return text
+
+    assert 'Период:</u> 12_2024' in asyncio.run(scenario())
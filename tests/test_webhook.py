@@ -0,0 +1,119 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+import main
+from utils.webhook import create_health_app, create_webhook_app
+
+SECRET = 'secret'
+
+
+def make_update(update_id: int) -> dict:
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': 100, 'type': 'private'},
+            'from': {'id': 100, 'is_bot': False, 'first_name': 'Тест'},
+            'text': f'сообщение {update_id}'
+        }
+    }
+
+
+def test_webhook_accepts_updates_with_secret():
+    dp = Dispatcher()
+    received = []
+
+    @dp.message()
+    async def handler(message: Message):
+        await asyncio.sleep(0.01)
+        received.append(message.text)
+
+    ready = True
+    app = create_webhook_app(
+        dp,
+        Bot('123456:TEST-token'),
+        '/webhook',
+        SECRET,
+        lambda: ready,
+        lambda: {'ready': ready, 'open_breakers': []}
+    )
+
+    async def scenario():
+        nonlocal ready
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post('/webhook', json=make_update(1))
+            assert response.status == 401
+
+            headers = {'X-Telegram-Bot-Api-Secret-Token': SECRET}
+            responses = await asyncio.gather(*(
+                client.post('/webhook', json=make_update(i), headers=headers)
+                for i in range(2, 12)
+            ))
+            assert all(response.status == 200 for response in responses)
+            await asyncio.sleep(0.1)
+
+            assert (await client.get('/ready')).status == 200
+            ready = False
+            assert (await client.get('/ready')).status == 503
+            health = await (await client.get('/health')).json()
+            assert health == {'ready': False, 'open_breakers': []}
+            assert (await client.get('/metrics')).status == 200
+
+    asyncio.run(scenario())
+    assert sorted(received) == sorted(f'сообщение {i}' for i in range(2, 12))
+
+
+def test_health_app_without_webhook():
+    # Режим polling: /ready для k8s без обработчика webhook.
+    app = create_health_app(lambda: True, dict)
+
+    async def scenario():
+        async with TestClient(TestServer(app)) as client:
+            assert (await client.get('/ready')).status == 200
+            assert (await client.get('/metrics')).status == 200
+            assert (await client.post('/webhook')).status == 404
+
+    asyncio.run(scenario())
+
+
+def test_webhook_mode_requires_url_and_secret(monkeypatch):
+    monkeypatch.setattr(main, 'WEBHOOK_BASE_URL', 'https://bot.example')
+    monkeypatch.setattr(main, 'WEBHOOK_SECRET', None)
+    with pytest.raises(SystemExit, match='WEBHOOK_SECRET'):
+        main.run_webhook()
+
+    monkeypatch.setattr(main, 'WEBHOOK_BASE_URL', '')
+    monkeypatch.setattr(main, 'WEBHOOK_SECRET', SECRET)
+    with pytest.raises(SystemExit, match='WEBHOOK_BASE_URL'):
+        main.run_webhook()
+
+
+def test_webhook_mode_caps_replica_cache_ttl(tmp_path):
+    script = tmp_path / 'print_ttl.py'
+    script.write_text(
+        'import config\n'
+        'print(config.BACKEND_USER_CACHE_TTL, config.BACKEND_SUMMARY_CACHE_TTL,'
+        ' config.EXPORT_CACHE_TTL)\n'
+    )
+    src = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+    def ttls(mode: str) -> str:
+        env = {**os.environ, 'BOT_MODE': mode, 'PYTHONPATH': src}
+        return subprocess.run(
+            [sys.executable, str(script)],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.split()
+
+    assert ttls('polling') == ['30', '30', '300']
+    assert ttls('webhook') == ['3', '3', '3']